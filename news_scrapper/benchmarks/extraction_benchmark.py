@@ -0,0 +1,47 @@
+# extraction_benchmark.py
+"""Micro-benchmark of feed content extraction: lxml fast path vs BeautifulSoup
+
+Usage: python benchmarks/extraction_benchmark.py [feed.xml] [rounds]
+
+sample_feed.xml has the markup of the Dawn feed but generated article text.
+For figures that match production, save a live feed and pass it instead:
+
+    curl -o dawn.xml https://www.dawn.com/feed
+    python benchmarks/extraction_benchmark.py dawn.xml
+"""
+import os
+import sys
+import timeit
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import feedparser
+from news_scrapper.extractors import EXTRACTORS, extract_text
+
+SAMPLE_FEED = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_feed.xml')
+
+def feed_html(path):
+    """content:encoded (or summary) HTML of every entry in a saved feed"""
+    feed = feedparser.parse(path)
+    return [
+        entry.content[0].value if entry.get('content') else entry.get('summary', '')
+        for entry in feed.entries
+    ]
+
+def main(path=SAMPLE_FEED, rounds=20):
+    documents = feed_html(path)
+    print(f"{len(documents)} articles, {sum(map(len, documents)) / len(documents):.0f} characters of HTML on average")
+
+    # Both extractors must agree before their speed is worth comparing
+    for html in documents:
+        assert extract_text(html, 'lxml') == extract_text(html, 'bs4')
+
+    per_article = {}
+    for extractor in EXTRACTORS:
+        seconds = min(timeit.repeat(
+            lambda: [extract_text(html, extractor) for html in documents], number=rounds, repeat=3
+        ))
+        per_article[extractor] = seconds / rounds / len(documents)
+        print(f"{extractor:>5}: {per_article[extractor] * 1e6:8.1f} us per article")
+    print(f"lxml is {per_article['bs4'] / per_article['lxml']:.1f}x faster")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else SAMPLE_FEED, *map(int, sys.argv[2:3]))
@@ -1,36 +1,87 @@
 # config.py
+import os
+
 SCRAPER_CONFIG = {
     'process_count': 2,  # Number of parallel processes
     'timeout': 300,      # Timeout in seconds
+    'concurrent_requests': 64,    # Requests in flight across all feeds of one crawler
+    'per_domain_concurrency': 2,  # Requests in flight per outlet
     'database': {
         'path': 'scraped_articles.db',
         'timeout': 30
     },
-    'dawn': {
+    # Per-source settings, keyed by the source name in the feed registry
+    'dawn_latest': {
         'concurrent_requests': 8,
         'download_delay': 1,
         'batch_size': 50
     },
-    'tribune': {
+    'tribune_latest': {
         'concurrent_requests': 8,
         'download_delay': 1,
         'batch_size': 50
     },
     'export': {
-        'format': 'json',
-        'compression': 'gz'
+        'format': 'jsonl',   # 'jsonl' streams items as they are scraped, 'json' writes one list at close
+        'compression': 'gz',
+        'flush_every': 20,   # Items written between flushes of the export file
+        # Seconds after which an untouched '.part' file is taken to be left by a killed spider and
+        # published for ingestion; well above the scraper timeout and the poller's rotate interval
+        'stale_after': 3600
+    },
+    'polling': {
+        'initial_interval': 120,  # Seconds between polls of a feed when polling starts
+        'min_interval': 60,       # Floor for busy feeds
+        'max_interval': 900,      # Ceiling for quiet feeds
+        'backoff': 1.5,           # Interval is divided by this after new entries, multiplied after none
+        'export_rotate_interval': 300  # Seconds before a poller's export file is closed for ingestion
     }
 }
 
 # Retry configuration
 RETRY_CONFIG = {
     'max_retries': 3,
-    'retry_delay': 10,
-    'retry_statuses': [500, 502, 503, 504, 408]
+    'retry_delay': 10,   # Seconds before the first retry; doubles with each further attempt
+    'retry_statuses': [500, 502, 503, 504, 408, 429]
 }
 
-# Rate limiting
+# Rate limiting per domain, as '<requests>/<s|m|h>'; each domain gets its own download slot
 RATE_LIMITS = {
     'dawn.com': '10/m',      # 10 requests per minute
     'tribune.com.pk': '10/m'  # 10 requests per minute
-}
\ No newline at end of file
+}
+
+# PostgreSQL connection; POSTGRES_HOST overrides the docker-compose service name
+DB_CONFIG = {
+    "dbname": "news_db",
+    "user": "admin",
+    "password": "admin123",
+    "host": os.environ.get("POSTGRES_HOST", "postgres"),
+    "port": "5432"
+}
+
+# Connection pool shared by all database tasks in a process
+DB_POOL_CONFIG = {
+    'minconn': 1,
+    'maxconn': 10
+}
+
+# Redis used by the read API's response cache; REDIS_HOST overrides localhost
+REDIS_CONFIG = {
+    'host': os.environ.get('REDIS_HOST', 'localhost'),
+    'port': 6379,
+    'db': 0
+}
+
+# Read API (serve_api.py)
+API_CONFIG = {
+    'host': '0.0.0.0',
+    'port': 8000,
+    'cache_ttl': 300  # Seconds a cached response lives if no ingest invalidates it first
+}
+
+# Retention of the monthly news partitions
+DB_RETENTION_CONFIG = {
+    'keep_months': None,  # Months kept, counting the current one; None keeps everything
+    'drop': False         # Drop expired partitions instead of detaching them as <name>_archived_<timestamp>
+}
@@ -2,10 +2,8 @@
 import os
 import sys
 from datetime import datetime
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
-from spiders.Dawn_spider import DawnLatestSpider
-from spiders.tribune_latest import TribuneLatestSpider
+from spider_runner import run_spiders as run_spider_processes
+from news_scrapper.feeds import FEED_SPECS
 import logging
 
 def setup_directories():
@@ -24,25 +22,24 @@ def setup_logging():
     return logging.getLogger('main_scraper')
 
 def run_spiders():
-    """Run both Dawn and Tribune spiders"""
+    """Run a spider for every registered source"""
     logger = setup_logging()
     setup_directories()
     
     try:
-        # Initialize crawler process
-        settings = get_project_settings()
-        process = CrawlerProcess(settings)
+        # Each source runs in its own process, up to SCRAPER_CONFIG['process_count'] at once
+        logger.info(f"Starting spiders for {', '.join(FEED_SPECS)}")
+        results = run_spider_processes(list(FEED_SPECS))
         
-        # Add both spiders to the process
-        logger.info("Starting Dawn spider")
-        process.crawl(DawnLatestSpider)
+        for result in results:
+            logger.info(
+                f"{result.spider_name}: exit code {result.exit_code}, timed out {result.timed_out}, "
+                f"{result.stats.get('item_scraped_count', 0)} items scraped"
+            )
         
-        logger.info("Starting Tribune spider")
-        process.crawl(TribuneLatestSpider)
-        
-        # Start the crawling process
-        logger.info("Beginning crawling process")
-        process.start()
+        failed = [result.spider_name for result in results if not result.ok]
+        if failed:
+            raise RuntimeError(f"Spiders failed: {', '.join(failed)}")
         
         logger.info("Scraping completed successfully")
         
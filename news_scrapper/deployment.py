@@ -1,10 +1,21 @@
+from prefect import serve
 from news_pipeline import news_etl_pipeline
 from datetime import timedelta
 
 if __name__ == "__main__":
-    news_etl_pipeline.serve(
-        name="news_scraper",
-        interval=timedelta(hours=24),
-        tags=["news", "scraping"],
-        description="Scrapes news articles from Dawn and Tribune websites"
-    )
\ No newline at end of file
+    serve(
+        news_etl_pipeline.to_deployment(
+            name="news_scraper",
+            interval=timedelta(hours=24),
+            tags=["news", "scraping"],
+            description="Scrapes news articles from Dawn and Tribune websites"
+        ),
+        # Loads the files handed over by poll_feeds.py between the daily scrapes
+        news_etl_pipeline.to_deployment(
+            name="news_ingest",
+            interval=timedelta(minutes=5),
+            parameters={"scrape": False},
+            tags=["news", "ingestion"],
+            description="Ingests articles exported by the long-running feed poller"
+        )
+    )
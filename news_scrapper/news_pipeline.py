@@ -1,24 +1,44 @@
 from prefect import flow, task
-import psycopg2
+from prefect.futures import wait
 from prefect.logging import get_run_logger
-from psycopg2.extras import execute_values
-import json
+from prefect.task_runners import ThreadPoolTaskRunner
 import os
 from datetime import datetime
-from typing import List, Dict
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
-from news_scrapper.spiders.Dawn_spider import DawnLatestSpider
-from news_scrapper.spiders.tribune_latest import TribuneLatestSpider
-
-# Database configuration
-DB_CONFIG = {
-    "dbname": "news_db",
-    "user": "admin",
-    "password": "admin123",
-    "host": "postgres",
-    "port": "5432"
-}
+from typing import List, Dict, Iterator
+from collections import Counter
+import redis
+from config import SCRAPER_CONFIG, DB_CONFIG, DB_POOL_CONFIG, DB_RETENTION_CONFIG, REDIS_CONFIG
+from news_scrapper.pipelines import compute_content_hash
+from news_scrapper.dates import to_timestamp
+from news_scrapper.db import configure_pool, get_connection, release_connection, create_schema, upsert_article_batch
+from news_scrapper.cache import invalidate
+from news_scrapper.partitions import detach_partitions, retention_cutoff
+from news_scrapper.feeds import FEED_SPECS
+from news_scrapper import exports
+from news_scrapper.bulk_load import copy_upsert_articles
+from news_scrapper.exports import export_files, export_source, iter_articles, recover_part_files
+from spider_runner import run_spider
+
+# Database tasks share one connection pool per process
+configure_pool(DB_CONFIG, **DB_POOL_CONFIG)
+
+# Connects on first use; only needed to invalidate the read API's cache
+redis_client = redis.Redis(**REDIS_CONFIG)
+
+# Sources ingested by the pipeline; each one is scraped, loaded and upserted independently
+SOURCES = list(FEED_SPECS)
+
+# Chunk size for sources without a batch_size in SCRAPER_CONFIG
+DEFAULT_BATCH_SIZE = 50
+
+def source_batch_size(filename: str) -> int:
+    """Chunk size for an export file, from SCRAPER_CONFIG[<source>]['batch_size']"""
+    source = export_source(filename)  # e.g. dawn_latest_2025-06-03_101500.jsonl.gz -> dawn_latest
+    return SCRAPER_CONFIG.get(source, {}).get("batch_size", DEFAULT_BATCH_SIZE)
+
+def iter_article_chunks(json_dir: str, filenames: List[str]) -> Iterator[List[Dict]]:
+    """Yield articles from the given export files in each source's batch_size chunks"""
+    return exports.iter_article_chunks(json_dir, chunk_size=source_batch_size, filenames=filenames)
 
 @task(retries=3, retry_delay_seconds=30, name="setup_database")
 def setup_database() -> None:
@@ -26,129 +46,137 @@ def setup_database() -> None:
     logger = get_run_logger()
     logger.info("Setting up database...")
     
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
-    
+    conn = get_connection()
     try:
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS news (
-            id SERIAL PRIMARY KEY,
-            heading TEXT NOT NULL,
-            content TEXT,
-            author TEXT,
-            date DATE,
-            category TEXT,
-            url TEXT UNIQUE,  -- Making URL unique to prevent duplicates
-            processed_at TIMESTAMP,
-            spider_name TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- Create index on URL for faster duplicate checking
-        CREATE INDEX IF NOT EXISTS idx_news_url ON news(url);
-        """
-        cur.execute(create_table_query)
-        conn.commit()
+        create_schema(conn)
         logger.info("Database setup completed successfully")
     finally:
-        cur.close()
-        conn.close()
+        release_connection(conn)
 
-@task(retries=2, retry_delay_seconds=60, name="run_scrapers")
-def run_scrapers() -> None:
-    """Task to run the scrapers in parallel"""
+@task(retries=2, retry_delay_seconds=60, name="run_scraper")
+def run_scraper(spider_name: str) -> Dict:
+    """Task to run one spider to completion in its own process, returning its Scrapy stats"""
     logger = get_run_logger()
-    logger.info("Starting scrapers...")
+    logger.info(f"Starting {spider_name} scraper...")
     
-    process = CrawlerProcess(get_project_settings())
-    process.crawl(DawnLatestSpider)
-    process.crawl(TribuneLatestSpider)
-    process.start()
+    # A fresh process per attempt means retries never hit an already-stopped reactor
+    result = run_spider(spider_name, timeout=SCRAPER_CONFIG['timeout'])
+    if not result.ok:
+        reason = "timed out" if result.timed_out else f"exited with code {result.exit_code}"
+        raise RuntimeError(f"{spider_name} scraper {reason}")
     
-    logger.info("Scrapers completed successfully")
-
-@task(name="load_json_files")
-def load_json_files(json_dir: str) -> List[Dict]:
-    """Load and combine all JSON files from the specified directory"""
-    logger = get_run_logger()
-    logger.info(f"Loading JSON files from {json_dir}")
-    
-    all_articles = []
-    for filename in os.listdir(json_dir):
-        if filename.endswith(".json"):
-            file_path = os.path.join(json_dir, filename)
-            with open(file_path, "r") as file:
-                articles = json.load(file)
-                all_articles.extend(articles)
-    
-    logger.info(f"Loaded {len(all_articles)} articles")
-    return all_articles
+    logger.info(
+        f"{spider_name} scraper completed successfully: "
+        f"{result.stats.get('item_scraped_count', 0)} items from "
+        f"{result.stats.get('downloader/response_count', 0)} responses"
+    )
+    return result.stats
 
 @task(retries=3, retry_delay_seconds=30, name="upsert_articles")
-def upsert_articles(articles: List[Dict]) -> int:
-    """Insert or update articles in the database"""
+def upsert_articles(articles: List[Dict]) -> Dict[str, int]:
+    """Insert or update one chunk of articles, committing the chunk; returns inserted/updated/unchanged counts"""
     logger = get_run_logger()
+    # Exports written before published_at existed only carry the raw date
+    articles = [
+        dict(
+            article,
+            content_hash=article.get("content_hash") or compute_content_hash(article),
+            published_at=article.get("published_at") or to_timestamp(article.get("date"))
+        )
+        for article in articles
+    ]
     logger.info(f"Upserting {len(articles)} articles")
     
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
+    conn = get_connection()
+    try:
+        counts = upsert_article_batch(conn, articles)
+        logger.info(f"Upserted {len(articles)} articles: {counts}")
+        if counts["inserted"] or counts["updated"]:
+            invalidate(redis_client, logger)
+        return counts
+    finally:
+        release_connection(conn)
+
+@task(retries=3, retry_delay_seconds=30, name="bulk_load_articles")
+def bulk_load_articles(json_dir: str, filenames: List[str]) -> Dict[str, int]:
+    """Load the given exports with COPY into a staging table and merge them into news"""
+    logger = get_run_logger()
+    logger.info(f"Bulk loading {len(filenames)} files from {json_dir}")
     
+    conn = get_connection()
     try:
-        upsert_query = """
-        INSERT INTO news (
-            heading, content, author, date, category, url, processed_at, spider_name
-        ) VALUES %s
-        ON CONFLICT (url) DO UPDATE SET
-            heading = EXCLUDED.heading,
-            content = EXCLUDED.content,
-            author = EXCLUDED.author,
-            date = EXCLUDED.date,
-            category = EXCLUDED.category,
-            processed_at = EXCLUDED.processed_at,
-            spider_name = EXCLUDED.spider_name,
-            updated_at = CURRENT_TIMESTAMP
-        """
-        
-        article_data = [
-            (
-                article.get("heading"),
-                article.get("content"),
-                article.get("author"),
-                article.get("date"),
-                article.get("category"),
-                article.get("url"),
-                article.get("processed_at"),
-                article.get("spider_name")
-            )
-            for article in articles
-        ]
-        
-        execute_values(cur, upsert_query, article_data)
-        conn.commit()
-        logger.info(f"Successfully upserted {len(articles)} articles")
-        return len(articles)
-        
+        counts = copy_upsert_articles(conn, iter_articles(json_dir, filenames=filenames))
+        logger.info(f"Bulk load finished: {counts}")
+        if counts["inserted"] or counts["updated"]:
+            invalidate(redis_client, logger)
+        return counts
+    finally:
+        release_connection(conn)
+
+@task(retries=1, retry_delay_seconds=30, name="apply_retention")
+def apply_retention(keep_months: int, drop: bool = False) -> List[str]:
+    """Detach (or drop) the news partitions older than keep_months"""
+    logger = get_run_logger()
+    conn = get_connection()
+    try:
+        expired = detach_partitions(conn, retention_cutoff(keep_months), drop=drop)
+        logger.info(f"Expired partitions: {', '.join(expired) or 'none'}")
+        if expired:
+            invalidate(redis_client, logger)
+        return expired
     finally:
-        cur.close()
-        conn.close()
+        release_connection(conn)
 
 @task(name="cleanup_json_files")
-def cleanup_json_files(json_dir: str) -> None:
-    """Clean up processed JSON files"""
+def cleanup_json_files(json_dir: str, filenames: List[str]) -> None:
+    """Remove the given processed JSON files"""
     logger = get_run_logger()
-    logger.info("Cleaning up JSON files")
+    logger.info(f"Cleaning up {len(filenames)} JSON files")
     
-    for filename in os.listdir(json_dir):
-        if filename.endswith(".json"):
-            file_path = os.path.join(json_dir, filename)
+    for filename in filenames:
+        file_path = os.path.join(json_dir, filename)
+        try:
             os.remove(file_path)
+        except FileNotFoundError:
+            # Already loaded and removed by an overlapping news_ingest run
+            pass
     
     logger.info("Cleanup completed")
 
-@flow(name="news_etl_pipeline", log_prints=True)
-def news_etl_pipeline(json_dir: str = "./data/articles"):
-    """Main ETL pipeline flow"""
+@task(name="ingest_source")
+def ingest_source(spider_name: str, json_dir: str, bulk_load: bool = False) -> Dict[str, int]:
+    """Load and upsert one spider's finished exports, then remove exactly those files"""
+    logger = get_run_logger()
+    
+    # Files still being written end in '.part' and are left for the next run, unless a killed
+    # spider left them behind long ago
+    recover_part_files(json_dir, [spider_name], SCRAPER_CONFIG['export']['stale_after'])
+    filenames = export_files(json_dir, spider_name)
+    if not filenames:
+        logger.info(f"No {spider_name} articles found to process")
+        return {}
+    
+    # Stream the exports in chunks; each chunk is its own upsert task run,
+    # so a failed chunk is retried on its own and memory is bounded by the chunk size
+    counts = Counter()
+    if bulk_load:
+        counts.update(bulk_load_articles(json_dir, filenames))
+    else:
+        for chunk in iter_article_chunks(json_dir, filenames):
+            counts.update(upsert_articles(chunk))
+    
+    # Cleanup JSON files after successful processing
+    cleanup_json_files(json_dir, filenames)
+    return dict(counts)
+
+@flow(
+    name="news_etl_pipeline",
+    log_prints=True,
+    task_runner=ThreadPoolTaskRunner(max_workers=2 * len(SOURCES))
+)
+def news_etl_pipeline(json_dir: str = "./data/articles", bulk_load: bool = False, scrape: bool = True):
+    """Main ETL pipeline flow; bulk_load uses the COPY loader for large backfills,
+    scrape=False only ingests files already exported (e.g. by poll_feeds.py)"""
     logger = get_run_logger()
     logger.info("Starting news ETL pipeline")
     
@@ -156,24 +184,39 @@ def news_etl_pipeline(json_dir: str = "./data/articles"):
         # Initialize database
         setup_database()
         
-        # Run scrapers
-        run_scrapers()
+        # Each source is its own branch: its spider runs in its own process (with its own
+        # timeout) and its load and upsert start as soon as that spider finishes, so total
+        # latency is the slowest source, not the sum
+        ingestions = {}
+        for spider_name in SOURCES:
+            scraped = [run_scraper.submit(spider_name)] if scrape else []
+            ingestions[spider_name] = ingest_source.submit(spider_name, json_dir, bulk_load, wait_for=scraped)
+        wait(list(ingestions.values()))
+        
+        counts = Counter()
+        failed = []
+        for spider_name, ingestion in ingestions.items():
+            try:
+                source_counts = ingestion.result()
+            except Exception as e:
+                logger.error(f"Ingestion of {spider_name} failed: {str(e)}")
+                failed.append(spider_name)
+                continue
+            counts.update(source_counts)
+            logger.info(f"{spider_name}: {source_counts}")
         
-        # Load JSON files
-        articles = load_json_files(json_dir)
+        if failed:
+            raise RuntimeError(f"Ingestion failed for: {', '.join(failed)}")
+
+        if DB_RETENTION_CONFIG['keep_months']:
+            apply_retention(DB_RETENTION_CONFIG['keep_months'], DB_RETENTION_CONFIG['drop'])
         
-        if articles:
-            # Store data in PostgreSQL
-            articles_processed = upsert_articles(articles)
-            
-            # Cleanup JSON files after successful processing
-            cleanup_json_files(json_dir)
-            
-            logger.info(f"Pipeline completed successfully! Processed {articles_processed} articles")
-            return articles_processed
-        else:
-            logger.info("No articles found to process")
-            return 0
+        articles_processed = sum(counts.values())
+        logger.info(
+            f"Pipeline completed successfully! Processed {articles_processed} articles "
+            f"({counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged)"
+        )
+        return articles_processed
         
     except Exception as e:
         logger.error(f"Pipeline failed: {str(e)}")
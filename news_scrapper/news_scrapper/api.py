@@ -0,0 +1,172 @@
+# api.py
+"""Read-only HTTP API for the latest articles per source or category
+
+    GET /articles/source/<spider_name>?limit=20&cursor=<next>
+    GET /articles/category/<category>?limit=20&cursor=<next>
+
+Pages are newest first and chained by keyset cursors on (published_at, id),
+so every page costs the same however deep it is.
+"""
+import base64
+import json
+import logging
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+import psycopg2
+import redis
+from .cache import ResponseCache
+from .db import connection
+
+logger = logging.getLogger(__name__)
+
+# Column filtered on by each listing, /articles/<listing>/<value>
+LISTINGS = {'source': 'spider_name', 'category': 'category'}
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# One extra row tells whether there is a next page; undated articles are left out of the listings
+LATEST_QUERY = """
+SELECT id, heading, url, author, category, spider_name, published_at, cluster_id,
+       left(content, 300) AS summary
+FROM news
+WHERE {column} = %(value)s
+    AND published_at IS NOT NULL
+    {after}
+ORDER BY published_at DESC, id DESC
+LIMIT %(limit)s
+"""
+
+# The plain bound lets the planner skip partitions newer than the cursor; the row comparison pages
+AFTER_CURSOR = """AND published_at <= %(published_at)s::timestamptz
+    AND (published_at, id) < (%(published_at)s::timestamptz, %(id)s)"""
+
+def encode_cursor(published_at: datetime, article_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{published_at.isoformat()}|{article_id}".encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(published_at, id) of the last article on the previous page; ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        published_at, article_id = raw.split('|')
+        return datetime.fromisoformat(published_at), int(article_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+class APIError(Exception):
+    def __init__(self, status: int, message: str):
+        super(APIError, self).__init__(message)
+        self.status = status
+
+class ArticleAPI:
+    """Routing, querying and caching, separate from the HTTP server so it can be called directly"""
+
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        self.cache = cache
+
+    def latest(self, listing: str, value: str, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of the newest articles with listing (source/category) equal to value"""
+        params = {'value': value, 'limit': limit + 1}
+        after = ''
+        if cursor:
+            params['published_at'], params['id'] = decode_cursor(cursor)
+            after = AFTER_CURSOR
+
+        with connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(LATEST_QUERY.format(column=LISTINGS[listing], after=after), params)
+                columns = [column.name for column in cur.description]
+                articles = [dict(zip(columns, row)) for row in cur.fetchall()]
+            conn.rollback()
+
+        next_cursor = None
+        if len(articles) > limit:
+            articles = articles[:limit]
+            next_cursor = encode_cursor(articles[-1]['published_at'], articles[-1]['id'])
+        return {'articles': articles, 'next': next_cursor}
+
+    def parse_request(self, path: str) -> Tuple[str, str, int, Optional[str]]:
+        url = urlsplit(path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        if len(parts) != 3 or parts[0] != 'articles' or parts[1] not in LISTINGS or not parts[2]:
+            raise APIError(404, "Not found; use /articles/source/<name> or /articles/category/<name>")
+
+        query = parse_qs(url.query)
+        try:
+            limit = int(query.get('limit', [DEFAULT_LIMIT])[0])
+        except ValueError:
+            raise APIError(400, "limit must be an integer") from None
+        if not 1 <= limit <= MAX_LIMIT:
+            raise APIError(400, f"limit must be between 1 and {MAX_LIMIT}")
+        cursor = query.get('cursor', [None])[0]
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError as e:
+                raise APIError(400, str(e)) from None
+        return parts[1], parts[2], limit, cursor
+
+    def handle(self, path: str) -> Tuple[int, bytes]:
+        """Status and JSON body for a GET of path"""
+        try:
+            listing, value, limit, cursor = self.parse_request(path)
+            key = json.dumps([listing, value, limit, cursor])
+            body, generation = self.cached(key)
+            if body is None:
+                page = self.latest(listing, value, limit, cursor)
+                body = json.dumps(page, default=json_default).encode()
+                self.store(key, body, generation)
+            return 200, body
+        except APIError as e:
+            return e.status, json.dumps({'error': str(e)}).encode()
+        except psycopg2.Error as e:
+            logger.error(f"Query for {path} failed: {e!r}")
+            return 503, json.dumps({'error': "Database unavailable"}).encode()
+
+    def cached(self, key: str) -> Tuple[Optional[bytes], Optional[bytes]]:
+        if self.cache is None:
+            return None, None
+        try:
+            return self.cache.get(key)
+        except redis.RedisError as e:
+            # Serve from Postgres while Redis is unavailable
+            logger.warning(f"Response cache unavailable: {e}")
+            return None, None
+
+    def store(self, key: str, body: bytes, generation: Optional[bytes]) -> None:
+        if self.cache is None or generation is None:
+            return
+        try:
+            self.cache.set(key, body, generation)
+        except redis.RedisError as e:
+            logger.warning(f"Could not cache response: {e}")
+
+def make_handler(api: ArticleAPI):
+    class ArticleRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, body = api.handle(self.path)
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.info(format % args)
+
+    return ArticleRequestHandler
+
+def serve(host: str, port: int, api: ArticleAPI) -> None:
+    """Serve the API until interrupted, one thread per request"""
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    logger.info(f"Serving the article API on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,80 @@
+# bulk_load.py
+"""Bulk upserts through COPY ... FROM STDIN into a staging table
+
+Articles are streamed into a temporary table, the monthly partitions they
+need are created and they are merged into `news` with the pipeline's upsert
+statement. The `news` table must already exist.
+"""
+from typing import Dict, Iterable
+from .dates import to_timestamp
+from .db import ARTICLE_COLUMNS, article_column_definitions, merge_query
+from .partitions import ensure_partitions
+from .pipelines import compute_content_hash
+
+# Article fields in the order they are copied into the staging table
+COPY_COLUMNS = ARTICLE_COLUMNS
+
+CREATE_STAGING_QUERY = f"""
+CREATE TEMP TABLE news_staging (
+{article_column_definitions()}
+) ON COMMIT DROP;
+"""
+
+COPY_QUERY = f"COPY news_staging ({', '.join(COPY_COLUMNS)}) FROM STDIN"
+
+# The same upsert as the pipeline's, reading from the staging table
+MERGE_QUERY = merge_query("news_staging")
+
+STAGED_MONTHS_QUERY = """
+SELECT DISTINCT date_trunc('month', published_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+FROM news_staging
+WHERE published_at IS NOT NULL
+"""
+
+def copy_value(value) -> str:
+    """Format a value for COPY's text format"""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+class ArticleStream:
+    """File-like object that feeds articles to COPY without materializing them"""
+
+    def __init__(self, articles: Iterable[Dict]):
+        self.articles = iter(articles)
+        self.buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self.buffer) < size:
+            article = next(self.articles, None)
+            if article is None:
+                break
+            if not article.get("content_hash"):
+                article = dict(article, content_hash=compute_content_hash(article))
+            if not article.get("published_at"):
+                article = dict(article, published_at=to_timestamp(article.get("date")))
+            self.buffer += "\t".join(copy_value(article.get(column)) for column in COPY_COLUMNS) + "\n"
+
+        if size < 0:
+            data, self.buffer = self.buffer, ""
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+def copy_upsert_articles(conn, articles: Iterable[Dict]) -> Dict[str, int]:
+    """Bulk upsert articles through a COPY-loaded staging table; returns inserted/updated/unchanged counts"""
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_STAGING_QUERY)
+        cursor.copy_expert(COPY_QUERY, ArticleStream(articles))
+        cursor.execute(STAGED_MONTHS_QUERY)
+        ensure_partitions(cursor, [month for (month,) in cursor.fetchall()])
+        cursor.execute(MERGE_QUERY)
+        inserted, updated, unchanged = cursor.fetchone()
+    conn.commit()
+    return {"inserted": inserted, "updated": updated, "unchanged": unchanged}
@@ -0,0 +1,52 @@
+# cache.py
+"""Redis cache for read API responses, invalidated all at once by a generation counter"""
+from typing import Optional, Tuple
+
+import redis
+
+GENERATION_KEY = 'news:api:generation'
+
+def bump_generation(redis_client) -> int:
+    """Invalidate every cached response; called once new or changed articles are committed"""
+    return redis_client.incr(GENERATION_KEY)
+
+def invalidate(redis_client, logger) -> bool:
+    """bump_generation, logging instead of raising if Redis is unreachable; returns whether it worked"""
+    try:
+        bump_generation(redis_client)
+    except redis.RedisError as e:
+        # Cached responses then expire on their own after API_CONFIG['cache_ttl']
+        logger.warning(f"Could not invalidate the API cache: {e!r}")
+        return False
+    return True
+
+class ResponseCache:
+    """Response bodies keyed by request, each tagged with the generation it was built at
+
+    Bumping the generation makes every entry stale at once without scanning
+    or deleting keys; stale entries are ignored until they are overwritten or
+    expire after `ttl` seconds. The generation and the entry come back from
+    one MGET, so a hit is a single round-trip.
+    """
+
+    def __init__(self, redis_client, ttl: int = 60, prefix: str = 'news:api:response'):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Tuple[Optional[bytes], bytes]:
+        """Cached body for key (None if missing or stale) and the current generation
+
+        Pass the generation to set(), so a response built while articles were
+        being committed is stored as stale rather than outliving the bump.
+        """
+        generation, entry = self.redis_client.mget([GENERATION_KEY, f"{self.prefix}:{key}"])
+        generation = generation or b'0'
+        if entry:
+            tag, _, body = entry.partition(b'\n')
+            if tag == generation:
+                return body, generation
+        return None, generation
+
+    def set(self, key: str, body: bytes, generation: bytes) -> None:
+        self.redis_client.set(f"{self.prefix}:{key}", generation + b'\n' + body, ex=self.ttl)
@@ -0,0 +1,71 @@
+# dates.py
+"""Parsing of feed publish dates into timezone-aware datetimes"""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+def parse_rfc822(value: str) -> datetime:
+    """'Tue, 03 Jun 2025 14:30:00 +0500' or '... GMT', the format both registered feeds use"""
+    parsed = parsedate_to_datetime(value)
+    if parsed is None:  # Python < 3.10 returns None instead of raising
+        raise ValueError(value)
+    return parsed
+
+def parse_iso(value: str) -> datetime:
+    """ISO 8601, including the 'Z' suffix that fromisoformat only accepts from Python 3.11"""
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+def strptime_parser(fmt: str) -> Callable[[str], datetime]:
+    def parse(value: str) -> datetime:
+        return datetime.strptime(value, fmt)
+    parse.__name__ = f"strptime({fmt})"
+    return parse
+
+class DateParser:
+    """Tries a list of parsers, most successful first, and caches the result per string
+
+    Feeds repeat the same timestamps on every poll, so most lookups are cache
+    hits. On a miss, the parsers are tried in order of how many strings each
+    has parsed so far, so a feed's own format is usually the first one tried.
+    Naive results are taken to be UTC, like feedparser's published_parsed.
+    """
+
+    def __init__(self, parsers: List[Callable[[str], datetime]], cache_size: int = 4096):
+        self.parsers = list(parsers)
+        self.hits = {parser: 0 for parser in self.parsers}
+        self.parse = lru_cache(maxsize=cache_size)(self._parse)
+
+    def _parse(self, value: str) -> Optional[datetime]:
+        for index, parser in enumerate(self.parsers):
+            try:
+                parsed = parser(value)
+            except (ValueError, TypeError, IndexError, OverflowError):
+                continue
+            self.hits[parser] += 1
+            # Bubble the parser forward once it has out-scored the one before it
+            if index and self.hits[parser] > self.hits[self.parsers[index - 1]]:
+                self.parsers[index - 1], self.parsers[index] = parser, self.parsers[index - 1]
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed
+        return None
+
+    def __call__(self, value: Optional[str]) -> Optional[datetime]:
+        if not value or not isinstance(value, str):
+            return None
+        return self.parse(value.strip())
+
+parse_date = DateParser([
+    parse_rfc822,
+    parse_iso,
+    strptime_parser("%d %b %Y %H:%M:%S"),
+    strptime_parser("%B %d, %Y %I:%M %p"),
+])
+
+def to_timestamp(value: Optional[str]) -> Optional[str]:
+    """UTC ISO 8601 timestamp for a feed date string, or None if it cannot be parsed"""
+    parsed = parse_date(value)
+    return parsed.astimezone(timezone.utc).isoformat() if parsed else None
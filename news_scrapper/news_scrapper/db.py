@@ -0,0 +1,324 @@
+# db.py
+"""Shared PostgreSQL connection pool, schema and article upsert for the pipeline tasks and loaders"""
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from .partitions import ensure_partitions
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_settings: Dict[str, Any] = {}
+_slots: Optional[threading.BoundedSemaphore] = None
+_lock = threading.Lock()
+
+def configure_pool(db_config: Dict[str, Any], minconn: int = 1, maxconn: int = 10) -> None:
+    """Set the connection settings; the pool itself is created on first checkout"""
+    global _pool_settings
+    with _lock:
+        if _pool is not None:
+            return
+        _pool_settings = {'db_config': dict(db_config), 'minconn': minconn, 'maxconn': maxconn}
+
+def get_pool() -> ThreadedConnectionPool:
+    """Return the process-wide pool, creating it if needed"""
+    global _pool, _slots
+    with _lock:
+        if _pool is None:
+            if not _pool_settings:
+                raise RuntimeError("configure_pool() must be called before using the database")
+            _pool = ThreadedConnectionPool(
+                _pool_settings['minconn'],
+                _pool_settings['maxconn'],
+                **_pool_settings['db_config']
+            )
+            # ThreadedConnectionPool raises instead of waiting when exhausted, so callers queue here
+            _slots = threading.BoundedSemaphore(_pool_settings['maxconn'])
+        return _pool
+
+def is_healthy(conn) -> bool:
+    """Check that a pooled connection is still usable"""
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+def get_connection():
+    """Check out a healthy connection; must be returned with release_connection()"""
+    pool = get_pool()
+    _slots.acquire()
+    try:
+        conn = pool.getconn()
+        # At most maxconn connections sit idle, so after that many discards getconn() opens a fresh one
+        for _ in range(_pool_settings['maxconn']):
+            if is_healthy(conn):
+                break
+            logger.warning("Discarding broken pooled database connection")
+            pool.putconn(conn, close=True)
+            conn = pool.getconn()
+        return conn
+    except Exception:
+        _slots.release()
+        raise
+
+def release_connection(conn) -> None:
+    """Return a connection to the pool, rolling back any open transaction"""
+    try:
+        get_pool().putconn(conn, close=bool(conn.closed))
+    finally:
+        _slots.release()
+
+@contextmanager
+def connection():
+    """Context manager around get_connection()/release_connection()"""
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        release_connection(conn)
+
+def close_pool() -> None:
+    """Close every pooled connection"""
+    global _pool, _slots
+    with _lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            _slots = None
+
+# news is range-partitioned by publish month (partitions.py creates the months on ingest);
+# undated articles go to news_undated. A unique index on a partitioned table must include
+# the partition key, so URL uniqueness is kept by the news_urls registry instead.
+NEWS_SCHEMA = """
+CREATE SEQUENCE IF NOT EXISTS news_id_seq;
+
+CREATE TABLE IF NOT EXISTS news (
+    id BIGINT NOT NULL DEFAULT nextval('news_id_seq'),
+    heading TEXT NOT NULL,
+    content TEXT,
+    author TEXT,
+    date DATE,
+    category TEXT,
+    url TEXT,
+    processed_at TIMESTAMP,
+    spider_name TEXT,
+    content_hash TEXT,
+    cluster_id TEXT,
+    published_at TIMESTAMPTZ,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) PARTITION BY RANGE (published_at);
+
+-- Full-text search document, headings weighted above body text (rewrites the table when first added)
+ALTER TABLE news ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(heading, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(content, '')), 'B')
+) STORED;
+
+ALTER SEQUENCE news_id_seq OWNED BY news.id;
+
+-- The CHECK lets new monthly partitions be created without scanning this one
+CREATE TABLE IF NOT EXISTS news_undated PARTITION OF news (
+    CONSTRAINT news_undated_published_at CHECK (published_at IS NULL)
+) DEFAULT;
+
+CREATE TABLE IF NOT EXISTS news_urls (
+    url TEXT PRIMARY KEY,
+    published_at TIMESTAMPTZ
+);
+
+-- Not unique (news_urls is); finds the row an upsert updates
+CREATE INDEX IF NOT EXISTS idx_news_url ON news(url);
+
+-- Near-duplicate stories across sources share a cluster_id
+CREATE INDEX IF NOT EXISTS idx_news_cluster_id ON news(cluster_id);
+
+-- Full-text matches for search.py
+CREATE INDEX IF NOT EXISTS idx_news_search ON news USING gin (search_vector);
+
+-- Newest-first listings of the read API, paged by (published_at, id)
+CREATE INDEX IF NOT EXISTS idx_news_source_latest ON news(spider_name, published_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_news_category_latest ON news(category, published_at DESC, id DESC);
+
+-- Rows arrive roughly in time order, so block ranges are enough for time-window scans
+CREATE INDEX IF NOT EXISTS idx_news_published_at ON news USING brin (published_at);
+CREATE INDEX IF NOT EXISTS idx_news_processed_at ON news USING brin (processed_at);
+CREATE INDEX IF NOT EXISTS idx_news_urls_published_at ON news_urls USING brin (published_at);
+"""
+
+# Columns an unpartitioned news table may be missing, added before it is migrated
+LEGACY_COLUMNS = """
+ALTER TABLE news ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE news ADD COLUMN IF NOT EXISTS cluster_id TEXT;
+ALTER TABLE news ADD COLUMN IF NOT EXISTS published_at TIMESTAMPTZ;
+"""
+
+# Article fields written to news, in column order
+ARTICLE_COLUMNS = [
+    "heading", "content", "author", "date", "category", "url", "processed_at", "spider_name", "content_hash", "cluster_id",
+    "published_at"
+]
+
+# Column types of the non-TEXT article fields
+ARTICLE_TYPES = {"date": "DATE", "processed_at": "TIMESTAMP", "published_at": "TIMESTAMPTZ"}
+
+def article_column_definitions() -> str:
+    """Column list for a table holding ARTICLE_COLUMNS, e.g. a staging table"""
+    return ",\n".join(f"    {column} {ARTICLE_TYPES.get(column, 'TEXT')}" for column in ARTICLE_COLUMNS)
+
+def merge_query(source: str) -> str:
+    """Upsert statement reading articles from `source`, a relation with ARTICLE_COLUMNS
+
+    New URLs are claimed in news_urls and inserted; known URLs update their
+    row when content_hash changed (or to fill in a missing published_at),
+    moving it to another partition if published_at changed. Data-modifying
+    CTEs share one snapshot, so the update never sees this statement's
+    inserts. Returns one row of inserted, updated and unchanged counts.
+    """
+    columns = ", ".join(ARTICLE_COLUMNS)
+    updated_columns = ",\n        ".join(
+        f"{column} = batch.{column}"
+        for column in ARTICLE_COLUMNS if column not in ("url", "cluster_id", "published_at")
+    )
+    return f"""
+WITH batch AS (
+    SELECT DISTINCT ON (url) {columns}
+    FROM {source}
+    WHERE url IS NOT NULL
+    ORDER BY url, processed_at DESC NULLS LAST
+),
+registered AS (
+    INSERT INTO news_urls (url, published_at)
+    SELECT url, published_at FROM batch
+    ON CONFLICT (url) DO NOTHING
+    RETURNING url
+),
+inserted AS (
+    INSERT INTO news ({columns})
+    SELECT {', '.join(f'batch.{column}' for column in ARTICLE_COLUMNS)}
+    FROM batch JOIN registered USING (url)
+    RETURNING url
+),
+updated AS (
+    UPDATE news SET
+        {updated_columns},
+        cluster_id = COALESCE(batch.cluster_id, news.cluster_id),
+        published_at = COALESCE(batch.published_at, news.published_at),
+        updated_at = CURRENT_TIMESTAMP
+    FROM batch
+    WHERE news.url = batch.url
+        AND (news.content_hash IS DISTINCT FROM batch.content_hash
+             OR (news.published_at IS NULL AND batch.published_at IS NOT NULL))
+    RETURNING news.url, news.published_at
+),
+relocated AS (
+    UPDATE news_urls SET published_at = updated.published_at
+    FROM updated
+    WHERE news_urls.url = updated.url AND news_urls.published_at IS DISTINCT FROM updated.published_at
+)
+SELECT
+    (SELECT COUNT(*) FROM inserted),
+    (SELECT COUNT(*) FROM updated),
+    (SELECT COUNT(*) FROM batch) - (SELECT COUNT(*) FROM inserted) - (SELECT COUNT(*) FROM updated)
+"""
+
+UPSERT_QUERY = merge_query(f"(VALUES %s) AS batch_values ({', '.join(ARTICLE_COLUMNS)})")
+
+# Casts give the VALUES list the column types; untyped literals would be read as text
+UPSERT_TEMPLATE = "(" + ", ".join(f"%s::{ARTICLE_TYPES.get(column, 'TEXT')}" for column in ARTICLE_COLUMNS) + ")"
+
+def table_kind(cur, table: str) -> Optional[str]:
+    """pg_class.relkind of a table: 'p' partitioned, 'r' plain, None if it does not exist"""
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+def partition_news_table(cur) -> None:
+    """Migrate an unpartitioned news table into the partitioned layout, in the caller's transaction"""
+    cur.execute(LEGACY_COLUMNS)
+    cur.execute("SELECT pg_get_serial_sequence('news', 'id')")
+    (sequence,) = cur.fetchone()
+    if sequence:
+        # Keep the id sequence when the old table is dropped; NEWS_SCHEMA reuses it
+        cur.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+        if sequence.split(".")[-1] != "news_id_seq":
+            cur.execute(f"ALTER SEQUENCE {sequence} RENAME TO news_id_seq")
+    for index in ("idx_news_url", "idx_news_cluster_id", "idx_news_published_at"):
+        cur.execute(f"DROP INDEX IF EXISTS {index}")
+    cur.execute("ALTER TABLE news RENAME TO news_unpartitioned")
+    cur.execute(NEWS_SCHEMA)
+
+    # Rows stored before published_at existed take it from their date, so they land in their month
+    published_at = "COALESCE(published_at, date::timestamp AT TIME ZONE 'UTC')"
+    cur.execute(f"""
+        SELECT DISTINCT date_trunc('month', {published_at} AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+        FROM news_unpartitioned
+        WHERE {published_at} IS NOT NULL
+    """)
+    ensure_partitions(cur, [month for (month,) in cur.fetchall()])
+
+    # Tables created by older versions may lack the timestamps (or anything else not in LEGACY_COLUMNS)
+    cur.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'news_unpartitioned'
+    """)
+    existing = {column for (column,) in cur.fetchall()}
+    columns, values = [], []
+    for column in ["id"] + ARTICLE_COLUMNS + ["created_at", "updated_at"]:
+        if column == "published_at":
+            values.append(published_at)
+        elif column in existing:
+            values.append(column)
+        elif column in ("created_at", "updated_at"):
+            values.append("now()")
+        else:
+            continue  # Left to the column default
+        columns.append(column)
+    cur.execute(f"INSERT INTO news ({', '.join(columns)}) SELECT {', '.join(values)} FROM news_unpartitioned")
+    # URLs were not always unique; the registry keeps the newest row's publish time
+    id_order = ", id DESC" if "id" in existing else ""
+    cur.execute(f"""
+        INSERT INTO news_urls (url, published_at)
+        SELECT DISTINCT ON (url) url, {published_at} FROM news_unpartitioned
+        WHERE url IS NOT NULL
+        ORDER BY url{id_order}
+        ON CONFLICT (url) DO NOTHING
+    """)
+    cur.execute("DROP TABLE news_unpartitioned")
+    logger.info("Migrated news to a partitioned table")
+
+def create_schema(conn) -> None:
+    """Create the partitioned news table and its indexes, migrating an unpartitioned one"""
+    with conn.cursor() as cur:
+        if table_kind(cur, "news") == "r":
+            partition_news_table(cur)
+        else:
+            cur.execute(NEWS_SCHEMA)
+    conn.commit()
+
+def upsert_article_batch(conn, articles: List[Dict]) -> Dict[str, int]:
+    """Insert or update articles (with content_hash set) in one statement and commit
+
+    Creates any monthly partitions the batch needs first. Returns
+    inserted/updated/unchanged counts.
+    """
+    # A URL may appear twice in a batch (e.g. re-runs appending to the same export);
+    # keep the latest so the statement sees each URL once
+    articles = list({article.get("url"): article for article in articles}.values())
+    rows = [tuple(article.get(column) for column in ARTICLE_COLUMNS) for article in articles]
+    with conn.cursor() as cur:
+        ensure_partitions(cur, [article.get("published_at") for article in articles])
+        # One page, so the whole batch is a single statement
+        pages = execute_values(cur, UPSERT_QUERY, rows, template=UPSERT_TEMPLATE, page_size=max(len(rows), 1), fetch=True)
+    conn.commit()
+    inserted, updated, unchanged = pages[0] if pages else (0, 0, 0)
+    return {"inserted": inserted, "updated": updated, "unchanged": unchanged}
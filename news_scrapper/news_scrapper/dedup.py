@@ -0,0 +1,118 @@
+# dedup.py
+"""Backends that remember which article URLs a spider has already scraped"""
+import hashlib
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+class DedupBackend(ABC):
+    """Batched membership store for scraped URLs; each call is one Redis round-trip
+
+    URLs are kept per namespace (the source name), so every spider that
+    crawls a source shares its history.
+    """
+
+    @abstractmethod
+    async def filter_unseen(self, namespace: str, urls: List[str]) -> List[str]:
+        """Return the URLs that have not been added yet, in order"""
+        pass
+
+    @abstractmethod
+    async def add(self, namespace: str, urls: List[str]) -> None:
+        """Record URLs as scraped"""
+        pass
+
+class RedisKeyDedup(DedupBackend):
+    """One expiring Redis key per URL; exact, but forgets URLs after the expiry"""
+
+    def __init__(self, redis_client, expiry: int):
+        self.redis_client = redis_client
+        self.expiry = expiry
+
+    def key(self, namespace: str, url: str) -> str:
+        return f"{namespace}:url:{url}"
+
+    async def filter_unseen(self, namespace: str, urls: List[str]) -> List[str]:
+        if not self.redis_client or not urls:
+            return urls
+        seen = await self.redis_client.mget([self.key(namespace, url) for url in urls])
+        return [url for url, value in zip(urls, seen) if not value]
+
+    async def add(self, namespace: str, urls: List[str]) -> None:
+        if not self.redis_client or not urls:
+            return
+        pipe = self.redis_client.pipeline(transaction=False)
+        for url in urls:
+            pipe.setex(self.key(namespace, url), self.expiry, "1")
+        await pipe.execute()
+
+def bloom_parameters(capacity: int, error_rate: float) -> Tuple[int, int]:
+    """Bit count and hash count for a Bloom filter holding capacity items at error_rate"""
+    bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+class BloomFilterDedup(DedupBackend):
+    """Bloom filter stored as Redis bitmaps, one per time window
+
+    URLs are added to the current window's bitmap and looked up in the last
+    `windows` bitmaps, which expire as they fall out of range. The error rate
+    is split across the windows so the combined false-positive rate stays at
+    error_rate; a false positive skips an article, a URL is never scraped twice.
+    With the defaults, six months of history take well under a megabyte.
+    """
+
+    def __init__(self, redis_client, capacity: int = 50000, error_rate: float = 0.001,
+                 window: int = 30 * 86400, windows: int = 6):
+        self.redis_client = redis_client
+        self.window = window
+        self.windows = windows
+        self.bits, self.hashes = bloom_parameters(capacity, error_rate / windows)
+
+    def window_keys(self, namespace: str, now=None) -> List[str]:
+        """Bitmap keys to look up, current window first"""
+        current = int((time.time() if now is None else now) // self.window)
+        return [f"{namespace}:bloom:{index}" for index in range(current, current - self.windows, -1)]
+
+    def positions(self, url: str) -> List[int]:
+        """Bit offsets for a URL, by double hashing one 128-bit digest"""
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    async def filter_unseen(self, namespace: str, urls: List[str]) -> List[str]:
+        if not self.redis_client or not urls:
+            return urls
+        lookup = []
+        for url in urls:
+            for position in self.positions(url):
+                lookup += ['GET', 'u1', position]
+
+        # One BITFIELD per window, all in a single round-trip; missing bitmaps read as zeros
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in self.window_keys(namespace):
+            pipe.execute_command('BITFIELD', key, *lookup)
+        bitmaps = await pipe.execute()
+
+        unseen = []
+        for index, url in enumerate(urls):
+            start = index * self.hashes
+            if not any(all(bits[start:start + self.hashes]) for bits in bitmaps):
+                unseen.append(url)
+        return unseen
+
+    async def add(self, namespace: str, urls: List[str]) -> None:
+        if not self.redis_client or not urls:
+            return
+        update = []
+        for url in urls:
+            for position in self.positions(url):
+                update += ['SET', 'u1', position, 1]
+
+        key = self.window_keys(namespace)[0]
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.execute_command('BITFIELD', key, *update)
+        pipe.expire(key, self.window * self.windows)
+        await pipe.execute()
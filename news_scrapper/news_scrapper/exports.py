@@ -0,0 +1,119 @@
+# exports.py
+"""Reading back the article files written by JsonExportPipeline"""
+import gzip
+import json
+import logging
+import os
+import re
+import time
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Files written by JsonExportPipeline: <source>_<YYYY-MM-DD>[_<HHMMSS>[-<n>]].<suffix>; older exports have only the date
+EXPORT_NAME = re.compile(r"^(?P<source>.+?)_\d{4}-\d{2}-\d{2}(?:_\d{6}(?:-\d+)?)?\.(?:json|jsonl|jsonl\.gz)$")
+
+DEFAULT_CHUNK_SIZE = 50
+
+def iter_export_file(file_path: str) -> Iterator[Dict]:
+    """Yield articles one at a time from a JSON, JSON Lines or gzipped JSON Lines export"""
+    if file_path.endswith(".json"):
+        with open(file_path, "r") as file:
+            try:
+                articles = json.load(file)
+            except json.JSONDecodeError:
+                # A recovered '.part' whose spider was killed while writing it
+                logger.warning(f"Skipping {file_path}, which is not complete JSON")
+                return
+        yield from articles
+        return
+
+    opener = gzip.open if file_path.endswith(".gz") else open
+    with opener(file_path, "rt", encoding="utf-8") as file:
+        try:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by a crashed spider; the rest of the file is still usable
+                    logger.warning(f"Skipping truncated line in {file_path}")
+        except EOFError:
+            logger.warning(f"{file_path} ended without a gzip trailer")
+        except (gzip.BadGzipFile, zlib.error, UnicodeDecodeError) as e:
+            # Older exports appended a gzip member per run; a run killed mid-write corrupts the rest
+            logger.warning(f"Skipping the rest of {file_path}, which is corrupt: {e}")
+
+def export_source(filename: str) -> Optional[str]:
+    """Source an export file was written for, or None if the name is not an export's"""
+    match = EXPORT_NAME.match(filename)
+    return match["source"] if match else None
+
+def export_files(json_dir: str, spider_name: Optional[str] = None) -> List[str]:
+    """Export file names in the directory, optionally only one spider's, in a stable order
+
+    Sources are matched exactly, so 'dawn' never picks up 'dawn_latest' files.
+    """
+    if not os.path.isdir(json_dir):
+        return []
+    return sorted(
+        filename for filename in os.listdir(json_dir)
+        if export_source(filename) is not None
+        and (spider_name is None or export_source(filename) == spider_name)
+    )
+
+def recover_part_files(json_dir: str, sources: Iterable[str], stale_after: float) -> List[str]:
+    """Publish the sources' '.part' files left by a killed spider; returns the recovered names
+
+    A '.part' file is only renamed once it has not been written to for
+    stale_after seconds, so files a live spider still has open are left alone.
+    Articles in them are already marked scraped, so this is their only way
+    into the database; a truncated last line or gzip member is skipped when
+    the file is read.
+    """
+    if not os.path.isdir(json_dir):
+        return []
+    sources = set(sources)
+    recovered = []
+    for filename in sorted(os.listdir(json_dir)):
+        name, part = filename[:-len(".part")], filename.endswith(".part")
+        if not part or export_source(name) not in sources:
+            continue
+        path = os.path.join(json_dir, filename)
+        try:
+            if time.time() - os.path.getmtime(path) < stale_after:
+                continue
+            os.replace(path, os.path.join(json_dir, name))
+        except FileNotFoundError:
+            continue  # Recovered by another process first
+        logger.warning(f"Recovered {filename}, left behind by a spider that did not finish")
+        recovered.append(name)
+    return recovered
+
+def iter_articles(json_dir: str, spider_name: Optional[str] = None,
+                  filenames: Optional[List[str]] = None) -> Iterator[Dict]:
+    """Yield every article from the given export files, by default all of those in the directory"""
+    if filenames is None:
+        filenames = export_files(json_dir, spider_name)
+    for filename in filenames:
+        yield from iter_export_file(os.path.join(json_dir, filename))
+
+def iter_article_chunks(json_dir: str, spider_name: Optional[str] = None,
+                        chunk_size: Callable[[str], int] = lambda filename: DEFAULT_CHUNK_SIZE,
+                        filenames: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+    """Yield articles from the given export files (by default all in the directory) as chunks,
+    chunk_size(filename) long"""
+    if filenames is None:
+        filenames = export_files(json_dir, spider_name)
+    for filename in filenames:
+        size = chunk_size(filename)
+        chunk = []
+        for article in iter_export_file(os.path.join(json_dir, filename)):
+            chunk.append(article)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
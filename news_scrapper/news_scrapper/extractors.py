@@ -0,0 +1,43 @@
+# extractors.py
+"""Paragraph text extraction from article HTML carried in feeds"""
+from typing import Optional
+import lxml.etree
+import lxml.html
+
+# Parsers accepted by extract_text; 'bs4' needs beautifulsoup4 installed
+EXTRACTORS = ('lxml', 'bs4')
+
+def element_text(element) -> str:
+    """Text of an element's stripped, non-empty strings joined by spaces"""
+    return ' '.join(text.strip() for text in element.itertext() if text.strip())
+
+def lxml_text(html: str) -> str:
+    """Paragraph text via lxml: one parse and one walk over the tree"""
+    root = lxml.html.fragment_fromstring(html, create_parent='div')
+    lxml.etree.strip_elements(root, 'script', 'style', with_tail=False)
+    paragraphs = [text for text in (element_text(p) for p in root.iter('p')) if text]
+    if paragraphs:
+        return ' '.join(paragraphs)
+    return element_text(root)
+
+def soup_text(html: str) -> str:
+    """Paragraph text via BeautifulSoup's html.parser"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    p_tags = soup.find_all('p')
+    if p_tags:
+        return ' '.join(p.get_text(separator=' ', strip=True) for p in p_tags if p.get_text(strip=True))
+    return soup.get_text(separator=' ', strip=True)
+
+def extract_text(html: Optional[str], extractor: str = 'lxml') -> Optional[str]:
+    """Text of the <p> tags in an HTML fragment, or of the whole fragment if it has none"""
+    if not html:
+        return None
+    if extractor == 'bs4':
+        text = soup_text(html)
+    elif extractor == 'lxml':
+        text = lxml_text(html)
+    else:
+        raise ValueError(f"Unknown extractor: {extractor}")
+    return text.strip() or None
@@ -0,0 +1,52 @@
+# feeds.py
+"""Declarative descriptions of the RSS sources scraped by the feed spiders"""
+import json
+import os
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+from urllib.parse import urljoin
+
+@dataclass(frozen=True)
+class FeedSpec:
+    """Everything that differs between two feed sources"""
+    name: str                            # Spider name; also keys Redis, logs and export files
+    domain: str                          # Allowed domain for article pages
+    feed_url: str
+    content_xpath: str                   # Article text on the page, used when the feed has none
+    base_url: Optional[str] = None       # Relative links in the feed are resolved against this
+
+    def normalize_link(self, link: str) -> str:
+        if self.base_url and not link.startswith('http'):
+            return urljoin(self.base_url, link)
+        return link
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FeedSpec':
+        return cls(**data)
+
+# Registry of all sources; FEED_REGISTRY points at another JSON file with the same layout
+REGISTRY_PATH = os.environ.get('FEED_REGISTRY', os.path.join(os.path.dirname(__file__), 'feeds.json'))
+
+def load_registry(path: str) -> Dict[str, FeedSpec]:
+    """Read a JSON list of feed specs, keyed by name"""
+    with open(path, encoding='utf-8') as f:
+        specs = [FeedSpec.from_dict(data) for data in json.load(f)]
+    registry = {spec.name: spec for spec in specs}
+    if len(registry) != len(specs):
+        raise ValueError(f"Duplicate feed names in {path}")
+    return registry
+
+# Adding a source is one entry in the registry; it is then crawled by the 'feeds' spider
+# along with every other source, or on its own by FeedSpider (-a spec=<name>)
+FEED_SPECS: Dict[str, FeedSpec] = load_registry(REGISTRY_PATH)
+
+def resolve_spec(spec: str) -> FeedSpec:
+    """Look up a spec by name, or parse one given inline as JSON"""
+    if spec in FEED_SPECS:
+        return FEED_SPECS[spec]
+    if spec.lstrip().startswith('{'):
+        return FeedSpec.from_dict(json.loads(spec))
+    raise KeyError(f"Unknown feed spec: {spec}")
@@ -0,0 +1,90 @@
+# httpcache.py
+"""Disk cache for Scrapy's HttpCacheMiddleware: feeds are revalidated, article pages reused"""
+import os
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from scrapy.extensions.httpcache import FilesystemCacheStorage, RFC2616Policy
+
+class FeedRevalidationPolicy(RFC2616Policy):
+    """RFC 2616 caching for feeds; article pages are reused until the storage expires them
+
+    Feed requests (meta['conditional_feed']) follow the server's Cache-Control
+    and are revalidated with the cached ETag/Last-Modified once stale. Article
+    pages do not change after publication, so any cached 200 is served as is,
+    whatever its headers say, for HTTPCACHE_EXPIRATION_SECS.
+    """
+
+    def is_feed(self, request) -> bool:
+        return bool(request.meta.get('conditional_feed'))
+
+    def should_cache_response(self, response, request):
+        if self.is_feed(request):
+            return super(FeedRevalidationPolicy, self).should_cache_response(response, request)
+        return response.status == 200
+
+    def is_cached_response_fresh(self, cachedresponse, request):
+        if self.is_feed(request):
+            return super(FeedRevalidationPolicy, self).is_cached_response_fresh(cachedresponse, request)
+        return True
+
+    def is_cached_response_valid(self, cachedresponse, response, request):
+        if self.is_feed(request):
+            return super(FeedRevalidationPolicy, self).is_cached_response_valid(cachedresponse, response, request)
+        return False
+
+class LRUFilesystemCacheStorage(FilesystemCacheStorage):
+    """Filesystem cache kept under HTTPCACHE_MAX_SIZE bytes by evicting the least recently used entries
+
+    Entries are Scrapy's one-directory-per-fingerprint layout (gzipped with
+    HTTPCACHE_GZIP). A hit touches the entry's directory, so directory mtimes
+    order the entries by last use and the index survives restarts.
+    """
+
+    def __init__(self, settings):
+        super(LRUFilesystemCacheStorage, self).__init__(settings)
+        self.max_size = settings.getint('HTTPCACHE_MAX_SIZE', 0)
+        self.entries = OrderedDict()  # Entry path -> size in bytes, least recently used first
+        self.size = 0
+
+    @staticmethod
+    def entry_size(path: Path) -> int:
+        return sum(file.stat().st_size for file in path.iterdir())
+
+    def open_spider(self, spider):
+        super(LRUFilesystemCacheStorage, self).open_spider(spider)
+        paths = [meta.parent for meta in Path(self.cachedir, spider.name).glob('*/*/pickled_meta')]
+        for path in sorted(paths, key=lambda path: path.stat().st_mtime):
+            self.entries[str(path)] = self.entry_size(path)
+        self.size = sum(self.entries.values())
+        self.evict(spider)
+
+    def retrieve_response(self, spider, request):
+        response = super(LRUFilesystemCacheStorage, self).retrieve_response(spider, request)
+        if response is not None:
+            path = self._get_request_path(spider, request)
+            os.utime(path)
+            if path in self.entries:
+                self.entries.move_to_end(path)
+        return response
+
+    def store_response(self, spider, request, response):
+        super(LRUFilesystemCacheStorage, self).store_response(spider, request, response)
+        path = self._get_request_path(spider, request)
+        self.size -= self.entries.pop(path, 0)
+        self.entries[path] = self.entry_size(Path(path))
+        self.size += self.entries[path]
+        self.evict(spider)
+
+    def evict(self, spider):
+        if not self.max_size:
+            return
+        evicted = 0
+        # The newest entry is never evicted, even if it alone is over the limit
+        while self.size > self.max_size and len(self.entries) > 1:
+            path, size = self.entries.popitem(last=False)
+            shutil.rmtree(path, ignore_errors=True)
+            self.size -= size
+            evicted += 1
+        if evicted:
+            spider.crawler.stats.inc_value('httpcache/evicted', evicted, spider=spider)
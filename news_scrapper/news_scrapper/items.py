@@ -9,10 +9,13 @@ class NewsArticleItem(Item):
     heading = Field()
     content = Field()
     author = Field()
-    date = Field()
+    date = Field()  # Publish date as the feed wrote it
+    published_at = Field()  # The same date as a UTC ISO 8601 timestamp
     category = Field()
     url = Field()
     source = Field()  # To identify which news site
     spider_name = Field()
     processed_at = Field()
     scrape_date = Field()
+    content_hash = Field()  # Hash of the stored fields, used to skip no-op updates
+    cluster_id = Field()  # Shared by near-duplicate articles, e.g. the same wire story on two sites
@@ -3,7 +3,15 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
-from scrapy import signals
+import random
+import time
+from scrapy import Request, signals
+from scrapy.downloadermiddlewares.retry import RetryMiddleware
+from scrapy.exceptions import IgnoreRequest
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet.task import deferLater
+from .ratelimit import TokenBucket, parse_rate
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
@@ -56,48 +64,186 @@ class NewsScrapperSpiderMiddleware:
         spider.logger.info("Spider opened: %s" % spider.name)
 
 
-class NewsScrapperDownloaderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the downloader middleware does not modify the
-    # passed objects.
+class ConditionalFeedMiddleware:
+    """Polls RSS feeds with conditional GETs and drops responses for unchanged feeds
+
+    ETag/Last-Modified validators are stored per feed URL in Redis through the
+    spider's client. A 304 Not Modified raises IgnoreRequest, so the spider
+    never parses a feed it has already seen. The same goes for a feed served
+    by the HTTP cache (fresh, or revalidated by the cache's own 304) whose
+    validators are the ones already stored.
+
+    A 200's validators are only passed on in response.meta; the spider stores
+    them once it has recorded the feed's entries, so a feed whose parse fails
+    is fetched and parsed again on the next poll instead of answered with 304.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
 
     @classmethod
     def from_crawler(cls, crawler):
-        # This method is used by Scrapy to create your spiders.
-        s = cls()
+        s = cls(crawler.stats)
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
         return s
 
-    def process_request(self, request, spider):
-        # Called for each request that goes through the downloader
-        # middleware.
-
-        # Must either:
-        # - return None: continue processing this request
-        # - or return a Response object
-        # - or return a Request object
-        # - or raise IgnoreRequest: process_exception() methods of
-        #   installed downloader middleware will be called
+    def is_feed_request(self, request, spider):
+        return request.meta.get('conditional_feed') or request.url in getattr(spider, 'start_urls', ())
+
+    def validators_key(self, request, spider):
+        return f"{request.meta.get('source', spider.name)}:feed:{request.url}"
+
+    async def process_request(self, request, spider):
+        redis_client = getattr(spider, 'redis_client', None)
+        if redis_client is None or not self.is_feed_request(request, spider):
+            return None
+
+        # Carried over to redirected requests, so the final feed URL is tracked too
+        request.meta['conditional_feed'] = True
+        validators = await redis_client.hgetall(self.validators_key(request, spider))
+        request.meta['feed_validators'] = validators
+        if validators.get(b'etag'):
+            request.headers.setdefault('If-None-Match', validators[b'etag'])
+        if validators.get(b'last_modified'):
+            request.headers.setdefault('If-Modified-Since', validators[b'last_modified'])
         return None
 
-    def process_response(self, request, response, spider):
-        # Called with the response returned from the downloader.
-
-        # Must either;
-        # - return a Response object
-        # - return a Request object
-        # - or raise IgnoreRequest
+    def is_seen_cached_feed(self, request, response):
+        """Whether a response from the HTTP cache is the feed version whose validators are stored"""
+        if 'cached' not in response.flags:
+            return False
+        stored = request.meta.get('feed_validators') or {}
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        return bool(etag and stored.get(b'etag') == etag
+                    or last_modified and stored.get(b'last_modified') == last_modified)
+
+    async def process_response(self, request, response, spider):
+        redis_client = getattr(spider, 'redis_client', None)
+        if redis_client is None or not request.meta.get('conditional_feed'):
+            return response
+
+        if response.status == 304 or self.is_seen_cached_feed(request, response):
+            self.stats.inc_value('conditional_get/not_modified', spider=spider)
+            spider.logger.info(f"Feed not modified since last poll: {request.url}")
+            raise IgnoreRequest(f"Feed not modified: {request.url}")
+
+        if response.status == 200:
+            validators = {}
+            if response.headers.get('ETag'):
+                validators['etag'] = response.headers.get('ETag')
+            if response.headers.get('Last-Modified'):
+                validators['last_modified'] = response.headers.get('Last-Modified')
+            if validators:
+                response.meta['feed_validators_key'] = self.validators_key(request, spider)
+                response.meta['new_feed_validators'] = validators
+            self.stats.inc_value('conditional_get/modified', spider=spider)
         return response
 
-    def process_exception(self, request, exception, spider):
-        # Called when a download handler or a process_request()
-        # (from other downloader middleware) raises an exception.
-
-        # Must either:
-        # - return None: continue processing this exception
-        # - return a Response object: stops process_exception() chain
-        # - return a Request object: stops process_exception() chain
-        pass
-
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class RateLimitRetryMiddleware(RetryMiddleware):
+    """Per-domain token buckets from RATE_LIMITS, and retries spaced out by exponential backoff
+
+    Replaces Scrapy's RetryMiddleware and sits last before the downloader.
+    Requests wait for their domain's token, and retries for their backoff, on
+    the reactor; while waiting they count as active in their download slot, so
+    the downloader-aware scheduler does not keep feeding a domain that is only
+    waiting. 429 and 503 responses lower the domain's rate and a run of 200s
+    raises it back towards the configured one.
+    """
+
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(self, crawler):
+        super(RateLimitRetryMiddleware, self).__init__(crawler.settings)
+        settings = crawler.settings
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.rate_limits = {domain: parse_rate(rate) for domain, rate in settings.getdict('RATE_LIMITS').items()}
+        self.default_rate = parse_rate(settings.get('RATE_LIMIT_DEFAULT', '60/m'))
+        self.burst = settings.getfloat('RATE_LIMIT_BURST', 3)
+        self.sustained = settings.getint('RATE_LIMIT_SUSTAINED', 20)
+        self.backoff_base = settings.getfloat('RETRY_BACKOFF_BASE', 10)
+        self.backoff_max = settings.getfloat('RETRY_BACKOFF_MAX', 300)
+        self.buckets = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def domain(self, request):
+        """RATE_LIMITS entry covering the request's host (subdomains included), else the host itself"""
+        host = request.meta.get('download_slot') or urlparse_cached(request).hostname or ''
+        for domain in self.rate_limits:
+            if host == domain or host.endswith('.' + domain):
+                return domain
+        return host
+
+    def bucket(self, domain):
+        if domain not in self.buckets:
+            rate = self.rate_limits.get(domain, self.default_rate)
+            self.buckets[domain] = TokenBucket(rate, burst=self.burst)
+        return self.buckets[domain]
+
+    async def wait(self, request, seconds):
+        """Wait on the reactor, counted as active in the request's download slot meanwhile"""
+        from twisted.internet import reactor
+
+        key = request.meta.get('download_slot') or urlparse_cached(request).hostname or ''
+        slot = self.crawler.engine.downloader.slots.get(key)
+        if slot is not None:
+            slot.active.add(request)
+        try:
+            await maybe_deferred_to_future(deferLater(reactor, seconds, lambda: None))
+        finally:
+            # The downloader adds it back once it takes the request
+            if slot is not None:
+                slot.active.discard(request)
+
+    async def process_request(self, request, spider):
+        retry_at = request.meta.get('retry_at')
+        if retry_at and retry_at > time.monotonic():
+            await self.wait(request, retry_at - time.monotonic())
+
+        delay = self.bucket(self.domain(request)).reserve()
+        if delay > 0:
+            self.stats.inc_value('ratelimit/delayed', spider=spider)
+            await self.wait(request, delay)
+        return None
+
+    def process_response(self, request, response, spider):
+        domain = self.domain(request)
+        bucket = self.bucket(domain)
+        if response.status in self.THROTTLE_STATUSES:
+            if bucket.slow_down():
+                self.stats.inc_value('ratelimit/slowed_down', spider=spider)
+                spider.logger.info(f"{domain} answered {response.status}, slowing to {bucket.rate * 60:.1f}/m")
+        elif response.status == 200 and bucket.record_success(self.sustained):
+            self.stats.inc_value('ratelimit/sped_up', spider=spider)
+            spider.logger.info(f"{domain} is keeping up, speeding up to {bucket.rate * 60:.1f}/m")
+
+        result = super(RateLimitRetryMiddleware, self).process_response(request, response, spider)
+        if isinstance(result, Request):
+            self.schedule_retry(result, response)
+        return result
+
+    def process_exception(self, request, exception, spider):
+        result = super(RateLimitRetryMiddleware, self).process_exception(request, exception, spider)
+        if isinstance(result, Request):
+            self.schedule_retry(result)
+        return result
+
+    def backoff(self, retry_times, response=None):
+        """Seconds before a retry: doubling per attempt with jitter, and at least the server's Retry-After"""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (retry_times - 1)) * random.uniform(0.5, 1.5)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(self.backoff_max, int(retry_after)))
+        return delay
+
+    def schedule_retry(self, request, response=None):
+        """Hold a retry back until its backoff has passed; process_request does the waiting"""
+        request.meta['retry_at'] = time.monotonic() + self.backoff(request.meta['retry_times'], response)
@@ -0,0 +1,126 @@
+# partitions.py
+"""Monthly range partitions of the news table, created on ingest and detached for retention"""
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+from .dates import parse_date
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r'^news_(\d{4})_(\d{2})$')
+
+def month_start(value) -> Optional[datetime]:
+    """First instant (UTC) of the month a timestamp or timestamp string falls in"""
+    if isinstance(value, str):
+        value = parse_date(value)
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+def next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+def months_before(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 - months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+def partition_name(month: datetime) -> str:
+    return f"news_{month.year:04d}_{month.month:02d}"
+
+def existing_partitions(cur) -> List[Tuple[str, datetime]]:
+    """Monthly partitions attached to news, as (name, month), oldest first"""
+    cur.execute("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'news'::regclass
+    """)
+    partitions = []
+    for (name,) in cur.fetchall():
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def ensure_partitions(cur, timestamps: Iterable) -> List[str]:
+    """Create the monthly partitions the timestamps fall in, if missing; returns the new partitions
+
+    Runs in the caller's transaction. Undated rows go to the default
+    partition, so None values are skipped.
+    """
+    months = {month_start(value) for value in timestamps} - {None}
+    if not months:
+        return []
+    existing = {month for _, month in existing_partitions(cur)}
+    missing = sorted(months - existing)
+    if not missing:
+        return []
+
+    # Concurrent writers may need the same month; the lock is held until the caller commits
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext('news_partitions'))")
+    created = []
+    for month in missing:
+        name = partition_name(month)
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF news FOR VALUES FROM (%s) TO (%s)",
+            (month, next_month(month))
+        )
+        created.append(name)
+    logger.info(f"Created news partitions: {', '.join(created)}")
+    return created
+
+def retention_cutoff(keep_months: int, now: Optional[datetime] = None) -> datetime:
+    """Start of the oldest month kept when the current month and keep_months - 1 before it are kept"""
+    return months_before(month_start(now or datetime.now(timezone.utc)), keep_months - 1)
+
+def detach_partitions(conn, before: datetime, drop: bool = False) -> List[str]:
+    """Detach the monthly partitions that end on or before `before`, dropping them if asked
+
+    Detaching or dropping a partition only touches the catalog, whatever its
+    size. Detached partitions are renamed <name>_archived_<timestamp> so the
+    month can be recreated (and expired again) if an old article is scraped
+    again. Their URLs are then removed from the news_urls registry, so such
+    articles are inserted rather than updated; see expire_urls.
+    """
+    cutoff = month_start(before)
+    archived_on = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+    detached = []
+    with conn.cursor() as cur:
+        for name, month in existing_partitions(cur):
+            if next_month(month) > cutoff:
+                break
+            cur.execute(f"ALTER TABLE news DETACH PARTITION {name}")
+            if drop:
+                cur.execute(f"DROP TABLE {name}")
+            else:
+                cur.execute(f"ALTER TABLE {name} RENAME TO {name}_archived_{archived_on}")
+            detached.append(name)
+    conn.commit()
+    if detached:
+        logger.info(f"{'Dropped' if drop else 'Detached'} news partitions: {', '.join(detached)}")
+    # Also run when nothing was detached, to finish a run that failed after its detach committed
+    expire_urls(conn, cutoff)
+    return detached
+
+def expire_urls(conn, before: datetime, batch_size: int = 10000) -> int:
+    """Remove URLs published before `before` from news_urls, committing every batch_size rows
+
+    Unlike detaching, this costs time proportional to the number of expired
+    URLs, so it runs after the detach has committed and in batches, keeping
+    each transaction's locks and WAL small. Returns the number removed.
+    """
+    removed = 0
+    while True:
+        with conn.cursor() as cur:
+            cur.execute("""
+                DELETE FROM news_urls
+                WHERE url IN (SELECT url FROM news_urls WHERE published_at < %s LIMIT %s)
+            """, (before, batch_size))
+            count = cur.rowcount
+        conn.commit()
+        removed += count
+        if count < batch_size:
+            return removed
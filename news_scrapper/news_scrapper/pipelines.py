@@ -5,6 +5,29 @@ from itemadapter import ItemAdapter
 import logging
 import os
 import json
+import gzip
+import hashlib
+import time
+import psycopg2
+import redis
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet.defer import Deferred
+from twisted.internet.threads import deferToThread
+from .cache import invalidate
+from .exports import recover_part_files
+from .db import configure_pool, close_pool, connection, create_schema, upsert_article_batch
+from .simhash import simhash, hamming_distance, bands
+
+logger = logging.getLogger(__name__)
+
+# Fields that make up an article's stored content; processed_at/spider_name are excluded
+HASHED_FIELDS = ['heading', 'content', 'author', 'category', 'date']
+
+def compute_content_hash(article) -> str:
+    """Stable SHA-256 of the article's stored content, used to skip no-op updates"""
+    payload = json.dumps([article.get(field) for field in HASHED_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
 class NewsValidationPipeline:
     """Validates and cleans article data"""
@@ -30,25 +53,372 @@ class NewsValidationPipeline:
 
         # Add metadata
         adapter['processed_at'] = datetime.now().isoformat()
-        adapter['spider_name'] = spider.name
+        # Spiders crawling several feeds set the source on the item themselves
+        adapter['spider_name'] = adapter.get('spider_name') or spider.name
+        adapter['content_hash'] = compute_content_hash(adapter)
         
         return item
 
+class NearDuplicatePipeline:
+    """Clusters near-duplicate articles across sources by SimHash of their content
+
+    Each signature is split into max_distance + 1 bands and indexed in Redis
+    (through the spider's client) under one small hash per band value. Two
+    signatures within max_distance bits share at least one band, so a lookup
+    reads max_distance + 1 buckets instead of comparing against every article.
+    Matches take the cluster_id of the closest indexed article; anything else
+    starts a cluster named after its own signature.
+    """
+
+    def __init__(self, max_distance=3, expiry=30 * 86400, key_prefix='news:simhash', stats=None):
+        self.max_distance = max_distance
+        self.expiry = expiry
+        self.key_prefix = key_prefix
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            max_distance=settings.getint('NEAR_DUPLICATE_MAX_DISTANCE', 3),
+            expiry=settings.getint('NEAR_DUPLICATE_EXPIRY', 30 * 86400),
+            stats=crawler.stats
+        )
+
+    def band_keys(self, signature):
+        return [
+            f"{self.key_prefix}:{index}:{value:x}"
+            for index, value in enumerate(bands(signature, self.max_distance + 1))
+        ]
+
+    async def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        signature = simhash(adapter.get('content') or '')
+        member = f"{signature:016x}"
+        redis_client = getattr(spider, 'redis_client', None)
+        if redis_client is None:
+            adapter['cluster_id'] = member
+            return item
+
+        keys = self.band_keys(signature)
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        buckets = await pipe.execute()
+
+        closest = None
+        for bucket in buckets:
+            for candidate, cluster_id in bucket.items():
+                distance = hamming_distance(signature, int(candidate, 16))
+                if distance <= self.max_distance and (closest is None or distance < closest[0]):
+                    closest = (distance, cluster_id.decode() if isinstance(cluster_id, bytes) else cluster_id)
+
+        adapter['cluster_id'] = closest[1] if closest else member
+        if closest and self.stats is not None:
+            self.stats.inc_value('near_duplicate/matched', spider=spider)
+
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hset(key, member, adapter['cluster_id'])
+            pipe.expire(key, self.expiry)
+        await pipe.execute()
+        return item
+
+def export_path(export_dir, source, extension):
+    """Path of a new <source>_<YYYY-MM-DD_HHMMSS>.<extension> export, unique in export_dir"""
+    stamp = f"{datetime.now():%Y-%m-%d_%H%M%S}"
+    path = f"{export_dir}/{source}_{stamp}.{extension}"
+    # Files opened within the same second, e.g. on a quick rotation, get a counter
+    count = 1
+    while os.path.exists(path) or os.path.exists(path + '.part'):
+        path = f"{export_dir}/{source}_{stamp}-{count}.{extension}"
+        count += 1
+    return path
+
+class ExportFile:
+    """One open JSON Lines export file and its write counters
+
+    Written under a '.part' name and renamed on close, so readers only ever
+    see finished files.
+    """
+
+    def __init__(self, path, compression=None):
+        self.path = path
+        self.items = 0
+        self.unflushed = 0
+        self.opened_at = time.monotonic()
+        if compression == 'gz':
+            self.file = gzip.open(path + '.part', 'wt', encoding='utf-8')
+        else:
+            self.file = open(path + '.part', 'w', encoding='utf-8')
+
+    def write(self, item, flush_every):
+        self.file.write(json.dumps(item, ensure_ascii=False) + '\n')
+        self.items += 1
+        self.unflushed += 1
+        if self.unflushed >= flush_every:
+            self.file.flush()
+            self.unflushed = 0
+
+    def close(self):
+        """Close the file, publishing it, or discarding it if nothing was written"""
+        self.file.close()
+        if self.items:
+            os.replace(self.path + '.part', self.path)
+        else:
+            os.remove(self.path + '.part')
+
 class JsonExportPipeline:
-    """Exports articles to JSON files organized by date and source"""
+    """Exports articles to JSON files organized by date and source
+
+    Each source gets its own files, named after the item's spider_name, so a
+    spider crawling many feeds still hands the ingest flow one set per source.
+    The 'jsonl' format streams each item as one (optionally gzipped) line;
+    'json' buffers all items and writes a single list when the spider closes.
+    Every run writes its own timestamped files, under a '.part' name until
+    they are closed, so the ingest flow never loads a half-written file and a
+    re-run never touches one that is being loaded. A '.part' file left by a
+    killed run is published by the next run of its source once stale_after
+    seconds have passed. With rotate_interval set, a new file is started
+    every interval, so long-running spiders hand over finished files while
+    they keep scraping.
+    """
     
-    def __init__(self):
+    def __init__(self, export_dir='data/articles', export_format='json', compression=None, flush_every=20,
+                 rotate_interval=0, stale_after=3600):
         self.items = []
-        self.export_dir = 'data/articles'
+        self.stale_after = stale_after
+        self.export_dir = export_dir
+        self.export_format = export_format
+        self.compression = compression
+        self.flush_every = flush_every
+        self.rotate_interval = rotate_interval
+        self.files = {}
         os.makedirs(self.export_dir, exist_ok=True)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        pipeline = cls(
+            export_dir=settings.get('EXPORT_DIR', 'data/articles'),
+            export_format=settings.get('EXPORT_FORMAT', 'json'),
+            compression=settings.get('EXPORT_COMPRESSION'),
+            flush_every=settings.getint('EXPORT_FLUSH_EVERY', 20),
+            rotate_interval=settings.getfloat('EXPORT_ROTATE_INTERVAL', 0),
+            stale_after=settings.getfloat('EXPORT_STALE_AFTER', 3600)
+        )
+        # Idle polling spiders still need their last file handed over on time
+        crawler.signals.connect(pipeline.spider_idle, signal=signals.spider_idle)
+        return pipeline
+
+    def export_path(self, source):
+        extension = self.export_format
+        if self.export_format == 'jsonl' and self.compression == 'gz':
+            extension += '.gz'
+        return export_path(self.export_dir, source, extension)
+
+    def open_file(self, source):
+        self.files[source] = ExportFile(self.export_path(source), self.compression)
+        return self.files[source]
+
+    def open_spider(self, spider):
+        # Files are opened per source when its first item arrives
+        self.files = {}
+        # Hand over what an earlier, killed run of these sources left unpublished
+        sources = list(getattr(spider, 'specs', None) or [spider.name])
+        recover_part_files(self.export_dir, sources, max(self.stale_after, 2 * self.rotate_interval))
+
+    def rotate_if_due(self):
+        if not self.rotate_interval:
+            return
+        for source, export_file in list(self.files.items()):
+            if time.monotonic() - export_file.opened_at >= self.rotate_interval:
+                export_file.close()
+                self.open_file(source)
+
+    def spider_idle(self, spider):
+        self.rotate_if_due()
     
     def process_item(self, item, spider):
-        self.items.append(dict(item))
+        source = ItemAdapter(item).get('spider_name') or spider.name
+        if self.export_format != 'jsonl':
+            self.items.append(dict(item))
+            return item
+
+        export_file = self.files.get(source) or self.open_file(source)
+        export_file.write(dict(item), self.flush_every)
+        self.rotate_if_due()
         return item
     
     def close_spider(self, spider):
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        filename = f"{self.export_dir}/{spider.name}_{date_str}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(self.items, f, indent=4)
\ No newline at end of file
+        if self.export_format == 'jsonl':
+            for export_file in self.files.values():
+                export_file.close()
+            self.files.clear()
+            return
+
+        by_source = {}
+        for item in self.items:
+            by_source.setdefault(item.get('spider_name') or spider.name, []).append(item)
+        for source, items in by_source.items():
+            path = self.export_path(source)
+            with open(path + '.part', 'w') as f:
+                json.dump(items, f, indent=4)
+            os.replace(path + '.part', path)
+
+class PostgresPipeline:
+    """Upserts validated articles straight into Postgres in batches, off the reactor thread
+
+    Items are buffered and written batch_size at a time by one writer on
+    Twisted's thread pool, so articles are queryable seconds after they are
+    scraped. At most max_pending batches wait for the writer; once the queue
+    is full, process_item returns a Deferred that fires when a batch has been
+    written, which holds the item, and with it the crawl, back until the
+    database catches up. Buffered items are also written every flush_interval
+    seconds (and when the spider goes idle), and close_spider waits for the
+    last of them. Batches that insert or change articles invalidate the read
+    API's cache in the Redis at redis_config, the one the API reads. A batch
+    still failing after its retries is written to failed_dir as a JSON Lines
+    export, which the ingest flow loads like any other.
+    """
+
+    def __init__(self, db_config, pool_config=None, batch_size=100, max_pending=4, flush_interval=5.0,
+                 retries=2, stats=None, redis_config=None, failed_dir='data/articles'):
+        self.db_config = db_config
+        self.failed_dir = failed_dir
+        self.pool_config = pool_config or {}
+        # Connects on first use, from the writer thread
+        self.redis_client = redis.Redis(**redis_config) if redis_config else None
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.stats = stats
+        self.buffer = []
+        self.queue = []
+        self.waiters = []
+        self.writing = None
+        self.drained = None
+        self.last_flush = time.monotonic()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('DB_PIPELINE_ENABLED'):
+            raise NotConfigured
+        pipeline = cls(
+            db_config=settings.getdict('DB_CONFIG'),
+            pool_config=settings.getdict('DB_POOL_CONFIG'),
+            batch_size=settings.getint('DB_PIPELINE_BATCH_SIZE', 100),
+            max_pending=settings.getint('DB_PIPELINE_MAX_PENDING', 4),
+            flush_interval=settings.getfloat('DB_PIPELINE_FLUSH_INTERVAL', 5.0),
+            retries=settings.getint('DB_PIPELINE_RETRIES', 2),
+            stats=crawler.stats,
+            redis_config=settings.getdict('REDIS_CONFIG'),
+            failed_dir=settings.get('EXPORT_DIR', 'data/articles')
+        )
+        crawler.signals.connect(pipeline.spider_idle, signal=signals.spider_idle)
+        return pipeline
+
+    def open_spider(self, spider):
+        configure_pool(self.db_config, **self.pool_config)
+        with connection() as conn:
+            create_schema(conn)
+
+    def write_batch(self, batch):
+        """Upsert one batch; runs on a worker thread and retries dropped connections"""
+        for attempt in range(self.retries + 1):
+            try:
+                with connection() as conn:
+                    counts = upsert_article_batch(conn, batch)
+                break
+            except psycopg2.OperationalError:
+                if attempt == self.retries:
+                    raise
+                time.sleep(2 ** attempt)
+        if self.redis_client is not None and (counts.get('inserted') or counts.get('updated')):
+            # Runs on the writer thread
+            invalidate(self.redis_client, logger)
+        return counts
+
+    def process_item(self, item, spider):
+        if len(self.queue) >= self.max_pending:
+            # Backpressure: the item waits for the writer, then tries again
+            waiter = Deferred()
+            self.waiters.append(waiter)
+            return waiter.addCallback(lambda _: self.process_item(item, spider))
+
+        self.buffer.append(dict(item))
+        if len(self.buffer) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush(spider)
+        return item
+
+    def flush(self, spider):
+        """Queue the buffered items as a batch and start the writer if it is free"""
+        self.last_flush = time.monotonic()
+        if self.buffer:
+            self.queue.append(self.buffer)
+            self.buffer = []
+        self.write_next(spider)
+
+    def write_next(self, spider):
+        if self.writing is not None:
+            return
+        if not self.queue:
+            if self.drained is not None:
+                self.drained.callback(None)
+            return
+        self.writing = deferToThread(self.write_batch, self.queue[0])
+        self.writing.addCallbacks(self.batch_written, self.batch_failed, callbackArgs=(spider,), errbackArgs=(spider,))
+
+    def batch_written(self, counts, spider):
+        if self.stats is not None:
+            for key, value in counts.items():
+                self.stats.inc_value(f'db_pipeline/{key}', value, spider=spider)
+        self.next_batch(spider)
+
+    def batch_failed(self, failure, spider):
+        batch = self.queue[0]
+        if self.stats is not None:
+            self.stats.inc_value('db_pipeline/failed', len(batch), spider=spider)
+        spider.logger.error(f"Writing {len(batch)} articles to Postgres failed: {failure.value!r}")
+        try:
+            paths = self.save_failed_batch(batch, spider)
+        except OSError as e:
+            spider.logger.error(f"Could not save the failed batch for ingestion: {e!r}")
+        else:
+            spider.logger.info(f"Saved the failed batch for the ingest flow to {', '.join(paths)}")
+        self.next_batch(spider)
+
+    def save_failed_batch(self, batch, spider):
+        """Write a batch per source to failed_dir as exports the ingest flow picks up; returns their paths"""
+        os.makedirs(self.failed_dir, exist_ok=True)
+        by_source = {}
+        for item in batch:
+            by_source.setdefault(item.get('spider_name') or spider.name, []).append(item)
+        paths = []
+        for source, items in by_source.items():
+            export_file = ExportFile(export_path(self.failed_dir, source, 'jsonl'))
+            for item in items:
+                export_file.write(item, flush_every=len(items))
+            export_file.close()
+            paths.append(export_file.path)
+        return paths
+
+    def next_batch(self, spider):
+        self.queue.pop(0)
+        self.writing = None
+        waiters, self.waiters = self.waiters, []
+        for waiter in waiters:
+            waiter.callback(None)
+        self.write_next(spider)
+
+    def spider_idle(self, spider):
+        if self.buffer and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush(spider)
+
+    def close_spider(self, spider):
+        self.drained = Deferred()
+        self.drained.addCallback(lambda _: close_pool())
+        self.flush(spider)
+        return self.drained
@@ -0,0 +1,66 @@
+# ratelimit.py
+"""Per-domain request rates from config.RATE_LIMITS, e.g. '10/m' for ten requests a minute"""
+import time
+
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 3600}
+
+def parse_rate(rate: str) -> float:
+    """Requests per second for a rate written as '<count>/<s|m|h>'"""
+    try:
+        count, period = rate.strip().split('/')
+        return float(count) / RATE_PERIODS[period.strip().lower()[:1]]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit: {rate!r}") from None
+
+class TokenBucket:
+    """Token bucket for one domain, with a refill rate that adapts to how the server responds
+
+    Each request takes a token; tokens refill at `rate` per second up to
+    `burst`, so an idle domain gets a few requests out at once and a busy one
+    settles at `rate`. A reservation may take the bucket below zero, which
+    queues callers one refill interval apart instead of waking them together.
+    The rate is lowered on throttling responses and raised back towards the
+    configured rate, never above it, after a run of successes.
+    """
+
+    def __init__(self, rate: float, burst: float = 1, min_rate: float = None, clock=time.monotonic):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        self.successes = 0
+
+    def refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token, returning the seconds to wait before it may be used"""
+        self.refill()
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def slow_down(self, factor: float = 2) -> bool:
+        """Divide the rate after a throttling response; False if it is already at the floor"""
+        self.refill()
+        self.successes = 0
+        # Spend any saved-up burst so the lower rate applies straight away
+        self.tokens = min(self.tokens, 0)
+        if self.rate <= self.min_rate:
+            return False
+        self.rate = max(self.min_rate, self.rate / factor)
+        return True
+
+    def record_success(self, sustained: int = 20, factor: float = 1.25) -> bool:
+        """Count a successful response, raising the rate after `sustained` in a row; True if it rose"""
+        self.successes += 1
+        if self.successes < sustained or self.rate >= self.max_rate:
+            return False
+        self.refill()
+        self.successes = 0
+        self.rate = min(self.max_rate, self.rate * factor)
+        return True
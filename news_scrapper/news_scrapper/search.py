@@ -0,0 +1,68 @@
+# search.py
+"""Ranked full-text search over the news table's search_vector column"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+SEARCH_CONFIG = 'english'  # Text search configuration used by news.search_vector
+MAX_PER_PAGE = 100
+
+# Candidates are ranked and paged first; snippets are only built for the rows returned
+SEARCH_QUERY = """
+WITH matches AS (
+    SELECT id, heading, content, url, spider_name, category, published_at,
+           ts_rank_cd(search_vector, query) AS rank
+    FROM news, websearch_to_tsquery('{config}', %(query)s) AS query
+    WHERE {conditions}
+    ORDER BY rank DESC, published_at DESC NULLS LAST, id DESC
+    LIMIT %(limit)s OFFSET %(offset)s
+)
+SELECT id, heading, url, spider_name, category, published_at, rank,
+       ts_headline('{config}', coalesce(content, ''), websearch_to_tsquery('{config}', %(query)s),
+                   'MaxFragments=2, MinWords=10, MaxWords=30') AS snippet
+FROM matches
+ORDER BY rank DESC, published_at DESC NULLS LAST, id DESC
+"""
+
+def search_articles(
+    conn,
+    query: str,
+    spider_name: Optional[str] = None,
+    category: Optional[str] = None,
+    since: Optional[Union[str, datetime]] = None,
+    until: Optional[Union[str, datetime]] = None,
+    page: int = 1,
+    per_page: int = 20
+) -> List[Dict[str, Any]]:
+    """Articles matching a web-search style query ("quoted phrases", -excluded, or), best first
+
+    Filters are exact matches on spider_name and category and a
+    [since, until) range on published_at, which also limits the search to
+    the partitions for those months.
+    """
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    params = {
+        'query': query,
+        'spider_name': spider_name,
+        'category': category,
+        'since': since,
+        'until': until,
+        'limit': per_page,
+        'offset': (max(page, 1) - 1) * per_page
+    }
+    conditions = ['search_vector @@ query']
+    if spider_name:
+        conditions.append('spider_name = %(spider_name)s')
+    if category:
+        conditions.append('category = %(category)s')
+    if since:
+        conditions.append('published_at >= %(since)s::timestamptz')
+    if until:
+        conditions.append('published_at < %(until)s::timestamptz')
+
+    sql = SEARCH_QUERY.format(config=SEARCH_CONFIG, conditions=' AND '.join(conditions))
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        columns = [column.name for column in cur.description]
+        results = [dict(zip(columns, row)) for row in cur.fetchall()]
+    conn.rollback()  # Read-only; return the connection without an open transaction
+    return results
@@ -7,6 +7,9 @@
 #     https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #     https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import os
+import config
+
 BOT_NAME = "news_scrapper"
 
 SPIDER_MODULES = ["news_scrapper.spiders"]
@@ -14,9 +17,70 @@ NEWSPIDER_MODULE = "news_scrapper.spiders"
 
 ITEM_PIPELINES = {
     'news_scrapper.pipelines.NewsValidationPipeline': 200,
+    'news_scrapper.pipelines.NearDuplicatePipeline': 300,
     'news_scrapper.pipelines.JsonExportPipeline': 400,
+    'news_scrapper.pipelines.PostgresPipeline': 500,
 }
 
+# Article export used by JsonExportPipeline ('jsonl' streams one item per line)
+EXPORT_DIR = 'data/articles'
+EXPORT_FORMAT = config.SCRAPER_CONFIG['export']['format']
+EXPORT_COMPRESSION = config.SCRAPER_CONFIG['export']['compression']
+EXPORT_FLUSH_EVERY = config.SCRAPER_CONFIG['export']['flush_every']
+# Seconds per export file; 0 writes one file per source per run
+EXPORT_ROTATE_INTERVAL = 0
+# Seconds before a '.part' file left by a killed spider is published by the next run
+EXPORT_STALE_AFTER = config.SCRAPER_CONFIG['export']['stale_after']
+
+# Direct writes to Postgres (DB_CONFIG/DB_POOL_CONFIG), so articles are
+# queryable seconds after scraping; the JSON export can then be dropped from ITEM_PIPELINES.
+# Batches wait in a queue of at most DB_PIPELINE_MAX_PENDING before the crawl is held back.
+# A batch still failing after DB_PIPELINE_RETRIES is written to EXPORT_DIR, so keep the ingest
+# flow (news_ingest) running to load it
+DB_PIPELINE_ENABLED = os.environ.get('DB_PIPELINE_ENABLED', '').lower() in ('1', 'true', 'yes')
+DB_PIPELINE_BATCH_SIZE = 100
+DB_PIPELINE_MAX_PENDING = 4
+DB_PIPELINE_FLUSH_INTERVAL = 5  # Seconds a partial batch may wait
+DB_PIPELINE_RETRIES = 2
+DB_CONFIG = config.DB_CONFIG
+DB_POOL_CONFIG = config.DB_POOL_CONFIG
+
+# Redis used by the spiders for dedup and watermarks, and by PostgresPipeline to invalidate
+# the read API's cache
+REDIS_CONFIG = config.REDIS_CONFIG
+
+# Scraped-URL store: 'redis' keeps one expiring key per URL, 'bloom' keeps months of history in Redis bitmaps
+DEDUP_BACKEND = 'redis'
+
+# Near-duplicate clustering: SimHash bits two articles may differ by, and how long signatures are indexed
+NEAR_DUPLICATE_MAX_DISTANCE = 3
+NEAR_DUPLICATE_EXPIRY = 30 * 86400
+
+# Feed polling intervals, used by spiders started with -a poll=1
+POLL_INITIAL_INTERVAL = config.SCRAPER_CONFIG['polling']['initial_interval']
+POLL_MIN_INTERVAL = config.SCRAPER_CONFIG['polling']['min_interval']
+POLL_MAX_INTERVAL = config.SCRAPER_CONFIG['polling']['max_interval']
+POLL_BACKOFF = config.SCRAPER_CONFIG['polling']['backoff']
+
+# One download slot per source domain (spiders set meta['download_slot']); the scheduler hands
+# out requests for the least busy slots, so a slow outlet only holds up its own queue
+SCHEDULER_PRIORITY_QUEUE = 'scrapy.pqueues.DownloaderAwarePriorityQueue'
+CONCURRENT_REQUESTS = config.SCRAPER_CONFIG['concurrent_requests']
+CONCURRENT_REQUESTS_PER_DOMAIN = config.SCRAPER_CONFIG['per_domain_concurrency']
+
+# Token buckets per domain, rates from RATE_LIMITS and RATE_LIMIT_DEFAULT for other domains;
+# they adapt to 429/503 and sustained 200s
+RATE_LIMITS = config.RATE_LIMITS
+RATE_LIMIT_DEFAULT = '60/m'
+RATE_LIMIT_BURST = 3
+RATE_LIMIT_SUSTAINED = 20  # 200s in a row before a slowed-down domain speeds up again
+
+# Retries with exponential backoff and jitter, from RETRY_BACKOFF_BASE seconds up to RETRY_BACKOFF_MAX
+RETRY_TIMES = config.RETRY_CONFIG['max_retries']
+RETRY_HTTP_CODES = config.RETRY_CONFIG['retry_statuses']
+RETRY_BACKOFF_BASE = config.RETRY_CONFIG['retry_delay']
+RETRY_BACKOFF_MAX = 300
+
 SQLITE_DB_PATH = 'news_articles.db'
 # Crawl responsibly by identifying yourself (and your website) on the user-agent
 #USER_AGENT = "news_scrapper (+http://www.yourdomain.com)"
@@ -55,9 +119,12 @@ ROBOTSTXT_OBEY = True
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    "news_scrapper.middlewares.NewsScrapperDownloaderMiddleware": 543,
-#}
+DOWNLOADER_MIDDLEWARES = {
+    "news_scrapper.middlewares.ConditionalFeedMiddleware": 543,
+    # Replaced by RateLimitRetryMiddleware, which runs last so waiting happens right before download
+    "scrapy.downloadermiddlewares.retry.RetryMiddleware": None,
+    "news_scrapper.middlewares.RateLimitRetryMiddleware": 950,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
@@ -84,13 +151,18 @@ ROBOTSTXT_OBEY = True
 # Enable showing throttling stats for every response received:
 #AUTOTHROTTLE_DEBUG = False
 
-# Enable and configure HTTP caching (disabled by default)
+# Local HTTP cache, so re-runs and parser development read pages from disk instead of the sites.
+# Feeds are revalidated RFC 2616-style (ConditionalFeedMiddleware still skips unchanged ones),
+# article pages are reused until they expire; bodies are gzipped and the least recently used
+# entries are evicted beyond HTTPCACHE_MAX_SIZE bytes
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-#HTTPCACHE_ENABLED = True
-#HTTPCACHE_EXPIRATION_SECS = 0
-#HTTPCACHE_DIR = "httpcache"
-#HTTPCACHE_IGNORE_HTTP_CODES = []
-#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+HTTPCACHE_ENABLED = True
+HTTPCACHE_EXPIRATION_SECS = 7 * 86400
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_GZIP = True
+HTTPCACHE_MAX_SIZE = 512 * 1024 * 1024
+HTTPCACHE_STORAGE = "news_scrapper.httpcache.LRUFilesystemCacheStorage"
+HTTPCACHE_POLICY = "news_scrapper.httpcache.FeedRevalidationPolicy"
 
 # Set settings whose default value is deprecated to a future-proof value
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.7"
@@ -0,0 +1,32 @@
+# simhash.py
+"""64-bit SimHash signatures and band keys for finding near-duplicate article text"""
+import hashlib
+import re
+from collections import Counter
+from typing import List
+
+SIMHASH_BITS = 64
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+def simhash(text: str) -> int:
+    """SimHash of the text's words weighted by frequency; similar texts differ in few bits
+
+    Single words rather than word n-grams keep a changed dateline or an agency
+    credit from flipping more than a bit or two.
+    """
+    weights = [0] * SIMHASH_BITS
+    for word, count in Counter(WORD_RE.findall(text.lower())).items():
+        value = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+def bands(signature: int, count: int) -> List[int]:
+    """Split a signature into count equal bands; signatures within count - 1 bits share a band"""
+    width = SIMHASH_BITS // count
+    mask = (1 << width) - 1
+    return [signature >> (i * width) & mask for i in range(count)]
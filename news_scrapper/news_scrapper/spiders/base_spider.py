@@ -1,15 +1,24 @@
 # base_spider.py
-import redis
-from scrapy import Spider, Request
-from datetime import datetime
+import redis.asyncio as aioredis
+import feedparser
+from scrapy import Spider, Request, signals
+from scrapy.exceptions import DontCloseSpider, IgnoreRequest
+from datetime import datetime, timezone
 import logging
 from scrapy.utils.log import configure_logging
+import calendar
 import json
 from collections import defaultdict
 import os
-from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+import time
+from abc import ABC
+from typing import Optional, Dict, Any, List, Set, Tuple
 from dataclasses import dataclass
+from ..dates import parse_date
+from ..dedup import DedupBackend, RedisKeyDedup, BloomFilterDedup
+from ..extractors import extract_text
+from ..feeds import FeedSpec
+from ..items import NewsArticleItem
 
 @dataclass
 class SpiderConfig:
@@ -20,9 +29,24 @@ class SpiderConfig:
     redis_host: str = 'localhost'
     redis_port: int = 6379
     redis_db: int = 0
+    redis_max_connections: int = 10
     url_expiry: int = 86400
+    dedup_backend: str = 'redis'        # 'redis' (one key per URL) or 'bloom'
+    bloom_capacity: int = 50000         # URLs per bloom window
+    bloom_error_rate: float = 0.001
+    bloom_window: int = 30 * 86400      # Seconds per bloom window
+    bloom_windows: int = 6              # Windows kept, i.e. months of history
     concurrent_requests: int = 16
     download_delay: float = 2.0
+    feed_first: bool = True
+    min_feed_content_length: int = 500
+    extractor: str = 'lxml'             # HTML text extractor: 'lxml', or 'bs4' for BeautifulSoup
+    mark_batch_size: int = 50
+    mark_flush_interval: float = 5.0
+    poll_initial_interval: float = 120.0
+    poll_min_interval: float = 60.0
+    poll_max_interval: float = 900.0
+    poll_backoff: float = 1.5
     
     @property
     def custom_settings(self) -> Dict[str, Any]:
@@ -44,7 +68,41 @@ class NewsSpiderBase(Spider, ABC):
         
         super(NewsSpiderBase, self).__init__(*args, **kwargs)
 
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(NewsSpiderBase, cls).from_crawler(crawler, *args, **kwargs)
+        settings = crawler.settings
+        spider.config.poll_initial_interval = settings.getfloat('POLL_INITIAL_INTERVAL', spider.config.poll_initial_interval)
+        spider.config.poll_min_interval = settings.getfloat('POLL_MIN_INTERVAL', spider.config.poll_min_interval)
+        spider.config.poll_max_interval = settings.getfloat('POLL_MAX_INTERVAL', spider.config.poll_max_interval)
+        spider.config.poll_backoff = settings.getfloat('POLL_BACKOFF', spider.config.poll_backoff)
+        spider.config.dedup_backend = settings.get('DEDUP_BACKEND', spider.config.dedup_backend)
+        # The same Redis as the read API and the pipelines; defaults to localhost without REDIS_CONFIG
+        redis_config = settings.getdict('REDIS_CONFIG')
+        spider.config.redis_host = redis_config.get('host', spider.config.redis_host)
+        spider.config.redis_port = redis_config.get('port', spider.config.redis_port)
+        spider.config.redis_db = redis_config.get('db', spider.config.redis_db)
+        spider.create_redis_client()
+        spider.dedup = spider.create_dedup_backend()
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        return spider
         
+    def initialize_spec(self, spec: FeedSpec) -> None:
+        """Initialize the spider for the source described by a feed spec"""
+        self.initialize_specs([spec])
+
+    def initialize_specs(self, specs: List[FeedSpec]) -> None:
+        """Initialize the spider to crawl the feeds of several sources together"""
+        self.specs = {spec.name: spec for spec in specs}
+        self.feed_specs = {spec.feed_url: spec for spec in specs}
+        # Single-source spiders fall back to their spec for responses without a source
+        self.spec = specs[0] if len(specs) == 1 else None
+        self.initialize(SpiderConfig(
+            name=self.name,
+            allowed_domains=sorted({spec.domain for spec in specs}),
+            start_urls=[spec.feed_url for spec in specs]
+        ))
+
     def initialize(self, config: SpiderConfig) -> None:
         """Initialize spider with configuration"""
 
@@ -54,9 +112,16 @@ class NewsSpiderBase(Spider, ABC):
         self.start_urls = config.start_urls
         self.custom_settings = config.custom_settings
         
-        # Initialize Redis
-        
-        self.redis_client = redis.Redis(host='localhost', port=6379, db=0) # Changed 'redis' to 'localhost'
+        self.create_redis_client()
+        self.dedup = self.create_dedup_backend()
+        self._pending_marks: List[Tuple[str, str]] = []  # (source, url)
+        self._last_mark_flush = time.monotonic()
+        self._article_requests: Set[str] = set()  # Links whose page is being downloaded
+
+        # Polling mode (-a poll=1) keeps the spider open and re-fetches each feed on its own interval
+        self.polling = str(getattr(self, 'poll', False)).lower() in ('1', 'true', 'yes')
+        self.poll_intervals = {}
+        self._poll_calls = {}
         
         self.today = datetime.now().date()
         self.stats = defaultdict(int)
@@ -90,35 +155,376 @@ class NewsSpiderBase(Spider, ABC):
         logger.addHandler(fh)
         logger.setLevel(logging.DEBUG)
 
-    def is_article_scraped(self, url: str) -> bool:
-        """Check if article URL exists in Redis"""
-        if not self.redis_client:
-            return False
-        return bool(self.redis_client.get(f"{self.name}:url:{url}"))
-
-    def mark_article_scraped(self, url: str) -> None:
-        """Mark URL as scraped in Redis with expiration"""
-        if self.redis_client:
-            self.redis_client.setex(
-                f"{self.name}:url:{url}",
-                self.config.url_expiry,
-                "1"
+    def create_redis_client(self) -> None:
+        """Redis client for config's host; connections are opened lazily on the reactor's asyncio loop"""
+        self.redis_pool = aioredis.ConnectionPool(
+            host=self.config.redis_host,
+            port=self.config.redis_port,
+            db=self.config.redis_db,
+            max_connections=self.config.redis_max_connections
+        )
+        self.redis_client = aioredis.Redis(connection_pool=self.redis_pool)
+
+    def create_dedup_backend(self) -> DedupBackend:
+        """Build the scraped-URL store selected by config.dedup_backend"""
+        if self.config.dedup_backend == 'bloom':
+            return BloomFilterDedup(
+                self.redis_client,
+                capacity=self.config.bloom_capacity,
+                error_rate=self.config.bloom_error_rate,
+                window=self.config.bloom_window,
+                windows=self.config.bloom_windows
             )
+        if self.config.dedup_backend == 'redis':
+            return RedisKeyDedup(self.redis_client, self.config.url_expiry)
+        raise ValueError(f"Unknown dedup backend: {self.config.dedup_backend}")
+
+    def source_meta(self, spec: FeedSpec) -> Dict[str, str]:
+        """Request meta tying a request to its source and to the source domain's download slot"""
+        return {'source': spec.name, 'download_slot': spec.domain}
+
+    def spec_for(self, response) -> Optional[FeedSpec]:
+        """Spec of the source a response was requested for"""
+        source = response.request.meta.get('source') if response.request is not None else None
+        if source in self.specs:
+            return self.specs[source]
+        return self.feed_specs.get(response.url, self.spec)
+
+    async def is_article_scraped(self, url: str, source: Optional[str] = None) -> bool:
+        """Check if article URL exists in Redis"""
+        return not await self.filter_unscraped([url], source)
+
+    async def filter_unscraped(self, urls: List[str], source: Optional[str] = None) -> List[str]:
+        """Return the URLs not yet scraped, checked with a single dedup round-trip"""
+        source = source or self.name
+        pending = {url for pending_source, url in self._pending_marks if pending_source == source}
+        return await self.dedup.filter_unseen(source, [url for url in urls if url not in pending])
+
+    def watermark_key(self, feed_url: str, source: Optional[str] = None) -> str:
+        """Redis hash holding the newest publish time, known-scraped links and pending links of a feed"""
+        return f"{source or self.name}:watermark:{feed_url}"
+
+    @staticmethod
+    def entry_timestamp(entry) -> Optional[float]:
+        """Publish time of a feed entry as a UTC epoch, if the feed gave one"""
+        published = entry.get('published_parsed') if entry else None
+        return calendar.timegm(published) if published else None
+
+    async def load_watermark(self, feed_url: str,
+                             source: Optional[str] = None) -> Tuple[Optional[float], Set[str], Set[str]]:
+        watermark = await self.redis_client.hgetall(self.watermark_key(feed_url, source))
+        published = float(watermark[b'published']) if watermark.get(b'published') else None
+        links = set(json.loads(watermark[b'links'])) if watermark.get(b'links') else set()
+        pending = set(json.loads(watermark[b'pending'])) if watermark.get(b'pending') else set()
+        return published, links, pending
+
+    async def save_watermark(self, feed_url: str, published: Optional[float], links: Set[str],
+                             source: Optional[str] = None, pending: Set[str] = frozenset()) -> None:
+        key = self.watermark_key(feed_url, source)
+        mapping = {'links': json.dumps(sorted(links)), 'pending': json.dumps(sorted(pending))}
+        if published is not None:
+            mapping['published'] = published
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, self.config.url_expiry)
+        await pipe.execute()
+
+    async def save_feed_validators(self, response) -> None:
+        """Store the ETag/Last-Modified ConditionalFeedMiddleware found on a feed, expiring with its watermark"""
+        meta = response.request.meta if response.request is not None else {}
+        validators = meta.get('new_feed_validators')
+        if not validators:
+            return
+        key = meta['feed_validators_key']
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hset(key, mapping=validators)
+        pipe.expire(key, self.config.url_expiry)
+        await pipe.execute()
+
+    async def unseen_feed_links(self, feed_url: str, entries: Dict[str, Any],
+                                source: Optional[str] = None) -> List[str]:
+        """Return the links in a feed (link -> entry, newest first) that still need scraping
+
+        Links already known from the feed's watermark skip Redis entirely, and in a
+        newest-first feed the walk stops at the first known entry published at or
+        before the watermark, so a poll costs one lookup per new entry instead of
+        one per feed entry. Links still unscraped after the last poll (e.g. a
+        failed page download) are pending: the walk goes on until it has passed
+        all of them, so they are checked, and requested, again.
+        """
+        watermark, known_links, last_pending = await self.load_watermark(feed_url, source)
+        published = [self.entry_timestamp(entry) for entry in entries.values()]
+        newest_first = None not in published and published == sorted(published, reverse=True)
+
+        candidates = []
+        retry = last_pending & set(entries)
+        for (link, entry), timestamp in zip(entries.items(), published):
+            if link in known_links:
+                if newest_first and watermark is not None and timestamp <= watermark and not retry:
+                    break
+                continue
+            retry.discard(link)
+            candidates.append(link)
+        unscraped = await self.filter_unscraped(candidates, source)
+
+        # Only links known to be scraped enter the watermark; the rest stay pending
+        # until parse_article has marked them
+        pending = set(unscraped)
+        scraped = {link for link in entries if link not in pending}
+        timestamps = [
+            timestamp for link, timestamp in zip(entries, published)
+            if link in scraped and timestamp is not None
+        ]
+        if watermark is not None:
+            timestamps.append(watermark)
+        await self.save_watermark(feed_url, max(timestamps, default=None), scraped, source, pending)
+
+        self.stats['watermark_skipped'] += len(entries) - len(candidates)
+        return unscraped
+
+    async def mark_article_scraped(self, url: str, source: Optional[str] = None) -> None:
+        """Buffer URL to be marked as scraped, flushing on size or time threshold"""
+        self._pending_marks.append((source or self.name, url))
+        if (len(self._pending_marks) >= self.config.mark_batch_size
+                or time.monotonic() - self._last_mark_flush >= self.config.mark_flush_interval):
+            await self.flush_scraped_marks()
+
+    async def flush_scraped_marks(self) -> None:
+        """Write buffered scraped URLs to the dedup backend in one round-trip"""
+        self._last_mark_flush = time.monotonic()
+        if not self._pending_marks:
+            return
+        marks, self._pending_marks = self._pending_marks, []
+        by_source = defaultdict(list)
+        for source, url in marks:
+            by_source[source].append(url)
+        for source, urls in by_source.items():
+            await self.dedup.add(source, urls)
+
+    async def parse_feed_entry(self, entry, link: str, spec: Optional[FeedSpec] = None):
+        """Build the article from the feed entry, or request the page if the feed content is too short"""
+        spec = spec or self.spec
+        if self.config.feed_first:
+            item = self.build_item(entry, link, spec=spec)
+            content = item.get('content') if item is not None else None
+            if content and len(content) >= self.config.min_feed_content_length:
+                await self.mark_article_scraped(link, spec.name)
+                self.stats['articles_scraped'] += 1
+                self.stats['articles_from_feed'] += 1
+                self.logger.info(f"Scraped article from feed: {item['heading']} from {link}")
+                return item
+        if link in self._article_requests:
+            return None  # Still being downloaded for an earlier poll
+        self._article_requests.add(link)
+        # dont_filter: a link whose download failed is requested again when a later poll finds it pending
+        return Request(
+            url=link,
+            callback=self.parse_article,
+            errback=self.article_failed,
+            dont_filter=True,
+            meta={'feed_entry': entry, 'feed_link': link, **self.source_meta(spec)}
+        )
+
+    def start_requests(self):
+        for url in self.start_urls:
+            if self.polling:
+                self.poll_intervals[url] = self.config.poll_initial_interval
+                yield self.poll_request(url)
+            else:
+                yield Request(url=url, dont_filter=True, meta=self.source_meta(self.feed_specs[url]))
+
+    def poll_request(self, url: str) -> Request:
+        """Feed request for one poll; dont_filter lets the same URL be fetched again"""
+        return Request(
+            url=url,
+            callback=self.poll_feed,
+            errback=self.poll_failed,
+            dont_filter=True,
+            meta={'poll_url': url, 'conditional_feed': True, **self.source_meta(self.feed_specs[url])}
+        )
+
+    async def poll_feed(self, response):
+        """Run the spider's parse on a polled feed and schedule the next poll from what was new
+
+        The next poll is scheduled even if parsing fails (e.g. Redis is briefly
+        unreachable), counting the failed poll as a quiet one, so the feed is
+        never dropped from the poller.
+        """
+        new_entries = 0
+        parsed = False
+        try:
+            async for result in self.parse(response):
+                new_entries += 1
+                yield result
+            # Quiet feeds produce no marks for a long time, so do not leave earlier ones buffered
+            await self.flush_scraped_marks()
+            parsed = True
+        finally:
+            if not parsed:
+                self.stats['errors'] += 1
+            self.schedule_poll(response.meta['poll_url'], new_entries if parsed else 0)
+
+    def poll_failed(self, failure):
+        """Errback for polled feeds; a 304 or a failed fetch counts as a quiet poll"""
+        url = failure.request.meta['poll_url']
+        if failure.check(IgnoreRequest):
+            self.logger.info(f"No changes in {url}")
+        else:
+            self.logger.warning(f"Polling {url} failed: {failure.value!r}")
+            self.stats['errors'] += 1
+        self.schedule_poll(url, 0)
+
+    def schedule_poll(self, url: str, new_entries: int) -> float:
+        """Adapt the feed's interval to whether the last poll found new entries and schedule the next one"""
+        from twisted.internet import reactor
+
+        interval = self.poll_intervals.get(url, self.config.poll_initial_interval)
+        if new_entries:
+            interval = max(self.config.poll_min_interval, interval / self.config.poll_backoff)
+        else:
+            interval = min(self.config.poll_max_interval, interval * self.config.poll_backoff)
+        self.poll_intervals[url] = interval
+        self.stats['polls'] += 1
+
+        self.logger.info(f"{new_entries} new entries in {url}, polling again in {interval:.0f}s")
+        self._poll_calls[url] = reactor.callLater(interval, self.enqueue_poll, url)
+        return interval
+
+    def enqueue_poll(self, url: str) -> None:
+        self._poll_calls.pop(url, None)
+        self.crawler.engine.crawl(self.poll_request(url))
+
+    def spider_idle(self, spider):
+        if spider is self and self.polling:
+            raise DontCloseSpider
+
+    async def parse(self, response):
+        spec = self.spec_for(response)
+        self.logger.info(f"Starting {spec.name} scrape from RSS feed")
+        feed = feedparser.parse(response.body)
+        self.logger.info(f"Found {len(feed.entries)} articles in the feed")
+
+        entries = {}
+        for entry in feed.entries:
+            link = entry.get('link')
+            if link:
+                entries[spec.normalize_link(link)] = entry
+            else:
+                self.logger.warning("Feed entry found without a link.")
+
+        unseen = await self.unseen_feed_links(response.url, entries, spec.name)
+        # Only now that the entries are recorded may the next poll be answered with 304
+        await self.save_feed_validators(response)
+        for link in unseen:
+            result = await self.parse_feed_entry(entries[link], link, spec)
+            if result is None:
+                continue
+            yield result
+            self.stats['articles_found'] += 1
+
+    async def parse_article(self, response):
+        """Parse an article page requested because its feed entry had too little content"""
+        self._article_requests.discard(response.meta.get('feed_link', response.url))
+        feed_entry = response.meta.get('feed_entry', {})
+        spec = self.spec_for(response)
+        item = self.build_item(feed_entry, response.url, response, spec)
+        if item is not None:
+            await self.mark_article_scraped(response.url, spec.name)
+            self.stats['articles_scraped'] += 1
+            self.logger.info(f"Scraped article: {item['heading']} from {response.url}")
+            yield item
+
+    def article_failed(self, failure):
+        """Errback for article pages; the link stays pending and is requested again on a later poll"""
+        link = failure.request.meta.get('feed_link', failure.request.url)
+        self._article_requests.discard(link)
+        self.logger.warning(f"Downloading {link} failed: {failure.value!r}")
+        self.stats['errors'] += 1
+
+    @staticmethod
+    def entry_field(feed_entry, name: str) -> Optional[str]:
+        """First value of a list field such as tags or content, as feedparser dicts or objects"""
+        values = feed_entry.get(name) if feed_entry else None
+        if not values or not isinstance(values, list):
+            return None
+        first = values[0]
+        attribute = 'term' if name == 'tags' else 'value'
+        return first.get(attribute) if isinstance(first, dict) else getattr(first, attribute, None)
+
+    def build_item(self, feed_entry, url: str, response=None,
+                   spec: Optional[FeedSpec] = None) -> Optional[NewsArticleItem]:
+        """Build an article item from a feed entry, falling back to the page response if given"""
+        spec = spec or self.spec
+        item = NewsArticleItem()
+        item['url'] = url
+        item['spider_name'] = spec.name
+
+        try:
+            author_detail = feed_entry.get('author_detail')
+            if author_detail and isinstance(author_detail, dict):
+                author = author_detail.get('name')
+            else:
+                author = feed_entry.get('author')
+            category = self.entry_field(feed_entry, 'tags')
+            heading = feed_entry.get('title')
+
+            content_html = self.entry_field(feed_entry, 'content') or feed_entry.get('summary')
+            content_text = extract_text(content_html, self.config.extractor)
+
+            # The page was fetched because the feed text is under the threshold, so the page wins
+            if response is not None and len(content_text or '') < self.config.min_feed_content_length:
+                self.logger.info(f"Content from feed was empty or insufficient for {url}. Falling back to XPath.")
+                segments = [segment.strip() for segment in response.xpath(spec.content_xpath).getall()]
+                page_text = ' '.join(segment for segment in segments if segment) or None
+                if page_text is None:
+                    self.logger.warning(f"Content not found via XPath for {url}")
+                content_text = page_text or content_text
+
+            item['heading'] = heading.strip() if heading else None
+            item['author'] = author.strip() if author else None
+            item['category'] = category.strip() if category else None
+            item['content'] = content_text
+            item['date'] = feed_entry.get('published')
+            published = self.parse_publish_date(feed_entry)
+            item['published_at'] = published.isoformat() if published else None
+            return item
+
+        except Exception as e:
+            self.handle_article_error(url, e)
+            return None
 
-    @abstractmethod
-    def parse_article(self, response) -> Dict[str, Any]:
-        """Parse individual article page"""
-        pass
+    def parse_publish_date(self, feed_entry) -> Optional[datetime]:
+        """Publish time of a feed entry, from feedparser's parsed date or the raw string"""
+        if feed_entry.get('published_parsed'):
+            # feedparser normalizes to UTC
+            return datetime(*feed_entry.get('published_parsed')[:6], tzinfo=timezone.utc)
+        date_str = feed_entry.get('published')
+        if not date_str:
+            return None
+        published = parse_date(date_str)
+        if published is None:
+            self.logger.warning(f"Could not parse date: {date_str} with any known format.")
+        return published
 
-    def closed(self, reason: str) -> None:
+    async def closed(self, reason: str) -> None:
         """Handle spider closure and save statistics"""
+        for call in self._poll_calls.values():
+            if call.active():
+                call.cancel()
+        self._poll_calls.clear()
+        await self.flush_scraped_marks()
+        await self.redis_client.aclose()
+        await self.redis_pool.disconnect()
         os.makedirs('stats', exist_ok=True)
         
         stats_report = {
             'date': self.today.isoformat(),
             'articles_found': self.stats['articles_found'],
             'articles_scraped': self.stats['articles_scraped'],
+            'articles_from_feed': self.stats['articles_from_feed'],
             'errors': self.stats['errors'],
+            'polls': self.stats['polls'],
+            'watermark_skipped': self.stats['watermark_skipped'],
             'reason': reason
         }
         
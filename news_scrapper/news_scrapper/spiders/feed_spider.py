@@ -0,0 +1,20 @@
+# feed_spider.py
+from ..feeds import resolve_spec
+from .base_spider import NewsSpiderBase
+
+class FeedSpider(NewsSpiderBase):
+    """Crawls any source described by a FeedSpec
+
+    scrapy crawl feed -a spec=dawn_latest
+    scrapy crawl feed -a spec='{"name": "...", "domain": "...", "feed_url": "...", "content_xpath": "..."}'
+    """
+
+    name = 'feed'
+
+    def __init__(self, spec=None, *args, **kwargs):
+        if not spec:
+            raise ValueError("FeedSpider needs a feed spec: -a spec=<name or JSON>")
+        spec = resolve_spec(spec)
+        # Keys in Redis, log and export file names follow the source, not 'feed'
+        super(FeedSpider, self).__init__(spec.name, *args, **kwargs)
+        self.initialize_spec(spec)
@@ -0,0 +1,21 @@
+# multi_feed_spider.py
+from ..feeds import FEED_SPECS
+from .base_spider import NewsSpiderBase
+
+class MultiFeedSpider(NewsSpiderBase):
+    """Crawls every source in the feed registry from one spider
+
+    scrapy crawl feeds
+    scrapy crawl feeds -a sources=dawn_latest,tribune_latest
+    scrapy crawl feeds -a poll=1
+    """
+
+    name = 'feeds'
+
+    def __init__(self, sources=None, *args, **kwargs):
+        super(MultiFeedSpider, self).__init__(*args, **kwargs)
+        names = [name.strip() for name in sources.split(',') if name.strip()] if sources else list(FEED_SPECS)
+        unknown = [name for name in names if name not in FEED_SPECS]
+        if unknown:
+            raise KeyError(f"Unknown feed specs: {', '.join(unknown)}")
+        self.initialize_specs([FEED_SPECS[name] for name in names])
@@ -4,10 +4,8 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from datetime import datetime
 import logging
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
-from news_scrapper.spiders.Dawn_spider import DawnLatestSpider
-from news_scrapper.spiders.tribune_latest import TribuneLatestSpider
+from spider_runner import run_spiders as run_spider_processes
+from news_scrapper.feeds import FEED_SPECS
 
 def setup_logging():
     """Configure logging"""
@@ -26,15 +24,18 @@ def run_spiders():
     logger.info("Starting news scraping")
     
     try:
-        # Initialize the process
-        process = CrawlerProcess(get_project_settings())
+        # Each source runs in its own process, up to SCRAPER_CONFIG['process_count'] at once
+        results = run_spider_processes(list(FEED_SPECS))
         
-        # Add both spiders to the process
-        process.crawl(DawnLatestSpider)
-        process.crawl(TribuneLatestSpider)
+        for result in results:
+            logger.info(
+                f"{result.spider_name}: exit code {result.exit_code}, timed out {result.timed_out}, "
+                f"{result.stats.get('item_scraped_count', 0)} items scraped"
+            )
         
-        # Start the crawling process
-        process.start()
+        failed = [result.spider_name for result in results if not result.ok]
+        if failed:
+            raise RuntimeError(f"Spiders failed: {', '.join(failed)}")
         
         logger.info("Scraping completed successfully")
         
@@ -43,4 +44,4 @@ def run_spiders():
         raise
 
 if __name__ == "__main__":
-    run_spiders()
\ No newline at end of file
+    run_spiders()
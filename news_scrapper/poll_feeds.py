@@ -0,0 +1,25 @@
+# poll_feeds.py
+"""Long-running feed poller: one warm Scrapy process polls every registered feed"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+from config import SCRAPER_CONFIG
+from spider_runner import PROJECT_DIR
+
+def poll_feeds(sources=None):
+    """Poll the given sources, or all of the registry, until interrupted"""
+    os.chdir(PROJECT_DIR)
+    settings = get_project_settings()
+    # Hand finished export files to the ingest flow while the poller keeps running
+    settings.set('EXPORT_ROTATE_INTERVAL', SCRAPER_CONFIG['polling']['export_rotate_interval'])
+
+    process = CrawlerProcess(settings)
+    # A single crawler schedules every feed, so domains share one set of download slots
+    spider_kwargs = {'sources': ','.join(sources)} if sources else {}
+    process.crawl('feeds', poll=True, **spider_kwargs)
+    process.start()
+
+if __name__ == "__main__":
+    poll_feeds(sys.argv[1:])
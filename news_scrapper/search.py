@@ -0,0 +1,43 @@
+"""Search scraped articles from the command line.
+
+Usage: python search.py "flood relief" [--source dawn_latest] [--category Pakistan]
+                        [--since 2025-06-01] [--until 2025-07-01] [--page 2] [--per-page 20]
+"""
+import argparse
+from config import DB_CONFIG, DB_POOL_CONFIG
+from news_scrapper.db import configure_pool, connection
+from news_scrapper.search import search_articles
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ranked full-text search over scraped articles")
+    parser.add_argument("query", help='Words to find; "quoted phrases", -excluded and or are supported')
+    parser.add_argument("--source", dest="spider_name", help="Only articles from this source, e.g. dawn_latest")
+    parser.add_argument("--category")
+    parser.add_argument("--since", help="Published on or after this date/time")
+    parser.add_argument("--until", help="Published before this date/time")
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--per-page", type=int, default=20)
+    args = parser.parse_args()
+
+    configure_pool(DB_CONFIG, **DB_POOL_CONFIG)
+    with connection() as conn:
+        results = search_articles(
+            conn, args.query,
+            spider_name=args.spider_name,
+            category=args.category,
+            since=args.since,
+            until=args.until,
+            page=args.page,
+            per_page=args.per_page
+        )
+
+    if not results:
+        print("No matching articles")
+    for result in results:
+        published = result["published_at"].strftime("%Y-%m-%d %H:%M") if result["published_at"] else "undated"
+        print(f"[{result['rank']:.3f}] {result['heading']} ({result['spider_name']}, {published})")
+        print(f"    {result['url']}")
+        print(f"    {' '.join(result['snippet'].split())}\n")
+
+if __name__ == "__main__":
+    main()
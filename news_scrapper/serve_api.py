@@ -0,0 +1,26 @@
+"""HTTP read API for the latest articles, cached in Redis.
+
+    GET /articles/source/<spider_name>?limit=20&cursor=<next>
+    GET /articles/category/<category>?limit=20&cursor=<next>
+
+Usage: python serve_api.py [port]
+"""
+import logging
+import sys
+import redis
+from config import DB_CONFIG, DB_POOL_CONFIG, REDIS_CONFIG, API_CONFIG
+from news_scrapper.api import ArticleAPI, serve
+from news_scrapper.cache import ResponseCache
+from news_scrapper.db import configure_pool
+
+def main(port: str = None) -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    configure_pool(DB_CONFIG, **DB_POOL_CONFIG)
+    cache = ResponseCache(redis.Redis(**REDIS_CONFIG), ttl=API_CONFIG['cache_ttl'])
+    serve(API_CONFIG['host'], int(port or API_CONFIG['port']), ArticleAPI(cache))
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
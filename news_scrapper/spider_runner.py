@@ -0,0 +1,97 @@
+# spider_runner.py
+"""Run spiders in separate processes so each crawl gets a fresh Twisted reactor and its own core"""
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+from config import SCRAPER_CONFIG
+
+# Directory holding scrapy.cfg; spiders run from here so logs/ and data/ land in the project
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Caps the number of spider processes alive at once across all callers in this process
+_process_slots = threading.BoundedSemaphore(SCRAPER_CONFIG['process_count'])
+
+# Spawned children start from a clean interpreter, so no reactor state is inherited
+_context = multiprocessing.get_context('spawn')
+
+@dataclass
+class SpiderResult:
+    """Outcome of one spider process"""
+    spider_name: str
+    exit_code: Optional[int]
+    timed_out: bool = False
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0 and not self.timed_out
+
+def crawl_source(process: CrawlerProcess, source: str, **spider_kwargs):
+    """Schedule a source on the process: its own spider class if it has one, else FeedSpider with its spec"""
+    if source in process.spider_loader.list():
+        crawler = process.create_crawler(source)
+        process.crawl(crawler, **spider_kwargs)
+    else:
+        crawler = process.create_crawler('feed')
+        process.crawl(crawler, spec=source, **spider_kwargs)
+    return crawler
+
+def _crawl(spider_name: str, project_dir: str, writer) -> None:
+    """Child process entry point: run one spider and send its stats back"""
+    os.chdir(project_dir)
+    process = CrawlerProcess(get_project_settings())
+    crawler = crawl_source(process, spider_name)
+    process.start()
+
+    # Stats hold datetimes; round-trip through JSON so the parent gets plain values
+    stats = json.loads(json.dumps(crawler.stats.get_stats(), default=str))
+    writer.send(stats)
+    writer.close()
+    if stats.get('finish_reason') != 'finished':
+        raise SystemExit(1)
+
+def run_spider(spider_name: str, timeout: Optional[float] = None) -> SpiderResult:
+    """Run one spider in its own process, waiting for a free process slot first"""
+    if timeout is None:
+        timeout = SCRAPER_CONFIG['timeout']
+
+    with _process_slots:
+        reader, writer = _context.Pipe(duplex=False)
+        process = _context.Process(
+            target=_crawl,
+            args=(spider_name, PROJECT_DIR, writer),
+            name=f"spider-{spider_name}"
+        )
+        process.start()
+        writer.close()
+
+        deadline = time.monotonic() + timeout
+        stats = {}
+        # The child sends its stats just before exiting; a crash closes the pipe instead
+        if wait([reader, process.sentinel], timeout) and reader.poll():
+            try:
+                stats = reader.recv()
+            except EOFError:
+                pass
+        process.join(max(0, deadline - time.monotonic()))
+
+        timed_out = process.is_alive()
+        if timed_out:
+            process.terminate()
+            process.join()
+        reader.close()
+
+    return SpiderResult(spider_name, process.exitcode, timed_out, stats)
+
+def run_spiders(spider_names: List[str], timeout: Optional[float] = None) -> List[SpiderResult]:
+    """Run spiders in parallel processes, at most SCRAPER_CONFIG['process_count'] at a time"""
+    with ThreadPoolExecutor(max_workers=max(1, len(spider_names))) as executor:
+        return list(executor.map(lambda name: run_spider(name, timeout), spider_names))
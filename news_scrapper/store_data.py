@@ -1,79 +1,26 @@
-import json
-import psycopg2
-import os
+"""Bulk loader for large backfills.
 
-# Database connection details
-DB_NAME = "news_db"
-DB_USER = "admin"
-DB_PASSWORD = "admin123"
-DB_HOST = "localhost"
-DB_PORT = "5432"
+Streams exported articles into a temporary staging table with
+COPY ... FROM STDIN, creates the monthly partitions it needs and merges
+them into `news` with the pipeline's upsert statement. The `news` table
+must already exist (it is created by the pipeline's setup_database task).
+
+Usage: python store_data.py [json_dir]
+"""
+import sys
+from config import DB_CONFIG, DB_POOL_CONFIG
+from news_scrapper.bulk_load import copy_upsert_articles
+from news_scrapper.db import configure_pool, connection
+from news_scrapper.exports import iter_articles
 
 # Directory containing JSON files
 JSON_DIR = "./data/articles"
 
-# Connect to PostgreSQL
-try:
-    connection = psycopg2.connect(
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        host=DB_HOST,
-        port=DB_PORT
-    )
-    cursor = connection.cursor()
-
-    # Create table if it doesn't exist
-    create_table_query = """
-    CREATE TABLE IF NOT EXISTS news (
-        id SERIAL PRIMARY KEY,
-        heading TEXT,
-        content TEXT,
-        author TEXT,
-        date DATE,
-        category TEXT,
-        url TEXT,
-        processed_at TIMESTAMP,
-        spider_name TEXT
-    );
-    """
-    cursor.execute(create_table_query)
-
-    # Iterate over all JSON files in the directory
-    for filename in os.listdir(JSON_DIR):
-        if filename.endswith(".json"):
-            file_path = os.path.join(JSON_DIR, filename)
-            print(f"Processing file: {file_path}")
-            
-            # Load JSON data
-            with open(file_path, "r") as file:
-                news_data = json.load(file)
-
-            # Insert data into the table
-            insert_query = """
-            INSERT INTO news (heading, content, author, date, category, url, processed_at, spider_name)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            for article in news_data:
-                cursor.execute(insert_query, (
-                    article.get("heading"),
-                    article.get("content"),
-                    article.get("author"),
-                    article.get("date"),
-                    article.get("category"),
-                    article.get("url"),
-                    article.get("processed_at"),
-                    article.get("spider_name")
-                ))
-
-    # Commit changes
-    connection.commit()
-    print("All data inserted successfully!")
-
-except Exception as e:
-    print("An error occurred:", e)
+def main(json_dir: str = JSON_DIR) -> None:
+    configure_pool(DB_CONFIG, **DB_POOL_CONFIG)
+    with connection() as conn:
+        counts = copy_upsert_articles(conn, iter_articles(json_dir))
+    print(f"Inserted {counts['inserted']}, updated {counts['updated']}, unchanged {counts['unchanged']} articles")
 
-finally:
-    if connection:
-        cursor.close()
-        connection.close()
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The pipeline scripts import config.py as a top-level module, as they do when run from news_scrapper/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,76 @@
+import json
+from datetime import datetime, timezone
+
+from news_scrapper.news_scrapper.api import ArticleAPI, encode_cursor, decode_cursor
+from news_scrapper.news_scrapper.cache import GENERATION_KEY, ResponseCache, bump_generation, invalidate
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+        return int(self.data[key])
+
+def counting_api(mocker, cache=None):
+    api = ArticleAPI(cache)
+    page = {'articles': [{'id': 1, 'published_at': datetime(2025, 6, 3, 11, tzinfo=timezone.utc)}], 'next': None}
+    mocker.patch.object(api, 'latest', return_value=page)
+    return api
+
+def test_cursor_round_trip():
+    published_at = datetime(2025, 6, 3, 11, 0, 5, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(published_at, 42)) == (published_at, 42)
+
+def test_handle_routes_listings(mocker):
+    api = counting_api(mocker)
+    status, body = api.handle('/articles/category/Pakistan%20News?limit=5')
+
+    assert status == 200
+    assert json.loads(body)['articles'][0]['published_at'] == '2025-06-03T11:00:00+00:00'
+    api.latest.assert_called_once_with('category', 'Pakistan News', 5, None)
+
+def test_handle_rejects_bad_requests(mocker):
+    api = counting_api(mocker)
+    assert api.handle('/articles/author/someone')[0] == 404
+    assert api.handle('/articles/source/dawn_latest?limit=1000')[0] == 400
+    assert api.handle('/articles/source/dawn_latest?cursor=not-a-cursor')[0] == 400
+    api.latest.assert_not_called()
+
+def test_responses_are_cached_until_the_generation_is_bumped(mocker):
+    redis_client = FakeRedis()
+    api = counting_api(mocker, ResponseCache(redis_client))
+
+    first = api.handle('/articles/source/dawn_latest')
+    assert api.handle('/articles/source/dawn_latest') == first
+    assert api.latest.call_count == 1
+
+    bump_generation(redis_client)
+    assert api.handle('/articles/source/dawn_latest') == first
+    assert api.latest.call_count == 2
+
+def test_response_built_during_an_ingest_is_not_served_after_it():
+    redis_client = FakeRedis()
+    cache = ResponseCache(redis_client)
+    body, generation = cache.get('key')
+    bump_generation(redis_client)  # Articles committed while the response was being built
+    cache.set('key', b'stale', generation)
+
+    assert cache.get('key') == (None, b'1')
+
+def test_invalidate_logs_instead_of_raising_when_redis_is_down(mocker):
+    import redis
+    redis_client = FakeRedis()
+    logger = mocker.Mock()
+    assert invalidate(redis_client, logger)
+    assert redis_client.data[GENERATION_KEY] == b'1'
+
+    mocker.patch.object(redis_client, 'incr', side_effect=redis.ConnectionError("refused"))
+    assert not invalidate(redis_client, logger)
+    logger.warning.assert_called_once()
@@ -0,0 +1,58 @@
+from news_scrapper.news_scrapper.bulk_load import COPY_COLUMNS, ArticleStream, copy_value
+from news_scrapper.news_scrapper.pipelines import compute_content_hash
+
+def article(url, **fields):
+    return dict({'url': url, 'heading': 'Heading', 'content': 'Body text.', 'date': 'Tue, 03 Jun 2025 16:00:00 +0500',
+                 'spider_name': 'dawn_latest'}, **fields)
+
+def parse_rows(data):
+    return [dict(zip(COPY_COLUMNS, line.split('\t'))) for line in data.splitlines()]
+
+def test_copy_value_escapes_copy_text_format():
+    assert copy_value(None) == '\\N'
+    assert copy_value('a\tb') == 'a\\tb'
+    assert copy_value('line one\nline two\r\n') == 'line one\\nline two\\r\\n'
+    assert copy_value('C:\\path') == 'C:\\\\path'
+    # Backslashes are escaped first, so an escaped tab is not doubled
+    assert copy_value('\\\t') == '\\\\\\t'
+    assert copy_value(3) == '3'
+
+def test_article_stream_writes_one_line_per_article():
+    stream = ArticleStream([article('http://example.com/1', content='Tabs\tand\nnewlines'), article('http://example.com/2')])
+    rows = parse_rows(stream.read())
+
+    assert [row['url'] for row in rows] == ['http://example.com/1', 'http://example.com/2']
+    assert rows[0]['content'] == 'Tabs\\tand\\nnewlines'
+    assert stream.read() == ''
+
+def test_article_stream_reads_across_size_boundaries():
+    articles = [article(f'http://example.com/{i}') for i in range(20)]
+    expected = ArticleStream(articles).read()
+
+    stream = ArticleStream(articles)
+    chunks = []
+    while True:
+        chunk = stream.read(7)
+        if not chunk:
+            break
+        assert len(chunk) <= 7
+        chunks.append(chunk)
+
+    assert ''.join(chunks) == expected
+    assert len(chunks) > 20
+
+def test_article_stream_fills_in_content_hash_and_published_at():
+    missing = article('http://example.com/1')
+    given = article('http://example.com/2', content_hash='abc', published_at='2025-01-01T00:00:00+00:00')
+    rows = parse_rows(ArticleStream([missing, given]).read())
+
+    assert rows[0]['content_hash'] == compute_content_hash(missing)
+    assert rows[0]['published_at'] == '2025-06-03T11:00:00+00:00'
+    assert rows[1]['content_hash'] == 'abc'
+    assert rows[1]['published_at'] == '2025-01-01T00:00:00+00:00'
+
+def test_article_stream_copies_null_for_missing_fields():
+    rows = parse_rows(ArticleStream([article('http://example.com/1', date=None, author=None)]).read())
+
+    assert rows[0]['author'] == '\\N'
+    assert rows[0]['published_at'] == '\\N'
@@ -0,0 +1,41 @@
+from datetime import datetime, timezone, timedelta
+
+from news_scrapper.news_scrapper.dates import DateParser, parse_rfc822, parse_iso, parse_date, to_timestamp
+
+def test_parse_date_handles_feed_formats():
+    pkt = timezone(timedelta(hours=5))
+    assert parse_date('Tue, 03 Jun 2025 16:00:00 +0500') == datetime(2025, 6, 3, 16, tzinfo=pkt)
+    assert parse_date('Thu, 06 Jun 2024 15:45:10 GMT') == datetime(2024, 6, 6, 15, 45, 10, tzinfo=timezone.utc)
+    assert parse_date('2024-01-15T12:00:00Z') == datetime(2024, 1, 15, 12, tzinfo=timezone.utc)
+    assert parse_date(' 2023-10-27T08:30:00+05:00 ') == datetime(2023, 10, 27, 8, 30, tzinfo=pkt)
+
+def test_parse_date_assumes_utc_for_naive_dates():
+    assert parse_date('2025-06-03 14:30:00') == datetime(2025, 6, 3, 14, 30, tzinfo=timezone.utc)
+
+def test_parse_date_returns_none_for_unparseable_values():
+    assert parse_date('yesterday') is None
+    assert parse_date('') is None
+    assert parse_date(None) is None
+
+def test_to_timestamp_normalizes_to_utc():
+    assert to_timestamp('Tue, 03 Jun 2025 16:00:00 +0500') == '2025-06-03T11:00:00+00:00'
+    assert to_timestamp('not a date') is None
+
+def test_parser_caches_repeated_strings():
+    calls = []
+    def counting_iso(value):
+        calls.append(value)
+        return parse_iso(value)
+
+    parser = DateParser([counting_iso])
+    for _ in range(3):
+        parser('2024-01-15T12:00:00Z')
+    assert calls == ['2024-01-15T12:00:00Z']
+
+def test_parser_moves_the_most_successful_format_first():
+    parser = DateParser([parse_rfc822, parse_iso])
+    parser('Tue, 03 Jun 2025 16:00:00 +0500')
+    parser('2024-01-15T12:00:00Z')
+    assert parser.parsers == [parse_rfc822, parse_iso]  # Tied, order kept
+    parser('2024-01-16T12:00:00Z')
+    assert parser.parsers == [parse_iso, parse_rfc822]
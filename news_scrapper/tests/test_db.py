@@ -0,0 +1,169 @@
+import threading
+
+import psycopg2
+import pytest
+
+from news_scrapper.news_scrapper import db
+
+class FakeConnection:
+    def __init__(self, healthy=True, closed=0):
+        self.healthy = healthy
+        self.closed = closed
+        self.rollbacks = 0
+
+    def cursor(self):
+        connection = self
+        class Cursor:
+            def __enter__(self):
+                return self
+            def __exit__(self, *exc):
+                return False
+            def execute(self, query):
+                if not connection.healthy:
+                    raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        return Cursor()
+
+    def rollback(self):
+        self.rollbacks += 1
+
+class FakePool:
+    """Hands out the idle connections first, then opens fresh ones"""
+
+    def __init__(self, minconn, maxconn, **db_config):
+        self.idle = []
+        self.opened = 0
+        self.discarded = []
+
+    def getconn(self):
+        if self.idle:
+            return self.idle.pop()
+        self.opened += 1
+        return FakeConnection()
+
+    def putconn(self, conn, close=False):
+        if close:
+            self.discarded.append(conn)
+        else:
+            self.idle.append(conn)
+
+    def closeall(self):
+        self.idle = []
+
+@pytest.fixture
+def pool(mocker):
+    mocker.patch.object(db, 'ThreadedConnectionPool', FakePool)
+    db.close_pool()
+    db._pool_settings = {}
+    db.configure_pool({'dbname': 'news'}, minconn=1, maxconn=3)
+    yield db.get_pool()
+    db.close_pool()
+    db._pool_settings = {}
+
+def test_get_pool_requires_configure_pool():
+    db.close_pool()
+    db._pool_settings = {}
+    with pytest.raises(RuntimeError):
+        db.get_pool()
+
+def test_is_healthy_checks_closed_and_broken_connections():
+    assert db.is_healthy(FakeConnection())
+    assert not db.is_healthy(FakeConnection(closed=1))
+    assert not db.is_healthy(FakeConnection(healthy=False))
+
+def test_get_connection_reuses_healthy_idle_connections(pool):
+    idle = FakeConnection()
+    pool.idle = [idle]
+
+    conn = db.get_connection()
+    assert conn is idle
+    assert conn.rollbacks == 1  # The health check leaves no transaction open
+    db.release_connection(conn)
+    assert pool.idle == [idle]
+
+def test_get_connection_discards_every_broken_idle_connection(pool):
+    broken = [FakeConnection(healthy=False), FakeConnection(closed=1)]
+    pool.idle = list(broken)
+
+    conn = db.get_connection()
+    assert db.is_healthy(conn)
+    assert pool.discarded == broken[::-1]
+    assert pool.opened == 1
+    db.release_connection(conn)
+
+def test_get_connection_stops_discarding_after_maxconn(pool):
+    # With every idle connection discarded, the next one is freshly opened and returned as is
+    pool.idle = [FakeConnection(healthy=False) for _ in range(3)]
+
+    conn = db.get_connection()
+    assert len(pool.discarded) == 3
+    assert pool.opened == 1
+    db.release_connection(conn)
+
+def test_release_connection_closes_connections_that_were_closed(pool):
+    conn = db.get_connection()
+    conn.closed = 1
+    db.release_connection(conn)
+
+    assert pool.discarded == [conn]
+    assert pool.idle == []
+
+def test_get_connection_waits_for_a_free_slot(pool):
+    held = [db.get_connection() for _ in range(3)]
+    checked_out = threading.Event()
+
+    def checkout():
+        db.release_connection(db.get_connection())
+        checked_out.set()
+
+    thread = threading.Thread(target=checkout)
+    thread.start()
+    # maxconn connections are out, so the fourth caller queues instead of the pool raising
+    assert not checked_out.wait(0.1)
+
+    db.release_connection(held.pop())
+    assert checked_out.wait(1)
+    thread.join()
+    for conn in held:
+        db.release_connection(conn)
+
+def test_get_connection_releases_its_slot_when_checkout_fails(pool, mocker):
+    mocker.patch.object(pool, 'getconn', side_effect=psycopg2.OperationalError("could not connect"))
+
+    for _ in range(4):
+        with pytest.raises(psycopg2.OperationalError):
+            db.get_connection()
+    # Every failed checkout gave its slot back
+    assert all(db._slots.acquire(blocking=False) for _ in range(3))
+
+class MigrationCursor:
+    """Answers partition_news_table's lookups for a legacy table with the given columns"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append(' '.join(query.split()))
+
+    def fetchone(self):
+        return ('public.news_id_seq',)
+
+    def fetchall(self):
+        if 'information_schema.columns' in self.executed[-1]:
+            return [(column,) for column in self.columns]
+        return []  # No dated rows, so no monthly partitions
+
+def test_partition_news_table_migrates_a_table_without_timestamps():
+    cur = MigrationCursor(['id', 'heading', 'content', 'author', 'date', 'category', 'url', 'processed_at',
+                           'spider_name', 'content_hash', 'cluster_id', 'published_at'])
+    db.partition_news_table(cur)
+
+    [copy] = [query for query in cur.executed if query.startswith('INSERT INTO news (')]
+    assert copy.startswith('INSERT INTO news (id, heading,')
+    assert 'created_at, updated_at) SELECT' in copy and copy.endswith('now(), now() FROM news_unpartitioned')
+
+    # Duplicate and NULL URLs of the old table do not abort the migration
+    [registry] = [query for query in cur.executed if query.startswith('INSERT INTO news_urls')]
+    assert 'SELECT DISTINCT ON (url)' in registry and 'WHERE url IS NOT NULL' in registry
+    assert registry.endswith('ORDER BY url, id DESC ON CONFLICT (url) DO NOTHING')
+    assert cur.executed[-1] == 'DROP TABLE news_unpartitioned'
@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+
+from news_scrapper.news_scrapper.dedup import BloomFilterDedup, RedisKeyDedup, bloom_parameters
+from news_scrapper.news_scrapper.spiders.Dawn_spider import DawnLatestSpider
+
+class FakeBitmapPipeline:
+    """Just enough of a Redis pipeline to run BITFIELD GET/SET u1 against in-memory bitmaps"""
+
+    def __init__(self, bitmaps):
+        self.bitmaps = bitmaps
+        self.commands = []
+
+    def execute_command(self, *args):
+        self.commands.append(args)
+
+    def expire(self, key, seconds):
+        self.commands.append(('EXPIRE', key, seconds))
+
+    async def execute(self):
+        results = []
+        for command, key, *args in self.commands:
+            if command == 'EXPIRE':
+                results.append(True)
+                continue
+            bits = self.bitmaps.setdefault(key, set())
+            values = []
+            for i in range(0, len(args), 4 if args[0] == 'SET' else 3):
+                operation, _, offset = args[i:i + 3]
+                values.append(int(offset in bits))
+                if operation == 'SET':
+                    bits.add(offset)
+            results.append(values)
+        self.commands = []
+        return results
+
+class FakeBitmapRedis:
+    def __init__(self):
+        self.bitmaps = {}
+
+    def pipeline(self, transaction=True):
+        return FakeBitmapPipeline(self.bitmaps)
+
+def test_bloom_parameters_match_error_rate():
+    bits, hashes = bloom_parameters(50000, 0.001)
+    assert bits == 718880   # ~88 KB per window
+    assert hashes == 10
+
+def test_bloom_filter_remembers_added_urls():
+    dedup = BloomFilterDedup(FakeBitmapRedis(), capacity=1000)
+    urls = [f"http://www.dawn.com/news/{i}" for i in range(100)]
+
+    asyncio.run(dedup.add("dawn_latest", urls[:50]))
+    unseen = asyncio.run(dedup.filter_unseen("dawn_latest", urls))
+
+    assert not set(urls[:50]) & set(unseen)
+    assert len(unseen) >= 49  # At most a rare false positive among the new URLs
+
+def test_bloom_filter_forgets_urls_after_last_window(mocker):
+    redis_client = FakeBitmapRedis()
+    clock = mocker.patch('news_scrapper.news_scrapper.dedup.time.time', return_value=0)
+    dedup = BloomFilterDedup(redis_client, window=100, windows=3)
+    url = "http://www.dawn.com/news/old"
+    asyncio.run(dedup.add("dawn_latest", [url]))
+
+    clock.return_value = 250   # Two windows later the first bitmap is still checked
+    assert asyncio.run(dedup.filter_unseen("dawn_latest", [url])) == []
+    clock.return_value = 300   # ...and then it falls out of range
+    assert asyncio.run(dedup.filter_unseen("dawn_latest", [url])) == [url]
+
+def test_spider_uses_configured_dedup_backend():
+    spider = DawnLatestSpider()
+    assert isinstance(spider.dedup, RedisKeyDedup)
+
+    spider.config.dedup_backend = 'bloom'
+    dedup = spider.create_dedup_backend()
+    assert isinstance(dedup, BloomFilterDedup)
+    assert dedup.redis_client is spider.redis_client
+
+    spider.config.dedup_backend = 'sqlite'
+    with pytest.raises(ValueError):
+        spider.create_dedup_backend()
@@ -0,0 +1,118 @@
+import gzip
+import json
+import os
+import time
+
+from news_scrapper.news_scrapper.exports import (
+    export_files, export_source, iter_export_file, iter_articles, iter_article_chunks, recover_part_files
+)
+
+def write_jsonl(path, articles, opener=open):
+    with opener(path, 'wt', encoding='utf-8') as file:
+        for article in articles:
+            file.write(json.dumps(article) + '\n')
+
+def articles(prefix, count):
+    return [{'url': f'http://example.com/{prefix}/{i}'} for i in range(count)]
+
+def test_iter_export_file_reads_each_format(tmp_path):
+    (tmp_path / 'dawn_latest_2025-06-03.json').write_text(json.dumps(articles('json', 2)))
+    write_jsonl(tmp_path / 'dawn_latest_2025-06-04.jsonl', articles('jsonl', 2))
+    write_jsonl(tmp_path / 'dawn_latest_2025-06-05.jsonl.gz', articles('gz', 2), opener=gzip.open)
+
+    for name, prefix in [('2025-06-03.json', 'json'), ('2025-06-04.jsonl', 'jsonl'), ('2025-06-05.jsonl.gz', 'gz')]:
+        assert list(iter_export_file(str(tmp_path / f'dawn_latest_{name}'))) == articles(prefix, 2)
+
+def test_iter_export_file_skips_truncated_and_blank_lines(tmp_path):
+    path = tmp_path / 'dawn_latest_2025-06-03.jsonl'
+    path.write_text('{"url": "http://example.com/1"}\n\n{"url": "http://exa\n{"url": "http://example.com/2"}\n')
+
+    assert [a['url'] for a in iter_export_file(str(path))] == ['http://example.com/1', 'http://example.com/2']
+
+def test_iter_export_file_stops_at_missing_gzip_trailer(tmp_path):
+    path = tmp_path / 'dawn_latest_2025-06-03.jsonl.gz'
+    write_jsonl(path, articles('gz', 50), opener=gzip.open)
+    data = path.read_bytes()
+    path.write_bytes(data[:-8])  # A spider killed before close never writes the CRC and size
+
+    read = list(iter_export_file(str(path)))
+    assert read == articles('gz', 50)[:len(read)]
+
+def test_export_files_filters_by_spider_and_suffix(tmp_path):
+    for name in ['dawn_latest_2025-06-04.jsonl', 'dawn_latest_2025-06-03.jsonl.gz', 'tribune_latest_2025-06-03.json',
+                 'dawn_latest_2025-06-05.jsonl.part', 'notes.txt']:
+        (tmp_path / name).write_text('[]')
+
+    assert export_files(str(tmp_path), 'dawn_latest') == ['dawn_latest_2025-06-03.jsonl.gz', 'dawn_latest_2025-06-04.jsonl']
+    assert len(export_files(str(tmp_path))) == 3
+    assert export_files(str(tmp_path / 'missing')) == []
+
+def test_export_files_matches_sources_exactly(tmp_path):
+    for name in ['dawn_2026-10-18_101500.jsonl.gz', 'dawn_latest_2026-10-18_101500.jsonl.gz',
+                 'dawn_latest_2026-10-18_101500-1.jsonl.gz']:
+        (tmp_path / name).write_text('')
+
+    assert export_files(str(tmp_path), 'dawn') == ['dawn_2026-10-18_101500.jsonl.gz']
+    assert export_files(str(tmp_path), 'dawn_latest') == [
+        'dawn_latest_2026-10-18_101500-1.jsonl.gz', 'dawn_latest_2026-10-18_101500.jsonl.gz'
+    ]
+
+def test_export_source_parses_export_names():
+    assert export_source('dawn_latest_2026-10-18_101500.jsonl.gz') == 'dawn_latest'
+    assert export_source('dawn_latest_2025-06-03.json') == 'dawn_latest'
+    assert export_source('dawn_latest_2026-10-18_101500.jsonl.part') is None
+    assert export_source('notes_2026-10-18.txt') is None
+
+def test_iter_articles_reads_every_file_in_order(tmp_path):
+    write_jsonl(tmp_path / 'dawn_latest_2025-06-03.jsonl', articles('a', 2))
+    write_jsonl(tmp_path / 'dawn_latest_2025-06-04.jsonl', articles('b', 1))
+
+    assert list(iter_articles(str(tmp_path))) == articles('a', 2) + articles('b', 1)
+
+def test_iter_article_chunks_uses_each_files_chunk_size(tmp_path):
+    write_jsonl(tmp_path / 'dawn_latest_2025-06-03.jsonl', articles('dawn', 5))
+    write_jsonl(tmp_path / 'tribune_latest_2025-06-03.jsonl', articles('tribune', 5))
+    sizes = {'dawn': 2, 'tribune': 4}
+
+    chunks = list(iter_article_chunks(str(tmp_path), chunk_size=lambda filename: sizes[filename.split('_')[0]]))
+
+    # Chunks never span two files
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1, 4, 1]
+    assert [article for chunk in chunks for article in chunk] == articles('dawn', 5) + articles('tribune', 5)
+
+def test_iter_article_chunks_only_reads_one_spiders_files(tmp_path):
+    write_jsonl(tmp_path / 'dawn_latest_2025-06-03.jsonl', articles('dawn', 3))
+    write_jsonl(tmp_path / 'tribune_latest_2025-06-03.jsonl', articles('tribune', 3))
+
+    chunks = list(iter_article_chunks(str(tmp_path), 'tribune_latest'))
+    assert chunks == [articles('tribune', 3)]
+
+def test_iter_export_file_stops_at_a_corrupt_gzip_member(tmp_path):
+    # A same-day re-run used to append a member after one cut short by a killed spider
+    path = tmp_path / 'dawn_latest_2025-06-03.jsonl.gz'
+    lines = lambda prefix: ''.join(json.dumps(a) + '\n' for a in articles(prefix, 200)).encode()
+    killed = gzip.compress(lines('killed'))
+    path.write_bytes(gzip.compress(lines('first')) + killed[:len(killed) // 2] + gzip.compress(lines('rerun')))
+
+    read = list(iter_export_file(str(path)))
+    assert read[:200] == articles('first', 200)
+
+def test_recover_part_files_publishes_stale_files_of_the_given_sources(tmp_path):
+    stale = time.time() - 7200
+    for name in ['dawn_latest_2026-10-18_101500.jsonl.gz.part', 'tribune_latest_2026-10-18_101500.jsonl.gz.part']:
+        (tmp_path / name).write_text('')
+        os.utime(tmp_path / name, (stale, stale))
+    (tmp_path / 'dawn_latest_2026-10-18_121500.jsonl.gz.part').write_text('')  # Still being written
+
+    assert recover_part_files(str(tmp_path), ['dawn_latest'], 3600) == ['dawn_latest_2026-10-18_101500.jsonl.gz']
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'dawn_latest_2026-10-18_101500.jsonl.gz', 'dawn_latest_2026-10-18_121500.jsonl.gz.part',
+        'tribune_latest_2026-10-18_101500.jsonl.gz.part'
+    ]
+    assert recover_part_files(str(tmp_path / 'missing'), ['dawn_latest'], 3600) == []
+
+def test_iter_export_file_skips_a_truncated_json_list(tmp_path):
+    path = tmp_path / 'dawn_latest_2026-10-18_101500.json'
+    path.write_text(json.dumps(articles('json', 2))[:-10])
+
+    assert list(iter_export_file(str(path))) == []
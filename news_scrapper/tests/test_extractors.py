@@ -0,0 +1,24 @@
+import pytest
+
+from news_scrapper.news_scrapper.extractors import extract_text
+
+FEED_HTML = [
+    '<p>Full article content here from feed.</p><p>Another paragraph.</p>',
+    '<div><p>Tribune <a href="/x">full</a> content.</p>\n<p> </p><p>Second&nbsp;paragraph.</p></div>',
+    'Plain summary without paragraphs, <b>bold</b> &amp; escaped.',
+    '<p>Before embed.</p><script>window.embed = 1;</script><p>After <!-- ad --> embed.</p>',
+]
+
+@pytest.mark.parametrize('html', FEED_HTML)
+def test_lxml_matches_beautifulsoup(html):
+    pytest.importorskip('bs4')
+    assert extract_text(html, 'lxml') == extract_text(html, 'bs4')
+
+def test_extract_text_joins_paragraphs_and_drops_scripts():
+    assert extract_text(FEED_HTML[3]) == 'Before embed. After embed.'
+    assert extract_text('<p> </p>') is None
+    assert extract_text(None) is None
+
+def test_extract_text_rejects_unknown_extractor():
+    with pytest.raises(ValueError):
+        extract_text('<p>text</p>', 'regex')
@@ -0,0 +1,72 @@
+import pytest
+from scrapy import Spider
+from scrapy.http import HtmlResponse, Request, Response
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+
+from news_scrapper.news_scrapper.httpcache import FeedRevalidationPolicy, LRUFilesystemCacheStorage
+
+FEED_URL = 'https://www.dawn.com/feed'
+
+@pytest.fixture
+def spider():
+    return Spider.from_crawler(get_crawler(Spider), name='test_spider')
+
+def cache_settings(tmp_path, **overrides):
+    return Settings(dict({'HTTPCACHE_DIR': str(tmp_path), 'HTTPCACHE_GZIP': True}, **overrides))
+
+def page(url, body=b'<p>' + b'x' * 2000 + b'</p>', **kwargs):
+    return HtmlResponse(url, body=body, request=Request(url), **kwargs)
+
+def test_storage_round_trips_compressed_bodies(tmp_path, spider):
+    storage = LRUFilesystemCacheStorage(cache_settings(tmp_path))
+    storage.open_spider(spider)
+    response = page('https://www.dawn.com/news/1')
+    storage.store_response(spider, response.request, response)
+
+    cached = storage.retrieve_response(spider, Request('https://www.dawn.com/news/1'))
+    assert cached.body == response.body
+    # Gzipped on disk, so the stored body is far smaller than the page
+    assert storage.size < len(response.body)
+
+def test_storage_evicts_least_recently_used(tmp_path, spider):
+    storage = LRUFilesystemCacheStorage(cache_settings(tmp_path, HTTPCACHE_GZIP=False))
+    storage.open_spider(spider)
+    urls = [f'https://www.dawn.com/news/{i}' for i in range(3)]
+    for url in urls[:2]:
+        storage.store_response(spider, Request(url), page(url))
+    storage.max_size = storage.size + 100
+
+    storage.retrieve_response(spider, Request(urls[0]))   # news/1 is now the least recently used
+    storage.store_response(spider, Request(urls[2]), page(urls[2]))
+
+    assert storage.retrieve_response(spider, Request(urls[1])) is None
+    assert storage.retrieve_response(spider, Request(urls[0])) is not None
+    assert storage.size <= storage.max_size
+
+def test_storage_rebuilds_index_on_open(tmp_path, spider):
+    storage = LRUFilesystemCacheStorage(cache_settings(tmp_path))
+    storage.open_spider(spider)
+    response = page('https://www.dawn.com/news/1')
+    storage.store_response(spider, response.request, response)
+
+    reopened = LRUFilesystemCacheStorage(cache_settings(tmp_path))
+    reopened.open_spider(spider)
+    assert reopened.size == storage.size
+
+def test_policy_reuses_article_pages_whatever_their_headers():
+    policy = FeedRevalidationPolicy(Settings())
+    request = Request('https://www.dawn.com/news/1')
+    response = page(request.url, headers={'Cache-Control': 'no-cache, max-age=0'})
+
+    assert policy.should_cache_response(response, request)
+    assert policy.is_cached_response_fresh(response, request)
+
+def test_policy_revalidates_stale_feed():
+    policy = FeedRevalidationPolicy(Settings())
+    request = Request(FEED_URL, meta={'conditional_feed': True})
+    cached = Response(FEED_URL, headers={'ETag': '"abc"', 'Cache-Control': 'max-age=0'})
+
+    assert not policy.is_cached_response_fresh(cached, request)
+    assert request.headers['If-None-Match'] == b'"abc"'
+    assert policy.is_cached_response_valid(cached, Response(FEED_URL, status=304), request)
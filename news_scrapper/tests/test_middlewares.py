@@ -0,0 +1,130 @@
+import asyncio
+import time
+import pytest
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import Request, Response
+from scrapy.settings import Settings
+
+from news_scrapper.news_scrapper.middlewares import ConditionalFeedMiddleware, RateLimitRetryMiddleware
+
+FEED_URL = 'https://www.dawn.com/feed'
+
+class MockSpider:
+    def __init__(self, mocker, stored_validators=None):
+        self.name = 'test_spider'
+        self.start_urls = [FEED_URL]
+        self.logger = mocker.Mock()
+        self.redis_client = mocker.Mock()
+        self.redis_client.hgetall = mocker.AsyncMock(return_value=stored_validators or {})
+        self.redis_client.hset = mocker.AsyncMock()
+
+@pytest.fixture
+def middleware(mocker):
+    return ConditionalFeedMiddleware(stats=mocker.Mock())
+
+def test_feed_request_gets_stored_validators(middleware, mocker):
+    spider = MockSpider(mocker, {b'etag': b'"abc"', b'last_modified': b'Tue, 03 Jun 2025 10:00:00 GMT'})
+    request = Request(FEED_URL)
+
+    assert asyncio.run(middleware.process_request(request, spider)) is None
+
+    assert request.headers['If-None-Match'] == b'"abc"'
+    assert request.headers['If-Modified-Since'] == b'Tue, 03 Jun 2025 10:00:00 GMT'
+    spider.redis_client.hgetall.assert_called_once_with(f'test_spider:feed:{FEED_URL}')
+
+def test_article_request_is_left_alone(middleware, mocker):
+    spider = MockSpider(mocker)
+    request = Request('https://www.dawn.com/news/1')
+
+    asyncio.run(middleware.process_request(request, spider))
+
+    assert 'If-None-Match' not in request.headers
+    spider.redis_client.hgetall.assert_not_called()
+
+def test_not_modified_feed_is_ignored(middleware, mocker):
+    spider = MockSpider(mocker)
+    request = Request(FEED_URL, meta={'conditional_feed': True})
+    response = Response(FEED_URL, status=304, request=request)
+
+    with pytest.raises(IgnoreRequest):
+        asyncio.run(middleware.process_response(request, response, spider))
+
+def test_modified_feed_passes_new_validators_to_the_spider(middleware, mocker):
+    spider = MockSpider(mocker)
+    request = Request(FEED_URL, meta={'conditional_feed': True})
+    response = Response(FEED_URL, status=200, request=request, headers={'ETag': '"def"'})
+
+    assert asyncio.run(middleware.process_response(request, response, spider)) is response
+
+    # Stored by the spider once the feed is parsed, not before
+    spider.redis_client.hset.assert_not_called()
+    assert response.meta['feed_validators_key'] == f'test_spider:feed:{FEED_URL}'
+    assert response.meta['new_feed_validators'] == {'etag': b'"def"'}
+
+
+# --- Rate limiting and retries ---
+
+@pytest.fixture
+def rate_limiter(mocker):
+    crawler = mocker.Mock()
+    crawler.settings = Settings({
+        'RATE_LIMITS': {'dawn.com': '60/m'},
+        'RATE_LIMIT_BURST': 1,
+        'RATE_LIMIT_SUSTAINED': 2,
+        'RETRY_TIMES': 3,
+        'RETRY_HTTP_CODES': [503],
+        'RETRY_BACKOFF_BASE': 10,
+    })
+    crawler.engine.downloader.slots = {}
+    return RateLimitRetryMiddleware(crawler)
+
+def test_rate_limiter_matches_subdomains_to_configured_domain(rate_limiter):
+    assert rate_limiter.domain(Request('https://www.dawn.com/news/1')) == 'dawn.com'
+    assert rate_limiter.domain(Request('https://www.dawn.com/news/1', meta={'download_slot': 'dawn.com'})) == 'dawn.com'
+    assert rate_limiter.domain(Request('https://example.com/rss')) == 'example.com'
+    assert rate_limiter.bucket('dawn.com').rate == 1
+    assert rate_limiter.bucket('example.com').rate == 1   # RATE_LIMIT_DEFAULT
+
+def test_rate_limiter_waits_for_token(rate_limiter, mocker):
+    wait = mocker.patch.object(rate_limiter, 'wait', mocker.AsyncMock())
+    spider = mocker.Mock()
+
+    asyncio.run(rate_limiter.process_request(Request(FEED_URL), spider))
+    wait.assert_not_called()
+    asyncio.run(rate_limiter.process_request(Request(FEED_URL), spider))
+    assert wait.call_args.args[1] == pytest.approx(1, abs=0.1)
+
+def test_throttled_response_is_retried_with_backoff_and_slows_domain(rate_limiter, mocker):
+    mocker.patch('news_scrapper.news_scrapper.middlewares.random.uniform', return_value=1)
+    spider = mocker.Mock()
+    request = Request(FEED_URL)
+
+    retry = rate_limiter.process_response(request, Response(FEED_URL, status=503, request=request), spider)
+    assert retry.meta['retry_times'] == 1
+    assert rate_limiter.bucket('dawn.com').rate == 0.5
+
+    again = rate_limiter.process_response(
+        retry, Response(FEED_URL, status=503, request=retry, headers={'Retry-After': '120'}), spider
+    )
+    assert again.meta['retry_times'] == 2
+    # Twice the first backoff, unless the server asked for longer
+    assert rate_limiter.backoff(2) == 20
+    assert again.meta['retry_at'] - time.monotonic() == pytest.approx(120, abs=1)
+
+    for _ in range(4):
+        response = Response(FEED_URL, status=200, request=request)
+        assert rate_limiter.process_response(request, response, spider) is response
+    assert rate_limiter.bucket('dawn.com').rate == pytest.approx(0.390625)
+
+def test_cached_feed_with_stored_validators_is_ignored(middleware, mocker):
+    spider = MockSpider(mocker, {b'etag': b'"abc"'})
+    request = Request(FEED_URL)
+    asyncio.run(middleware.process_request(request, spider))
+
+    # The HTTP cache answered with the version this feed was last parsed at
+    cached = Response(FEED_URL, status=200, request=request, headers={'ETag': '"abc"'}, flags=['cached'])
+    with pytest.raises(IgnoreRequest):
+        asyncio.run(middleware.process_response(request, cached, spider))
+
+    newer = Response(FEED_URL, status=200, request=request, headers={'ETag': '"def"'}, flags=['cached'])
+    assert asyncio.run(middleware.process_response(request, newer, spider)) is newer
@@ -0,0 +1,90 @@
+from datetime import datetime, timezone, timedelta
+
+from news_scrapper.news_scrapper.partitions import (
+    month_start, next_month, months_before, partition_name, retention_cutoff, ensure_partitions,
+    detach_partitions, expire_urls
+)
+
+UTC = timezone.utc
+
+class FakeCursor:
+    def __init__(self, partitions=()):
+        self.partitions = list(partitions)
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    def fetchall(self):
+        return [(name,) for name in self.partitions]
+
+class FakeConnection:
+    """Records statements and commits in order; each DELETE removes min(batch, remaining) URLs"""
+
+    def __init__(self, partitions=(), expired_urls=0):
+        self.cur = FakeCursor(partitions)
+        self.expired_urls = expired_urls
+        self.log = []
+
+    def cursor(self):
+        connection = self
+        class Cursor:
+            rowcount = 0
+            def __enter__(self):
+                return self
+            def __exit__(self, *exc):
+                return False
+            def execute(self, query, params=None):
+                connection.cur.execute(query, params)
+                connection.log.append(query.split()[0])
+                if query.split()[0] == 'DELETE':
+                    self.rowcount = min(params[1], connection.expired_urls)
+                    connection.expired_urls -= self.rowcount
+            def fetchall(self):
+                return connection.cur.fetchall()
+        return Cursor()
+
+    def commit(self):
+        self.log.append('COMMIT')
+
+def test_month_start_uses_the_utc_month():
+    assert month_start('Sat, 01 Jun 2024 02:00:00 +0500') == datetime(2024, 5, 1, tzinfo=UTC)
+    assert month_start(datetime(2024, 6, 30, 23, 59, tzinfo=timezone(timedelta(hours=-5)))) == datetime(2024, 7, 1, tzinfo=UTC)
+    assert month_start(None) is None
+
+def test_month_arithmetic_crosses_years():
+    assert next_month(datetime(2024, 12, 1, tzinfo=UTC)) == datetime(2025, 1, 1, tzinfo=UTC)
+    assert months_before(datetime(2025, 2, 1, tzinfo=UTC), 3) == datetime(2024, 11, 1, tzinfo=UTC)
+    assert partition_name(datetime(2025, 2, 1, tzinfo=UTC)) == 'news_2025_02'
+
+def test_retention_cutoff_keeps_the_current_month():
+    now = datetime(2025, 3, 15, tzinfo=UTC)
+    assert retention_cutoff(1, now) == datetime(2025, 3, 1, tzinfo=UTC)
+    assert retention_cutoff(12, now) == datetime(2024, 4, 1, tzinfo=UTC)
+
+def test_ensure_partitions_creates_only_missing_months():
+    cur = FakeCursor(partitions=['news_2025_06', 'news_undated'])
+    created = ensure_partitions(cur, ['2025-06-03T11:00:00+00:00', '2025-07-01T00:00:00+00:00', None])
+
+    assert created == ['news_2025_07']
+    query, params = cur.executed[-1]
+    assert 'news_2025_07 PARTITION OF news' in query
+    assert params == (datetime(2025, 7, 1, tzinfo=UTC), datetime(2025, 8, 1, tzinfo=UTC))
+
+def test_ensure_partitions_skips_the_catalog_for_undated_batches():
+    cur = FakeCursor()
+    assert ensure_partitions(cur, [None, None]) == []
+    assert cur.executed == []
+
+def test_detach_partitions_commits_before_expiring_urls():
+    conn = FakeConnection(partitions=['news_2025_01', 'news_2025_02', 'news_2025_03'], expired_urls=5)
+    detached = detach_partitions(conn, datetime(2025, 3, 10, tzinfo=UTC))
+
+    assert detached == ['news_2025_01', 'news_2025_02']
+    # The catalog-only detach commits on its own; the URL deletes follow in their own transactions
+    assert conn.log == ['SELECT', 'ALTER', 'ALTER', 'ALTER', 'ALTER', 'COMMIT', 'DELETE', 'COMMIT']
+
+def test_expire_urls_deletes_in_batches():
+    conn = FakeConnection(expired_urls=25)
+    assert expire_urls(conn, datetime(2025, 3, 1, tzinfo=UTC), batch_size=10) == 25
+    assert conn.log == ['DELETE', 'COMMIT'] * 3
@@ -1,10 +1,18 @@
+import asyncio
+import gzip
+import json
+import os
 import pytest
+import time
 from datetime import datetime, timezone
 from scrapy.exceptions import DropItem
 
 # Adjust imports based on your project structure
 from news_scrapper.news_scrapper.items import NewsArticleItem
 from news_scrapper.news_scrapper.pipelines import NewsValidationPipeline # Assuming this is where your pipeline is
+from news_scrapper.news_scrapper.pipelines import JsonExportPipeline, NearDuplicatePipeline, PostgresPipeline
+from news_scrapper.news_scrapper.exports import export_files, iter_export_file
+from news_scrapper.news_scrapper.simhash import simhash, hamming_distance
 
 # Mock a spider for pipeline testing
 class MockSpider:
@@ -111,3 +119,272 @@ def test_validation_pipeline_empty_optional_fields(valid_item_data, mock_spider_
 # which is beyond "basic" unit tests for this context.
 # If JsonExportPipeline has complex logic beyond just writing to a file,
 # that logic could be unit tested by mocking the file writing part.
+
+def test_json_export_pipeline_streams_gzipped_json_lines(tmp_path, valid_item_data, mock_spider_instance):
+    pipeline = JsonExportPipeline(export_dir=str(tmp_path), export_format='jsonl', compression='gz', flush_every=1)
+    pipeline.open_spider(mock_spider_instance)
+    pipeline.process_item(NewsArticleItem(**valid_item_data), mock_spider_instance)
+    second_item = dict(valid_item_data, url='http://example.com/second')
+    pipeline.process_item(NewsArticleItem(**second_item), mock_spider_instance)
+
+    assert pipeline.items == [] # Items are written out, not buffered
+    pipeline.close_spider(mock_spider_instance)
+
+    [export_file] = tmp_path.iterdir()
+    assert export_file.name.endswith('.jsonl.gz')
+    with gzip.open(export_file, 'rt', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert [line['url'] for line in lines] == ['http://example.com/valid', 'http://example.com/second']
+
+def test_json_export_pipeline_rotates_files(tmp_path, valid_item_data, mock_spider_instance, mocker):
+    monotonic = mocker.patch('news_scrapper.news_scrapper.pipelines.time.monotonic', return_value=0)
+    pipeline = JsonExportPipeline(export_dir=str(tmp_path), export_format='jsonl', rotate_interval=300)
+    pipeline.open_spider(mock_spider_instance)
+    pipeline.process_item(NewsArticleItem(**valid_item_data), mock_spider_instance)
+
+    # The open file is not picked up for ingestion until it is closed
+    [part_file] = tmp_path.iterdir()
+    assert part_file.name.endswith('.jsonl.part')
+
+    monotonic.return_value = 300
+    pipeline.spider_idle(mock_spider_instance)
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == ['.jsonl', '.part']
+
+    # A file that received nothing is discarded rather than published empty
+    pipeline.close_spider(mock_spider_instance)
+    assert [path.suffix for path in tmp_path.iterdir()] == ['.jsonl']
+
+def test_validation_pipeline_sets_content_hash(valid_item_data, mock_spider_instance):
+    pipeline = NewsValidationPipeline()
+    first = pipeline.process_item(NewsArticleItem(**valid_item_data), mock_spider_instance)
+    same = pipeline.process_item(NewsArticleItem(**valid_item_data), mock_spider_instance)
+    changed = pipeline.process_item(
+        NewsArticleItem(**dict(valid_item_data, content='Edited content.')), mock_spider_instance
+    )
+
+    assert len(first['content_hash']) == 64
+    assert first['content_hash'] == same['content_hash'] # processed_at does not affect the hash
+    assert first['content_hash'] != changed['content_hash']
+
+
+# --- Near-duplicate clustering ---
+
+class FakeHashPipeline:
+    """Just enough of a Redis pipeline for HGETALL/HSET/EXPIRE against in-memory hashes"""
+
+    def __init__(self, hashes):
+        self.hashes = hashes
+        self.calls = []
+
+    def hgetall(self, key):
+        self.calls.append(lambda: {k.encode(): v.encode() for k, v in self.hashes.get(key, {}).items()})
+
+    def hset(self, key, field, value):
+        self.calls.append(lambda: self.hashes.setdefault(key, {}).__setitem__(field, value))
+
+    def expire(self, key, seconds):
+        self.calls.append(lambda: True)
+
+    async def execute(self):
+        results = [call() for call in self.calls]
+        self.calls = []
+        return results
+
+class FakeHashRedis:
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return FakeHashPipeline(self.hashes)
+
+WIRE_STORY = (
+    "ISLAMABAD: The federal cabinet on Tuesday approved the budget strategy paper for the next fiscal year, "
+    "setting a growth target of 3.6 percent and a fiscal deficit target of 5.9 percent of GDP, "
+    "officials said after the meeting chaired by the prime minister."
+)
+
+def test_simhash_is_close_for_near_identical_text():
+    # The same wire story with another dateline or an agency credit
+    for edited in (WIRE_STORY.replace("ISLAMABAD:", "ISLAMABAD, June 3:"), WIRE_STORY + " (APP)"):
+        assert hamming_distance(simhash(WIRE_STORY), simhash(edited)) <= 3
+    assert hamming_distance(simhash(WIRE_STORY), simhash("Cricket team announced for the tour of England.")) > 3
+
+def test_near_duplicate_pipeline_clusters_wire_stories(mock_spider_instance):
+    mock_spider_instance.redis_client = FakeHashRedis()
+    pipeline = NearDuplicatePipeline()
+
+    def cluster(url, content):
+        item = NewsArticleItem(url=url, heading='Budget', content=content)
+        return asyncio.run(pipeline.process_item(item, mock_spider_instance))['cluster_id']
+
+    dawn = cluster('https://www.dawn.com/news/1', WIRE_STORY)
+    tribune = cluster('https://tribune.com.pk/story/1', WIRE_STORY + " (APP)")
+    other = cluster('https://tribune.com.pk/story/2', "Cricket team announced for the tour of England next month.")
+
+    assert tribune == dawn
+    assert other != dawn
+
+def test_json_export_pipeline_writes_a_file_per_source(tmp_path, valid_item_data, mock_spider_instance):
+    pipeline = JsonExportPipeline(export_dir=str(tmp_path), export_format='jsonl')
+    pipeline.open_spider(mock_spider_instance)
+    pipeline.process_item(NewsArticleItem(**valid_item_data, spider_name='dawn_latest'), mock_spider_instance)
+    pipeline.process_item(NewsArticleItem(**valid_item_data, spider_name='tribune_latest'), mock_spider_instance)
+    pipeline.close_spider(mock_spider_instance)
+
+    # The ingest flow picks up each source's files by name
+    assert sorted(path.name.rsplit('_', 2)[0] for path in tmp_path.iterdir()) == ['dawn_latest', 'tribune_latest']
+
+def test_json_export_pipeline_writes_each_run_to_its_own_file(tmp_path, valid_item_data, mock_spider_instance):
+    for run in range(2):
+        pipeline = JsonExportPipeline(export_dir=str(tmp_path), export_format='jsonl', compression='gz')
+        pipeline.open_spider(mock_spider_instance)
+        pipeline.process_item(NewsArticleItem(**valid_item_data), mock_spider_instance)
+
+        # Nothing is published until the run closes its file
+        assert [path.suffix for path in tmp_path.iterdir() if path.suffix != '.gz'] == ['.part']
+        pipeline.close_spider(mock_spider_instance)
+
+    # A same-day re-run never appends to a file that may already be loading
+    files = sorted(tmp_path.iterdir())
+    assert len(files) == 2
+    for path in files:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            assert len(f.readlines()) == 1
+
+def test_json_export_pipeline_recovers_files_left_by_a_killed_run(tmp_path, valid_item_data, mock_spider_instance):
+    killed = JsonExportPipeline(export_dir=str(tmp_path), export_format='jsonl', compression='gz', flush_every=1)
+    killed.open_spider(mock_spider_instance)
+    killed.process_item(NewsArticleItem(**valid_item_data), mock_spider_instance)
+    # The process dies here: close_spider never runs and the file keeps its '.part' name
+    [part] = tmp_path.iterdir()
+    stale = time.time() - 7200
+    os.utime(part, (stale, stale))
+
+    pipeline = JsonExportPipeline(export_dir=str(tmp_path), export_format='jsonl', compression='gz', stale_after=3600)
+    pipeline.open_spider(mock_spider_instance)
+
+    recovered = tmp_path / part.name[:-len('.part')]
+    assert sorted(tmp_path.iterdir()) == [recovered]
+    assert [a['url'] for a in iter_export_file(str(recovered))] == [valid_item_data['url']]
+
+@pytest.fixture
+def postgres_pipeline(mocker):
+    """PostgresPipeline whose writes are Deferreds the test fires by hand"""
+    from twisted.internet.defer import Deferred
+    pipeline = PostgresPipeline(db_config={}, batch_size=2, max_pending=1, flush_interval=60, stats=mocker.Mock())
+    writes = []
+    def defer_to_thread(function, batch):
+        writes.append((batch, Deferred()))
+        return writes[-1][1]
+    mocker.patch('news_scrapper.news_scrapper.pipelines.deferToThread', side_effect=defer_to_thread)
+    return pipeline, writes
+
+def test_postgres_pipeline_writes_full_batches(postgres_pipeline, valid_item_data, mock_spider_instance):
+    pipeline, writes = postgres_pipeline
+    first = NewsArticleItem(**valid_item_data)
+    assert pipeline.process_item(first, mock_spider_instance) is first
+    assert writes == []
+
+    pipeline.process_item(NewsArticleItem(**dict(valid_item_data, url='http://example.com/2')), mock_spider_instance)
+    [(batch, write)] = writes
+    assert [article['url'] for article in batch] == ['http://example.com/valid', 'http://example.com/2']
+
+    write.callback({'inserted': 2, 'updated': 0, 'unchanged': 0})
+    pipeline.stats.inc_value.assert_any_call('db_pipeline/inserted', 2, spider=mock_spider_instance)
+
+def test_postgres_pipeline_holds_items_back_while_queue_is_full(postgres_pipeline, valid_item_data, mock_spider_instance):
+    pipeline, writes = postgres_pipeline
+    for i in range(2):
+        pipeline.process_item(NewsArticleItem(**dict(valid_item_data, url=f'http://example.com/{i}')), mock_spider_instance)
+
+    # The only queue slot is taken by the batch being written, so the next item waits
+    waiting = NewsArticleItem(**dict(valid_item_data, url='http://example.com/waiting'))
+    held = pipeline.process_item(waiting, mock_spider_instance)
+    results = []
+    held.addCallback(results.append)
+    assert results == [] and pipeline.buffer == []
+
+    writes[0][1].callback({'inserted': 2})
+    assert results == [waiting]
+    assert [article['url'] for article in pipeline.buffer] == ['http://example.com/waiting']
+
+def test_postgres_pipeline_flushes_on_close(postgres_pipeline, valid_item_data, mock_spider_instance, mocker):
+    close_pool = mocker.patch('news_scrapper.news_scrapper.pipelines.close_pool')
+    pipeline, writes = postgres_pipeline
+    pipeline.process_item(NewsArticleItem(**valid_item_data), mock_spider_instance)
+
+    closed = []
+    pipeline.close_spider(mock_spider_instance).addCallback(closed.append)
+    [(batch, write)] = writes
+    assert len(batch) == 1 and closed == []
+
+    write.callback({'inserted': 1})
+    assert len(closed) == 1
+    close_pool.assert_called_once()
+
+def test_postgres_pipeline_saves_failed_batches_for_ingestion(postgres_pipeline, valid_item_data, mock_spider_instance,
+                                                            tmp_path):
+    import psycopg2
+    pipeline, writes = postgres_pipeline
+    pipeline.failed_dir = str(tmp_path / 'articles')
+    for source in ['dawn_latest', 'tribune_latest']:
+        item = dict(valid_item_data, url=f'http://example.com/{source}', spider_name=source)
+        pipeline.process_item(NewsArticleItem(**item), mock_spider_instance)
+
+    writes[0][1].errback(psycopg2.OperationalError("server closed the connection unexpectedly"))
+
+    # Each source's articles land in an export the ingest flow loads for that source
+    for source in ['dawn_latest', 'tribune_latest']:
+        [filename] = export_files(pipeline.failed_dir, source)
+        articles = list(iter_export_file(os.path.join(pipeline.failed_dir, filename)))
+        assert [article['url'] for article in articles] == [f'http://example.com/{source}']
+    pipeline.stats.inc_value.assert_any_call('db_pipeline/failed', 2, spider=mock_spider_instance)
+    assert pipeline.queue == [] and pipeline.writing is None
+
+def test_json_export_pipeline_publishes_json_files_whole(tmp_path, valid_item_data, mock_spider_instance):
+    # A second run the same day gets its own file
+    for run in range(2):
+        pipeline = JsonExportPipeline(export_dir=str(tmp_path), export_format='json')
+        pipeline.open_spider(mock_spider_instance)
+        pipeline.process_item(NewsArticleItem(**valid_item_data), mock_spider_instance)
+        pipeline.close_spider(mock_spider_instance)
+
+    files = sorted(tmp_path.iterdir())
+    assert [path.suffix for path in files] == ['.json', '.json']
+    assert all(len(json.loads(path.read_text())) == 1 for path in files)
+
+class FakeCounterRedis:
+    def __init__(self, error=None):
+        self.error = error
+        self.counters = {}
+
+    def incr(self, key):
+        if self.error:
+            raise self.error
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+def test_postgres_pipeline_invalidates_the_api_cache_after_changes(mocker):
+    from news_scrapper.news_scrapper.cache import GENERATION_KEY
+    pipeline = PostgresPipeline(db_config={}, redis_config={'host': 'redis', 'port': 6379, 'db': 0})
+    assert pipeline.redis_client.connection_pool.connection_kwargs['host'] == 'redis'
+    pipeline.redis_client = FakeCounterRedis()
+    mocker.patch('news_scrapper.news_scrapper.pipelines.connection')
+    upsert = mocker.patch('news_scrapper.news_scrapper.pipelines.upsert_article_batch')
+
+    upsert.return_value = {'inserted': 0, 'updated': 0, 'unchanged': 2}
+    pipeline.write_batch([{}, {}])
+    assert pipeline.redis_client.counters == {}
+
+    upsert.return_value = {'inserted': 1, 'updated': 0, 'unchanged': 1}
+    pipeline.write_batch([{}, {}])
+    assert pipeline.redis_client.counters == {GENERATION_KEY: 1}
+
+def test_postgres_pipeline_writes_even_when_redis_is_down(mocker):
+    import redis
+    pipeline = PostgresPipeline(db_config={})
+    pipeline.redis_client = FakeCounterRedis(error=redis.ConnectionError("refused"))
+    mocker.patch('news_scrapper.news_scrapper.pipelines.connection')
+    mocker.patch('news_scrapper.news_scrapper.pipelines.upsert_article_batch', return_value={'inserted': 1})
+
+    assert pipeline.write_batch([{}]) == {'inserted': 1}
@@ -0,0 +1,48 @@
+import pytest
+
+from news_scrapper.news_scrapper.ratelimit import parse_rate, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_parse_rate_converts_to_requests_per_second():
+    assert parse_rate('10/m') == pytest.approx(10 / 60)
+    assert parse_rate('2/s') == 2
+    assert parse_rate('360/hour') == pytest.approx(0.1)
+
+@pytest.mark.parametrize('rate', ['10', '10/d', 'ten/m'])
+def test_parse_rate_rejects_malformed_rates(rate):
+    with pytest.raises(ValueError):
+        parse_rate(rate)
+
+def test_token_bucket_allows_burst_then_spaces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=2, clock=clock)
+
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 1, 2]
+    clock.now = 10
+    # Tokens refill up to the burst only
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 1]
+
+def test_token_bucket_slows_down_and_recovers_to_configured_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=5, min_rate=0.25, clock=clock)
+
+    assert bucket.slow_down()
+    assert bucket.slow_down()
+    assert not bucket.slow_down()   # Already at the floor
+    assert bucket.rate == 0.25
+    # Saved-up burst is dropped, so the next request already waits at the lower rate
+    assert bucket.reserve() == 4
+
+    assert not bucket.record_success(sustained=3)
+    assert not bucket.record_success(sustained=3)
+    assert bucket.record_success(sustained=3)
+    assert bucket.rate == pytest.approx(0.3125)
+    for _ in range(30):
+        bucket.record_success(sustained=3, factor=2)
+    assert bucket.rate == 1   # Never above the configured rate
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from news_scrapper.news_scrapper.search import search_articles, MAX_PER_PAGE
+
+class FakeConnection:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.executed = []
+        self.rolled_back = False
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        self.executed.append((query, params))
+        self.description = [SimpleNamespace(name=name) for name in ('id', 'heading', 'rank')]
+
+    def fetchall(self):
+        return self.rows
+
+    def rollback(self):
+        self.rolled_back = True
+
+def test_search_articles_returns_rows_as_dicts():
+    conn = FakeConnection(rows=[(1, 'Flood relief', 0.5)])
+    assert search_articles(conn, 'flood relief') == [{'id': 1, 'heading': 'Flood relief', 'rank': 0.5}]
+    assert conn.rolled_back
+
+def test_search_articles_only_filters_on_given_fields():
+    conn = FakeConnection()
+    search_articles(conn, 'flood', spider_name='dawn_latest', since='2025-06-01')
+    query, params = conn.executed[0]
+
+    assert 'spider_name = %(spider_name)s' in query
+    assert 'published_at >= %(since)s::timestamptz' in query
+    assert 'category =' not in query
+    assert 'published_at <' not in query
+    assert params['spider_name'] == 'dawn_latest'
+
+def test_search_articles_pages_and_caps_page_size():
+    conn = FakeConnection()
+    search_articles(conn, 'flood', page=3, per_page=10)
+    search_articles(conn, 'flood', page=0, per_page=10000)
+
+    assert (conn.executed[0][1]['limit'], conn.executed[0][1]['offset']) == (10, 20)
+    assert (conn.executed[1][1]['limit'], conn.executed[1][1]['offset']) == (MAX_PER_PAGE, 0)
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from news_scrapper import spider_runner
+
+class FakeReader:
+    def __init__(self, stats=None):
+        self.stats = stats
+        self.closed = False
+
+    def poll(self):
+        return True
+
+    def recv(self):
+        # A child that died before sending leaves a closed pipe
+        if self.stats is None:
+            raise EOFError
+        return self.stats
+
+    def close(self):
+        self.closed = True
+
+class FakeWriter:
+    def close(self):
+        pass
+
+class FakeProcess:
+    def __init__(self, context, exitcode, hangs):
+        self.context = context
+        self.exitcode = None
+        self.final_exitcode = exitcode
+        self.hangs = hangs
+        self.terminated = False
+        self.sentinel = object()
+
+    def start(self):
+        with self.context.lock:
+            self.context.alive += 1
+            self.context.max_alive = max(self.context.max_alive, self.context.alive)
+
+    def join(self, timeout=None):
+        if self.hangs and not self.terminated:
+            return
+        if self.exitcode is None:
+            with self.context.lock:
+                self.context.alive -= 1
+            self.exitcode = -15 if self.terminated else self.final_exitcode
+
+    def is_alive(self):
+        return self.exitcode is None
+
+    def terminate(self):
+        self.terminated = True
+
+class FakeContext:
+    """Stands in for the spawn context; every process it starts behaves the same way"""
+
+    def __init__(self, stats=None, exitcode=0, hangs=False):
+        self.stats = stats
+        self.exitcode = exitcode
+        self.hangs = hangs
+        self.processes = []
+        self.readers = []
+        self.alive = 0
+        self.max_alive = 0
+        self.lock = threading.Lock()
+
+    def Pipe(self, duplex=True):
+        reader = FakeReader(self.stats)
+        self.readers.append(reader)
+        return reader, FakeWriter()
+
+    def Process(self, target, args, name):
+        process = FakeProcess(self, self.exitcode, self.hangs)
+        self.processes.append(process)
+        return process
+
+@pytest.fixture
+def fake_context(mocker):
+    def install(**behaviour):
+        context = FakeContext(**behaviour)
+        mocker.patch.object(spider_runner, '_context', context)
+        return context
+    return install
+
+def test_run_spider_returns_the_childs_stats(fake_context, mocker):
+    context = fake_context(stats={'finish_reason': 'finished', 'item_scraped_count': 3})
+    mocker.patch.object(spider_runner, 'wait', side_effect=lambda objects, timeout: objects[:1])
+
+    result = spider_runner.run_spider('dawn_latest', timeout=5)
+
+    assert result.ok
+    assert result.stats == {'finish_reason': 'finished', 'item_scraped_count': 3}
+    assert context.readers[0].closed
+
+def test_run_spider_terminates_a_spider_past_its_timeout(fake_context, mocker):
+    context = fake_context(hangs=True)
+    mocker.patch.object(spider_runner, 'wait', return_value=[])
+
+    result = spider_runner.run_spider('dawn_latest', timeout=0.01)
+
+    assert result.timed_out
+    assert not result.ok
+    assert context.processes[0].terminated
+    assert result.stats == {}
+
+def test_run_spider_reports_a_crash_before_stats_were_sent(fake_context, mocker):
+    fake_context(stats=None, exitcode=1)
+    mocker.patch.object(spider_runner, 'wait', side_effect=lambda objects, timeout: objects[1:])
+
+    result = spider_runner.run_spider('dawn_latest', timeout=5)
+
+    assert result.stats == {}
+    assert result.exit_code == 1
+    assert not result.timed_out
+    assert not result.ok
+
+def test_run_spiders_caps_processes_alive_at_once(fake_context, mocker):
+    context = fake_context(stats={'finish_reason': 'finished'})
+    mocker.patch.object(spider_runner, '_process_slots', threading.BoundedSemaphore(2))
+    def slow_wait(objects, timeout):
+        time.sleep(0.05)
+        return objects[:1]
+    mocker.patch.object(spider_runner, 'wait', side_effect=slow_wait)
+
+    results = spider_runner.run_spiders([f'spider_{i}' for i in range(5)], timeout=5)
+
+    assert [result.spider_name for result in results] == [f'spider_{i}' for i in range(5)]
+    assert all(result.ok for result in results)
+    assert context.max_alive == 2
@@ -1,3 +1,5 @@
+import asyncio
+import json
 import pytest
 from scrapy.http import TextResponse, Request # Added Request
 from scrapy.item import Item, Field
@@ -8,8 +10,23 @@ import time # For struct_time
 # Adjust imports based on your project structure
 from news_scrapper.news_scrapper.spiders.Dawn_spider import DawnLatestSpider
 from news_scrapper.news_scrapper.spiders.tribune_latest import TribuneLatestSpider
+from news_scrapper.news_scrapper.spiders.feed_spider import FeedSpider
+from news_scrapper.news_scrapper.spiders.multi_feed_spider import MultiFeedSpider
+from news_scrapper.news_scrapper.feeds import FEED_SPECS, load_registry
 from news_scrapper.news_scrapper.items import NewsArticleItem
 
+def collect(async_gen):
+    """Drain an async spider callback into a list"""
+    async def _collect():
+        return [result async for result in async_gen]
+    return asyncio.run(_collect())
+
+def treat_all_entries_as_new(mocker, spider):
+    """Bypass the Redis watermark and dedup lookups in parse"""
+    mocker.patch.object(spider, 'filter_unscraped', side_effect=lambda urls, source=None: urls)
+    mocker.patch.object(spider, 'load_watermark', return_value=(None, set(), set()))
+    mocker.patch.object(spider, 'save_watermark')
+
 # --- Mock RSS Data ---
 
 MOCK_DAWN_RSS_CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
@@ -63,7 +80,7 @@ MOCK_TRIBUNE_RSS_CONTENT = """<?xml version="1.0" encoding="UTF-8"?>
 
 def test_dawn_spider_parse_rss(mocker):
     spider = DawnLatestSpider()
-    mocker.patch.object(spider, 'is_article_scraped', return_value=False)
+    treat_all_entries_as_new(mocker, spider)
 
     mock_response = TextResponse(
         url=spider.start_urls[0],
@@ -71,7 +88,7 @@ def test_dawn_spider_parse_rss(mocker):
         encoding='utf-8'
     )
 
-    requests = list(spider.parse(mock_response))
+    requests = collect(spider.parse(mock_response))
 
     assert len(requests) == 2 # We have 2 items in mock Dawn RSS
     assert spider.stats['articles_found'] == 2
@@ -88,7 +105,7 @@ def test_dawn_spider_parse_rss(mocker):
 
 def test_tribune_spider_parse_rss(mocker):
     spider = TribuneLatestSpider()
-    mocker.patch.object(spider, 'is_article_scraped', return_value=False)
+    treat_all_entries_as_new(mocker, spider)
 
     mock_response = TextResponse(
         url=spider.start_urls[0],
@@ -96,7 +113,7 @@ def test_tribune_spider_parse_rss(mocker):
         encoding='utf-8'
     )
 
-    requests = list(spider.parse(mock_response))
+    requests = collect(spider.parse(mock_response))
 
     assert len(requests) == 1 # We have 1 item in mock Tribune RSS
     assert spider.stats['articles_found'] == 1
@@ -150,21 +167,7 @@ def test_dawn_spider_parse_article_from_feed(mock_dawn_spider, mocker):
     )
     # mock_response.meta = {'feed_entry': mock_feed_entry} # No longer needed
 
-    # Patching BeautifulSoup in the context of the spider's module
-    bs_mock_soup = mocker.Mock()
-
-    p_tag_mock1 = mocker.Mock()
-    p_tag_mock1.get_text.return_value = "Full article content here from feed."
-    p_tag_mock2 = mocker.Mock()
-    p_tag_mock2.get_text.return_value = "Another paragraph."
-
-    bs_mock_soup.find_all.return_value = [p_tag_mock1, p_tag_mock2]
-    # Fallback if find_all returns empty or joined result is empty
-    bs_mock_soup.get_text.return_value = "Full article content here from feed. Another paragraph."
-    mocker.patch('news_scrapper.news_scrapper.spiders.Dawn_spider.BeautifulSoup', return_value=bs_mock_soup)
-
-    item_generator = spider.parse_article(mock_response)
-    item = next(item_generator)
+    item = collect(spider.parse_article(mock_response))[0]
 
 
     assert isinstance(item, NewsArticleItem)
@@ -175,7 +178,7 @@ def test_dawn_spider_parse_article_from_feed(mock_dawn_spider, mocker):
     assert item['content'] == 'Full article content here from feed. Another paragraph.'
     assert item['url'] == mock_feed_entry.link
 
-    spider.mark_article_scraped.assert_called_once_with(mock_response.url)
+    spider.mark_article_scraped.assert_called_once_with(mock_response.url, spider.name)
     assert spider.stats['articles_scraped'] == 1
 
 
@@ -188,7 +191,7 @@ def test_dawn_spider_parse_article_content_fallback(mock_dawn_spider, mocker):
         'author': 'Feed Author Fallback',
         'published': '2025-06-03T15:00:00+00:00',
         'tags': [{'term': 'Feed Cat Fallback'}],
-        'summary': '<p>Tiny.</p>',
+        'summary': '<p>Tiny.</p>',  # Below the threshold, so the XPath paragraphs win
     }
     # For ISO format string, published_parsed might not be set by feedparser, or be None.
     # Let the spider's string parsing logic handle this.
@@ -212,20 +215,31 @@ def test_dawn_spider_parse_article_content_fallback(mock_dawn_spider, mocker):
     )
     # mock_response.meta = {'feed_entry': mock_feed_entry} # No longer needed
 
-    bs_mock_instance = mocker.Mock()
-    bs_mock_instance.find_all.return_value = [] # Simulate no <p> tags from feed summary
-    bs_mock_instance.get_text.return_value = "" # Simulate an empty string from feed summary to trigger XPath
-    mocker.patch('news_scrapper.news_scrapper.spiders.Dawn_spider.BeautifulSoup', return_value=bs_mock_instance)
 
-
-    item_generator = spider.parse_article(mock_response)
-    item = next(item_generator)
+    item = collect(spider.parse_article(mock_response))[0]
 
     assert isinstance(item, NewsArticleItem)
     assert item['heading'] == 'Dawn Feed Title Fallback'
     assert item['content'] == 'This is paragraph one from XPath. This is paragraph two from XPath.'
     assert item['url'] == mock_feed_entry.link
-    spider.mark_article_scraped.assert_called_once_with(mock_response.url)
+    spider.mark_article_scraped.assert_called_once_with(mock_response.url, spider.name)
+
+
+def test_parse_article_prefers_page_over_short_feed_teaser(mock_dawn_spider):
+    spider = mock_dawn_spider
+    feed_entry = feedparser.FeedParserDict({
+        'title': 'Teaser Only',
+        'link': 'http://www.dawn.com/news/teaser',
+        'summary': '<p>Short teaser.</p>',
+    })
+    page_text = 'Full story paragraph. ' * 45
+    body = f'<html><body><div class="story__content"><p>{page_text}</p></div></body></html>'
+    request = Request(url=feed_entry.link, meta={'feed_entry': feed_entry})
+    response = TextResponse(url=feed_entry.link, body=body, encoding='utf-8', request=request)
+
+    item = collect(spider.parse_article(response))[0]
+
+    assert item['content'] == page_text.strip()
 
 
 def test_tribune_spider_parse_article_from_feed(mock_tribune_spider, mocker):
@@ -253,19 +267,7 @@ def test_tribune_spider_parse_article_from_feed(mock_tribune_spider, mocker):
     )
     # mock_response.meta = {'feed_entry': mock_feed_entry} # No longer needed
 
-    bs_mock_soup_tribune = mocker.Mock()
-
-    p_tag_mock_tribune1 = mocker.Mock()
-    p_tag_mock_tribune1.get_text.return_value = "Tribune full content."
-    p_tag_mock_tribune2 = mocker.Mock()
-    p_tag_mock_tribune2.get_text.return_value = "Second paragraph."
-
-    bs_mock_soup_tribune.find_all.return_value = [p_tag_mock_tribune1, p_tag_mock_tribune2]
-    bs_mock_soup_tribune.get_text.return_value = "Tribune full content. Second paragraph."
-    mocker.patch('news_scrapper.news_scrapper.spiders.tribune_latest.BeautifulSoup', return_value=bs_mock_soup_tribune)
-
-    item_generator = spider.parse_article(mock_response)
-    item = next(item_generator)
+    item = collect(spider.parse_article(mock_response))[0]
 
     assert isinstance(item, NewsArticleItem)
     assert item['heading'] == 'Tribune Feed Title'
@@ -275,7 +277,7 @@ def test_tribune_spider_parse_article_from_feed(mock_tribune_spider, mocker):
     assert item['content'] == 'Tribune full content. Second paragraph.'
     assert item['url'] == mock_feed_entry.link
 
-    spider.mark_article_scraped.assert_called_once_with(mock_response.url)
+    spider.mark_article_scraped.assert_called_once_with(mock_response.url, spider.name)
     assert spider.stats['articles_scraped'] == 1
 
 
@@ -313,15 +315,9 @@ def test_dawn_spider_date_parsing_various_formats(mock_dawn_spider, mocker):
         mock_response = TextResponse(url=mock_feed_entry.link, body="<p>content</p>", encoding='utf-8', request=dummy_request)
         # mock_response.meta = {'feed_entry': mock_feed_entry} # No longer needed
 
-        # Patch BeautifulSoup for this specific call if content parsing is complex
-        bs_mock_instance = mocker.Mock()
-        bs_mock_instance.find_all.return_value = [mocker.Mock(get_text=lambda: "content")]
-        bs_mock_instance.get_text.return_value = "content"
-        mocker.patch('news_scrapper.news_scrapper.spiders.Dawn_spider.BeautifulSoup', return_value=bs_mock_instance)
-
-        item_generator = spider.parse_article(mock_response)
-        item = next(item_generator)
+        item = collect(spider.parse_article(mock_response))[0]
         assert item['date'] == date_str_in
+        assert datetime.fromisoformat(item['published_at']) == expected_dt_out
 
         # Check that no date parsing warnings were logged for these valid formats
         # This requires ensuring the logger was properly mocked and spied on if specific checks are needed.
@@ -331,3 +327,362 @@ def test_dawn_spider_date_parsing_various_formats(mock_dawn_spider, mocker):
         # logger_spy.reset_mock() # Reset spy for next iteration
 
     assert True # If all iterations complete without error
+
+
+# --- Feed-first mode ---
+
+def test_dawn_spider_parse_builds_item_from_long_feed_content(mocker):
+    spider = DawnLatestSpider()
+    spider.config.min_feed_content_length = 20
+    treat_all_entries_as_new(mocker, spider)
+    mocker.patch.object(spider, 'mark_article_scraped')
+
+    mock_response = TextResponse(
+        url=spider.start_urls[0],
+        body=MOCK_DAWN_RSS_CONTENT,
+        encoding='utf-8'
+    )
+
+    results = collect(spider.parse(mock_response))
+
+    assert len(results) == 2
+    assert all(isinstance(result, NewsArticleItem) for result in results)
+    assert results[0]['url'] == "http://www.dawn.com/news/dawnarticle1"
+    assert results[0]['content'] == "Full content of Dawn Article 1. It is very detailed."
+    assert spider.stats['articles_found'] == 2
+    assert spider.stats['articles_scraped'] == 2
+    assert spider.stats['articles_from_feed'] == 2
+    spider.mark_article_scraped.assert_any_call("http://www.dawn.com/news/dawnarticle1", "dawn_latest")
+
+def test_tribune_spider_parse_requests_page_when_feed_first_disabled(mocker):
+    spider = TribuneLatestSpider()
+    spider.config.feed_first = False
+    spider.config.min_feed_content_length = 20
+    treat_all_entries_as_new(mocker, spider)
+
+    mock_response = TextResponse(
+        url=spider.start_urls[0],
+        body=MOCK_TRIBUNE_RSS_CONTENT,
+        encoding='utf-8'
+    )
+
+    requests = collect(spider.parse(mock_response))
+
+    assert len(requests) == 1
+    assert isinstance(requests[0], Request)
+    assert requests[0].callback == spider.parse_article
+    assert spider.stats['articles_from_feed'] == 0
+
+def test_article_requests_are_repeated_after_a_failed_download(mocker):
+    spider = TribuneLatestSpider()
+    spider.config.feed_first = False
+    treat_all_entries_as_new(mocker, spider)
+    feed = TextResponse(url=spider.start_urls[0], body=MOCK_TRIBUNE_RSS_CONTENT, encoding='utf-8')
+
+    [request] = collect(spider.parse(feed))
+    # The dupefilter would drop the same URL on a later poll, so the request opts out of it
+    assert request.dont_filter
+    # A poll while the page is still downloading does not request it twice
+    assert collect(spider.parse(feed)) == []
+
+    failure = mocker.Mock(request=request, value=TimeoutError())
+    spider.article_failed(failure)
+    [retry] = collect(spider.parse(feed))
+    assert retry.url == request.url
+
+
+# --- Batched Redis dedup ---
+
+def test_filter_unscraped_uses_single_mget(mocker):
+    spider = DawnLatestSpider()
+    spider.dedup.redis_client = mocker.Mock()
+    spider.dedup.redis_client.mget = mocker.AsyncMock(return_value=[b"1", None, None])
+
+    urls = ["http://www.dawn.com/news/a", "http://www.dawn.com/news/b", "http://www.dawn.com/news/c"]
+    unscraped = asyncio.run(spider.filter_unscraped(urls))
+
+    assert unscraped == ["http://www.dawn.com/news/b", "http://www.dawn.com/news/c"]
+    spider.dedup.redis_client.mget.assert_called_once_with([f"dawn_latest:url:{url}" for url in urls])
+
+def test_mark_article_scraped_buffers_until_batch_size(mocker):
+    spider = DawnLatestSpider()
+    spider.config.mark_batch_size = 2
+    spider.config.mark_flush_interval = 3600
+    spider.dedup.redis_client = mocker.Mock()
+    pipe = spider.dedup.redis_client.pipeline.return_value
+    pipe.execute = mocker.AsyncMock()
+
+    asyncio.run(spider.mark_article_scraped("http://www.dawn.com/news/a"))
+    assert pipe.setex.call_count == 0
+    # Buffered URLs are already treated as scraped
+    assert asyncio.run(spider.filter_unscraped(["http://www.dawn.com/news/a"])) == []
+
+    asyncio.run(spider.mark_article_scraped("http://www.dawn.com/news/b"))
+    assert pipe.setex.call_count == 2
+    pipe.execute.assert_called_once()
+    pipe.setex.assert_any_call("dawn_latest:url:http://www.dawn.com/news/a", spider.config.url_expiry, "1")
+
+def test_unseen_feed_links_stops_at_watermark(mocker):
+    spider = DawnLatestSpider()
+    new_link, known_link, older = (f"http://www.dawn.com/news/{name}" for name in ("new", "known", "older"))
+    entries = {  # Newest first, as in the feed
+        new_link: {'published_parsed': time.gmtime(2000)},
+        known_link: {'published_parsed': time.gmtime(1000)},
+        older: {'published_parsed': time.gmtime(0)},
+    }
+
+    # The last poll saw the known article and nothing newer
+    watermark = 1000.0
+    mocker.patch.object(spider, 'load_watermark', return_value=(watermark, {known_link}, set()))
+    save_watermark = mocker.patch.object(spider, 'save_watermark')
+    filter_unscraped = mocker.patch.object(spider, 'filter_unscraped', side_effect=lambda urls, source=None: urls)
+
+    unseen = asyncio.run(spider.unseen_feed_links(spider.start_urls[0], entries))
+
+    # Only the new entry reaches Redis; the walk stops at the known one and never reaches the older entry
+    assert unseen == [new_link]
+    filter_unscraped.assert_called_once_with([new_link], None)
+    # The new entry joins the watermark only once it has been scraped and marked; until then it is pending
+    save_watermark.assert_called_once_with(spider.start_urls[0], watermark, {known_link, older}, None, {new_link})
+
+def test_unseen_feed_links_walks_past_the_watermark_to_pending_links(mocker):
+    spider = DawnLatestSpider()
+    new_link, known_link, failed = (f"http://www.dawn.com/news/{name}" for name in ("new", "known", "failed"))
+    entries = {
+        new_link: {'published_parsed': time.gmtime(2000)},
+        known_link: {'published_parsed': time.gmtime(1500)},
+        failed: {'published_parsed': time.gmtime(1000)},
+    }
+    # The last poll scraped known_link, but the page download for the older failed link did not succeed
+    mocker.patch.object(spider, 'load_watermark', return_value=(1500.0, {known_link}, {failed}))
+    save_watermark = mocker.patch.object(spider, 'save_watermark')
+    mocker.patch.object(spider, 'filter_unscraped', side_effect=lambda urls, source=None: urls)
+
+    assert asyncio.run(spider.unseen_feed_links(spider.start_urls[0], entries)) == [new_link, failed]
+    assert save_watermark.call_args.args[4] == {new_link, failed}
+
+def test_unseen_feed_links_checks_every_unknown_link_in_unordered_feed(mocker):
+    spider = DawnLatestSpider()
+    known_link, appended = "http://www.dawn.com/news/known", "http://www.dawn.com/news/appended"
+    entries = {  # Oldest first: new entries come after the known one
+        known_link: {'published_parsed': time.gmtime(1000)},
+        appended: {'published_parsed': time.gmtime(2000)},
+    }
+    mocker.patch.object(spider, 'load_watermark', return_value=(1000.0, {known_link}, set()))
+    mocker.patch.object(spider, 'save_watermark')
+    mocker.patch.object(spider, 'filter_unscraped', side_effect=lambda urls, source=None: urls)
+
+    assert asyncio.run(spider.unseen_feed_links(spider.start_urls[0], entries)) == [appended]
+
+def test_watermark_round_trips_through_redis(mocker):
+    spider = TribuneLatestSpider()
+    spider.redis_client = mocker.Mock()
+    pipe = spider.redis_client.pipeline.return_value
+    pipe.execute = mocker.AsyncMock()
+
+    asyncio.run(spider.save_watermark("https://tribune.com.pk/feed/latest", 1748944800.0, {"b", "a"}, pending={"c"}))
+    key, = pipe.hset.call_args.args
+    mapping = pipe.hset.call_args.kwargs['mapping']
+    assert key == "tribune_latest:watermark:https://tribune.com.pk/feed/latest"
+    pipe.expire.assert_called_once_with(key, spider.config.url_expiry)
+
+    stored = {field.encode(): str(value).encode() for field, value in mapping.items()}
+    spider.redis_client.hgetall = mocker.AsyncMock(return_value=stored)
+    assert asyncio.run(spider.load_watermark("https://tribune.com.pk/feed/latest")) == (1748944800.0, {"a", "b"}, {"c"})
+
+def test_redis_client_uses_redis_config_setting():
+    from scrapy.utils.test import get_crawler
+    crawler = get_crawler(TribuneLatestSpider, {'REDIS_CONFIG': {'host': 'redis', 'port': 6380, 'db': 2}})
+    spider = TribuneLatestSpider.from_crawler(crawler)
+
+    connection_kwargs = spider.redis_pool.connection_kwargs
+    assert (connection_kwargs['host'], connection_kwargs['port'], connection_kwargs['db']) == ('redis', 6380, 2)
+    assert spider.dedup.redis_client is spider.redis_client
+
+def test_redis_client_uses_spider_config():
+    spider = TribuneLatestSpider()
+
+    connection_kwargs = spider.redis_pool.connection_kwargs
+    assert connection_kwargs['host'] == spider.config.redis_host
+    assert connection_kwargs['port'] == spider.config.redis_port
+    assert connection_kwargs['db'] == spider.config.redis_db
+    assert spider.redis_pool.max_connections == spider.config.redis_max_connections
+
+
+# --- Polling mode ---
+
+def test_polling_spider_requests_feed_for_polling():
+    spider = DawnLatestSpider(poll='1')
+    [request] = list(spider.start_requests())
+
+    assert spider.polling
+    assert request.callback == spider.poll_feed
+    assert request.dont_filter
+    assert request.meta['poll_url'] == spider.start_urls[0]
+
+def test_schedule_poll_adapts_interval_to_new_entries(mocker):
+    call_later = mocker.patch('twisted.internet.reactor.callLater')
+    spider = DawnLatestSpider(poll='1')
+    spider.config.poll_initial_interval = 120
+    spider.config.poll_min_interval = 60
+    spider.config.poll_max_interval = 200
+    url = spider.start_urls[0]
+
+    assert spider.schedule_poll(url, 5) == 80    # New entries: poll sooner
+    assert spider.schedule_poll(url, 5) == 60    # ...but never below the floor
+    assert spider.schedule_poll(url, 0) == 90    # Quiet feed: back off
+    assert spider.schedule_poll(url, 0) == 135
+    assert spider.schedule_poll(url, 0) == 200   # ...up to the ceiling
+    call_later.assert_called_with(200, spider.enqueue_poll, url)
+
+def test_poll_feed_counts_new_entries(mocker):
+    spider = DawnLatestSpider(poll='1')
+    mocker.patch.object(spider, 'filter_unscraped', side_effect=lambda urls, source=None: urls[1:])
+    mocker.patch.object(spider, 'load_watermark', return_value=(None, set(), set()))
+    mocker.patch.object(spider, 'save_watermark')
+    mocker.patch.object(spider, 'flush_scraped_marks', mocker.AsyncMock())
+    schedule_poll = mocker.patch.object(spider, 'schedule_poll')
+    [request] = list(spider.start_requests())
+
+    response = TextResponse(url=request.url, body=MOCK_DAWN_RSS_CONTENT, encoding='utf-8', request=request)
+    results = collect(spider.poll_feed(response))
+
+    assert len(results) == 1
+    schedule_poll.assert_called_once_with(spider.start_urls[0], 1)
+
+def test_poll_feed_schedules_the_next_poll_when_parse_fails(mocker):
+    spider = DawnLatestSpider(poll='1')
+    mocker.patch.object(spider, 'load_watermark', side_effect=ConnectionError("Redis unavailable"))
+    schedule_poll = mocker.patch.object(spider, 'schedule_poll')
+    [request] = list(spider.start_requests())
+
+    response = TextResponse(url=request.url, body=MOCK_DAWN_RSS_CONTENT, encoding='utf-8', request=request)
+    with pytest.raises(ConnectionError):
+        collect(spider.poll_feed(response))
+
+    # The feed is polled again, after a quiet poll's backoff
+    schedule_poll.assert_called_once_with(spider.start_urls[0], 0)
+    assert spider.stats['errors'] == 1
+
+def feed_response_with_validators(spider):
+    [request] = list(spider.start_requests())
+    request.meta['feed_validators_key'] = f'dawn_latest:feed:{request.url}'
+    request.meta['new_feed_validators'] = {'etag': b'"def"'}
+    return TextResponse(url=request.url, body=MOCK_DAWN_RSS_CONTENT, encoding='utf-8', request=request)
+
+def test_parse_stores_feed_validators_after_the_watermark(mocker):
+    spider = DawnLatestSpider(poll='1')
+    treat_all_entries_as_new(mocker, spider)
+    spider.redis_client = mocker.Mock()
+    pipe = spider.redis_client.pipeline.return_value
+    pipe.execute = mocker.AsyncMock()
+    response = feed_response_with_validators(spider)
+
+    collect(spider.parse(response))
+
+    key = f'dawn_latest:feed:{spider.start_urls[0]}'
+    pipe.hset.assert_called_once_with(key, mapping={'etag': b'"def"'})
+    pipe.expire.assert_called_once_with(key, spider.config.url_expiry)
+
+def test_parse_keeps_old_feed_validators_when_the_watermark_fails(mocker):
+    spider = DawnLatestSpider(poll='1')
+    treat_all_entries_as_new(mocker, spider)
+    mocker.patch.object(spider, 'save_watermark', side_effect=ConnectionError("Redis unavailable"))
+    spider.redis_client = mocker.Mock()
+    response = feed_response_with_validators(spider)
+
+    with pytest.raises(ConnectionError):
+        collect(spider.parse(response))
+
+    # The next poll fetches and parses the feed again instead of getting a 304
+    spider.redis_client.pipeline.assert_not_called()
+
+
+# --- Declarative feed specs ---
+
+def test_feed_spider_loads_registered_spec():
+    spider = FeedSpider(spec='tribune_latest')
+
+    assert spider.name == 'tribune_latest'
+    assert spider.spec == FEED_SPECS['tribune_latest']
+    assert spider.start_urls == ['https://tribune.com.pk/feed/latest']
+    assert spider.allowed_domains == ['tribune.com.pk']
+
+def test_feed_spider_parses_inline_spec(mocker):
+    spider = FeedSpider(spec=json.dumps({
+        'name': 'example_latest',
+        'domain': 'example.com',
+        'feed_url': 'https://example.com/rss',
+        'content_xpath': '//article//p//text()',
+        'base_url': 'https://example.com'
+    }))
+    treat_all_entries_as_new(mocker, spider)
+    spider.config.feed_first = False
+    feed = MOCK_DAWN_RSS_CONTENT.replace('http://www.dawn.com/news/dawnarticle1', '/news/relative')
+
+    requests = collect(spider.parse(TextResponse(url=spider.start_urls[0], body=feed, encoding='utf-8')))
+
+    assert spider.name == 'example_latest'
+    assert [request.url for request in requests] == [
+        'https://example.com/news/relative', 'http://www.dawn.com/news/dawnarticle2'
+    ]
+
+def test_feed_spider_requires_spec():
+    with pytest.raises(ValueError):
+        FeedSpider()
+
+
+# --- Feed registry and multi-source crawling ---
+
+def test_load_registry_rejects_duplicate_names(tmp_path):
+    registry = tmp_path / 'feeds.json'
+    spec = FEED_SPECS['dawn_latest'].to_dict()
+    registry.write_text(json.dumps([spec]))
+    assert load_registry(str(registry)) == {'dawn_latest': FEED_SPECS['dawn_latest']}
+
+    registry.write_text(json.dumps([spec, spec]))
+    with pytest.raises(ValueError):
+        load_registry(str(registry))
+
+def test_multi_feed_spider_tags_requests_with_source_and_slot():
+    spider = MultiFeedSpider()
+    requests = list(spider.start_requests())
+
+    assert spider.name == 'feeds'
+    assert set(spider.allowed_domains) == {spec.domain for spec in FEED_SPECS.values()}
+    assert {(request.meta['source'], request.meta['download_slot']) for request in requests} == {
+        (spec.name, spec.domain) for spec in FEED_SPECS.values()
+    }
+
+def test_multi_feed_spider_selects_sources():
+    spider = MultiFeedSpider(sources='tribune_latest')
+    assert spider.start_urls == [FEED_SPECS['tribune_latest'].feed_url]
+
+    with pytest.raises(KeyError):
+        MultiFeedSpider(sources='dawn_latest,unknown')
+
+def test_multi_feed_spider_parses_each_feed_as_its_source(mocker):
+    spider = MultiFeedSpider()
+    treat_all_entries_as_new(mocker, spider)
+    spider.config.feed_first = False
+    request = next(request for request in spider.start_requests() if request.meta['source'] == 'tribune_latest')
+
+    response = TextResponse(url=request.url, body=MOCK_TRIBUNE_RSS_CONTENT, encoding='utf-8', request=request)
+    [article_request] = collect(spider.parse(response))
+
+    # The article request keeps its source, so it is deduped and rate limited as Tribune
+    assert article_request.url == 'http://tribune.com.pk/story/tribunearticle1'
+    assert article_request.meta['source'] == 'tribune_latest'
+    assert article_request.meta['download_slot'] == 'tribune.com.pk'
+    spider.filter_unscraped.assert_called_once_with([article_request.url], 'tribune_latest')
+
+def test_flush_scraped_marks_writes_each_source_to_its_namespace(mocker):
+    spider = MultiFeedSpider()
+    spider.dedup.add = mocker.AsyncMock()
+
+    asyncio.run(spider.mark_article_scraped("https://www.dawn.com/news/a", 'dawn_latest'))
+    asyncio.run(spider.mark_article_scraped("https://tribune.com.pk/story/b", 'tribune_latest'))
+    asyncio.run(spider.flush_scraped_marks())
+
+    spider.dedup.add.assert_any_await('dawn_latest', ["https://www.dawn.com/news/a"])
+    spider.dedup.add.assert_any_await('tribune_latest', ["https://tribune.com.pk/story/b"])